@@ -0,0 +1,37 @@
+"""Benchmark /api/dag response building in the compact and legacy formats.
+
+Run with ``python benchmarks/bench_api_dag.py``. Reports the time to build and
+JSON-encode the response body and the encoded payload size for synthetic DAGs.
+"""
+
+import time
+from argparse import ArgumentParser
+
+from bench_edge_index import synthetic_dag
+
+from dml_ui.impl import app, build_dag_response
+from dml_ui.util import annotate_nodes
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--fan-in", type=int, default=8, help="arguments per fn node")
+    args = parser.parse_args()
+    print(f"{'nodes':>8} {'format':>8} {'build':>9} {'encode':>9} {'bytes':>12}")
+    for n in args.sizes:
+        dag_data = synthetic_dag(n, fan_in=args.fan_in)
+        annotate_nodes(dag_data)
+        data = {"dag_data": dag_data, "log_streams": {}}
+        for fmt in ["legacy", "compact"]:
+            with app.test_request_context():
+                start = time.perf_counter()
+                body = build_dag_response(data, "repo", "main", "dag/0", fmt)
+                built = time.perf_counter()
+                payload = app.json.dumps(body)
+                encoded = time.perf_counter()
+            print(f"{n:>8} {fmt:>8} {built - start:>8.3f}s {encoded - built:>8.3f}s {len(payload):>12,}")
+
+
+if __name__ == "__main__":
+    main()
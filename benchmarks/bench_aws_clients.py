@@ -0,0 +1,49 @@
+"""Benchmark per-request boto3 client creation against the shared clients.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_aws_clients.py``. No AWS
+calls are made: only the client setup that the old `/logs` route and
+`get_node_repr` paid on every request is timed, next to the lookup that
+replaces it.
+"""
+
+import os
+import time
+from argparse import ArgumentParser
+
+import boto3
+from dml_util.aws.s3 import S3Store
+
+from dml_ui.aws import AWS_CLIENTS, get_aws_client, get_s3_store
+from dml_ui.cloudwatch import CloudWatchLogs
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("-n", "--repeat", type=int, default=50)
+    args = parser.parse_args()
+    # keep region resolution local (no instance metadata lookups)
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    AWS_CLIENTS.clear()
+    get_aws_client("logs"), get_aws_client("s3")
+    cases = [
+        ("logs", "per request", lambda: CloudWatchLogs(client=boto3.client("logs"))),
+        ("logs", "shared", CloudWatchLogs),
+        ("s3", "per request", S3Store),
+        ("s3", "shared", get_s3_store),
+    ]
+    print(f"{'client':>8} {'mode':>12} {'per call':>12}")
+    for service, mode, fn in cases:
+        print(f"{service:>8} {mode:>12} {timeit(fn, args.repeat) * 1e3:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark edge indexing in `annotate_nodes` and `filter_nodes` on synthetic DAGs.
+
+Run with ``python benchmarks/bench_edge_index.py``. Per-node cost should stay
+roughly flat as the DAG grows (linear scaling). The previous nested-loop
+implementation is timed on the smaller sizes for comparison.
+"""
+
+import random
+import time
+from argparse import ArgumentParser
+
+from dml_ui.util import EdgeIndex, annotate_nodes, filter_nodes
+
+
+def synthetic_dag(n_nodes, fan_in=3, seed=0):
+    """Build a `dag describe`-shaped dict with fn, import, literal and dml nodes."""
+    rng = random.Random(seed)
+    node_types = ["literal", "literal", "fn", "import", "dml"]
+    nodes, edges = [], []
+    for i in range(n_nodes):
+        node_type = rng.choice(node_types)
+        node_id = f"node/{i:032x}"
+        nodes.append({"id": node_id, "name": None, "doc": None, "node_type": node_type, "data_type": "int"})
+        if node_type in ["fn", "import"]:
+            edges.append({"source": f"dag/{i:032x}", "target": node_id, "type": "dag"})
+        if node_type == "fn" and i > 0:
+            for _ in range(fan_in):
+                edges.append({"source": nodes[rng.randrange(i)]["id"], "target": node_id, "type": "node"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def legacy_annotate_nodes(dag_data):
+    for node in dag_data["nodes"]:
+        if node["node_type"] in ["import", "fn"]:
+            if node["node_type"] == "fn":
+                node["sublist"] = [
+                    x["source"] for x in dag_data["edges"] if x["type"] == "node" and x["target"] == node["id"]
+                ]
+            (node["parent"],) = [x["source"] for x in dag_data["edges"] if x["type"] == "dag" and x["target"] == node["id"]]
+
+
+def legacy_filter_nodes(nodes, edges):
+    filtered_nodes = []
+    filtered_edges = []
+    for node in nodes:
+        if node["node_type"] == "dml":
+            continue
+        filtered_nodes.append(node)
+        for edge in edges:
+            if edge["source"] == node["id"]:
+                filtered_edges.append(edge)
+    filtered_edges = [edge for edge in filtered_edges if edge["target"] not in [n["id"] for n in nodes if n["node_type"] == "dml"]]
+    return filtered_nodes, filtered_edges
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 20_000, 50_000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=2_000, help="largest size to time the nested loops on")
+    args = parser.parse_args()
+    legacy_sizes = [x for x in [500, 1_000, 2_000, 5_000] if x <= args.legacy_max]
+    print(f"{'nodes':>8} {'edges':>8} {'impl':>7} {'annotate':>10} {'filter':>10} {'us/node':>8}")
+    for n in legacy_sizes + args.sizes:
+        dag_data = synthetic_dag(n)
+        rows = [("indexed", lambda d: annotate_nodes(d), lambda d, idx: filter_nodes(d["nodes"], d["edges"], idx))]
+        if n in legacy_sizes:
+            rows.append(("legacy", legacy_annotate_nodes, lambda d, _: legacy_filter_nodes(d["nodes"], d["edges"])))
+        for name, annotate, filter_ in rows:
+            t_annotate, index = timed(annotate, dag_data)
+            index = index if isinstance(index, EdgeIndex) else None
+            t_filter, _ = timed(filter_, dag_data, index)
+            per_node = (t_annotate + t_filter) / n * 1e6
+            print(f"{n:>8} {len(dag_data['edges']):>8} {name:>7} {t_annotate:>9.3f}s {t_filter:>9.3f}s {per_node:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+DaggerML UI AWS Clients
+
+Process-wide boto3 clients (CloudWatch Logs, S3) shared by all requests, with a
+connection pool sized for concurrent request handling. boto3 clients are
+thread-safe once created; creating them is not, and costs tens of milliseconds
+plus a new connection pool each time.
+"""
+
+import logging
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+from dml_util.aws import get_client
+from dml_util.aws.s3 import S3Store
+
+from dml_ui.cache import CACHES, LRUCache, env_int
+
+logger = logging.getLogger(__name__)
+
+#: Connection settings merged into every shared client's configuration.
+CLIENT_CONFIG = Config(
+    max_pool_connections=env_int("DML_UI_AWS_MAX_POOL_CONNECTIONS", 32),
+    tcp_keepalive=True,
+    connect_timeout=env_int("DML_UI_AWS_CONNECT_TIMEOUT", 5),
+    read_timeout=env_int("DML_UI_AWS_READ_TIMEOUT", 30),
+)
+
+#: Lifetime in seconds of presigned URLs.
+PRESIGN_EXPIRES = env_int("DML_UI_PRESIGN_EXPIRES", 3600)
+#: Cached presigned URLs are regenerated once they have less than this many seconds left.
+PRESIGN_REFRESH_MARGIN = env_int("DML_UI_PRESIGN_REFRESH_MARGIN", 600)
+#: Seconds a missing S3 object is remembered before it is checked again.
+MISSING_OBJECT_TTL = env_int("DML_UI_S3_MISSING_TTL", 60)
+
+#: S3 uri -> {"url", "refresh_at"} for HTML resources ("url" is None if the object doesn't exist).
+PRESIGNED_URL_CACHE = LRUCache("presigned_urls", max_items=env_int("DML_UI_PRESIGN_CACHE_ITEMS", 4096))
+
+
+class AwsClients:
+    """Thread-safe registry of shared boto3 clients keyed by service name.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the registry's metrics in `CACHES`.
+    config : botocore.config.Config
+        Connection settings for the clients created here.
+    """
+
+    def __init__(self, name="aws_clients", config=CLIENT_CONFIG):
+        self.name = name
+        self.config = config
+        self.hits = 0
+        self.creations = 0
+        self._clients = {}
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def _create(self, service):
+        # dml_util resolves the region (environment, session, then ECS/EC2
+        # metadata); only the connection settings are changed here
+        base = get_client(service)
+        config = base.meta.config.merge(self.config)
+        return boto3.session.Session().client(service, config=config)
+
+    def get(self, service):
+        """Return the shared client for `service`, creating it on first use."""
+        client = self._clients.get(service)
+        if client is not None:
+            self.hits += 1
+            return client
+        with self._lock:
+            if service not in self._clients:
+                self._clients[service] = self._create(service)
+                self.creations += 1
+            return self._clients[service]
+
+    def set(self, service, client):
+        """Use `client` for `service` from now on (e.g. a stand-in in tests)."""
+        with self._lock:
+            self._clients[service] = client
+
+    def clear(self):
+        """Drop all clients (they are recreated on next use) and reset the counters."""
+        with self._lock:
+            self._clients.clear()
+            self.hits = self.creations = 0
+
+    def stats(self):
+        """Return a dictionary of registry statistics."""
+        return {
+            "name": self.name,
+            "items": len(self._clients),
+            "services": sorted(self._clients),
+            "max_pool_connections": self.config.max_pool_connections,
+            "hits": self.hits,
+            "creations": self.creations,
+        }
+
+
+AWS_CLIENTS = AwsClients()
+
+
+def get_aws_client(service):
+    """Return the shared boto3 client for `service` (e.g. "logs", "s3")."""
+    return AWS_CLIENTS.get(service)
+
+
+def set_aws_client(service, client):
+    """Inject the client returned by `get_aws_client(service)`, e.g. a moto or stub client."""
+    AWS_CLIENTS.set(service, client)
+
+
+def get_s3_store():
+    """Return an `S3Store` backed by the shared S3 client."""
+    return S3Store(client=get_aws_client("s3"))
+
+
+def presigned_html_url(resource):
+    """Return a presigned URL that displays an S3 HTML resource inline, or None if it doesn't exist.
+
+    Results are cached by uri: URLs are reused until `PRESIGN_REFRESH_MARGIN`
+    seconds before they expire, and then re-signed without another existence
+    check. Missing objects are re-checked after `MISSING_OBJECT_TTL` seconds.
+    """
+    now = time.time()
+    entry = PRESIGNED_URL_CACHE.get(resource.uri)
+    if entry is not None and now < entry["refresh_at"]:
+        return entry["url"]
+    s3 = get_s3_store()
+    # objects are not expected to disappear, so only re-check missing ones
+    if (entry is None or entry["url"] is None) and not s3.exists(resource):
+        PRESIGNED_URL_CACHE.set(resource.uri, {"url": None, "refresh_at": now + MISSING_OBJECT_TTL})
+        return None
+    bucket, key = s3.parse_uri(resource)
+    url = s3.client.generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": bucket,
+            "Key": key,
+            "ResponseContentDisposition": "inline",
+            "ResponseContentType": "text/html",
+        },
+        ExpiresIn=PRESIGN_EXPIRES,
+    )
+    refresh_at = now + max(PRESIGN_EXPIRES - PRESIGN_REFRESH_MARGIN, 0)
+    PRESIGNED_URL_CACHE.set(resource.uri, {"url": url, "refresh_at": refresh_at})
+    return url
@@ -0,0 +1,183 @@
+"""
+DaggerML UI Branch Index
+
+Maps commits and DAGs to a branch that contains them, so that pages reached by
+commit or DAG id alone don't have to probe every branch in turn.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dml_ui.cache import env_int
+from dml_ui.pool import get_dml
+
+logger = logging.getLogger(__name__)
+
+#: Maximum number of concurrent `dml` calls used to describe heads or probe branches.
+PROBE_WORKERS = env_int("DML_UI_PROBE_WORKERS", 8)
+#: Minimum number of seconds between two refreshes of the same index.
+MIN_REFRESH_INTERVAL = env_int("DML_UI_BRANCH_INDEX_REFRESH", 5)
+
+_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="dml-ui-probe")
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def as_branch_list(result):
+    """Normalize `dml("branch", "list")` output (a list, or a dict with "branches")."""
+    if isinstance(result, dict):
+        return list(result.get("branches") or [])
+    return list(result or [])
+
+
+def probe(candidates, check):
+    """Call `check(candidate)` on candidates in parallel and return the first that succeeds.
+
+    A check succeeds if it returns a truthy value without raising. At most
+    `PROBE_WORKERS` checks run at a time, and the remaining ones are cancelled
+    once a match is found. Returns None if no candidate matches.
+    """
+    def attempt(candidate):
+        try:
+            return bool(check(candidate))
+        except Exception:
+            logger.debug(f"Probe of {candidate} failed", exc_info=True)
+            return False
+
+    futures = {_executor.submit(attempt, x): x for x in candidates}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result():
+                    return futures[future]
+    finally:
+        for future in pending:
+            future.cancel()
+    return None
+
+
+class BranchIndex:
+    """Commit -> branch and DAG -> branch lookups for one repository.
+
+    Commits are indexed from `commit log` output alone: every branch head is
+    walked back through its parents. DAGs are indexed from the heads: only
+    branches whose head moved since the last refresh are described, so a
+    refresh costs a couple of `dml` calls plus one per changed branch.
+    Lookups that still miss (e.g. DAGs only found in older commits) fall back
+    to probing the branches in parallel, and the answer is remembered.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.commits = {}
+        self.dags = {}
+        self.heads = {}
+        #: branch -> head whose DAGs were indexed
+        self.dag_heads = {}
+        self.branches = []
+        self.last_refresh = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False, log=None, dags=True):
+        """Bring the index up to date with the repository's commit log.
+
+        `log` is `commit log --output json` output, for callers that already
+        have it. With `dags=False` only commits are indexed and no commit is
+        described. The lock is only held to update the tables, never while
+        `dml` runs.
+        """
+        with self._lock:
+            if not force and time.time() - self.last_refresh < MIN_REFRESH_INTERVAL:
+                return
+            self.last_refresh = time.time()
+        dml = get_dml(self.repo)
+        if log is None:
+            log = dml("commit", "log", "--output", "json") or []
+        branches = as_branch_list(dml("branch", "list"))
+        parents = {x["id"]: x.get("parents") or [] for x in log}
+        # the log names the branch of each head, except when branches share one
+        heads = {x["head"]: x["id"] for x in log if x.get("head") in branches}
+        described = {}
+        with self._lock:
+            new_commits = not set(parents) <= set(self.commits)
+            unnamed = [b for b in branches if b not in heads and (new_commits or b not in self.heads)]
+        for branch, head in zip(unnamed, _executor.map(self._describe_head, unnamed)):
+            if head is not None:
+                heads[branch] = head["id"]
+                described[head["id"]] = head
+        with self._lock:
+            moved = [b for b in branches if dags and b in heads and self.dag_heads.get(b) != heads[b]]
+            self.heads.update(heads)
+            self.branches = branches
+            # prefer the branches in listed order so repeated lookups are stable
+            for branch in branches:
+                todo = [self.heads[branch]] if branch in self.heads else []
+                while todo:
+                    commit_id = todo.pop()
+                    if commit_id in self.commits:
+                        continue
+                    self.commits[commit_id] = branch
+                    todo.extend(parents.get(commit_id, []))
+        todo = list(dict.fromkeys(heads[b] for b in moved if heads[b] not in described))
+        described.update(zip(todo, _executor.map(self._describe_commit, todo)))
+        with self._lock:
+            for branch in moved:
+                commit = described.get(heads[branch])
+                if commit is None:
+                    continue
+                self.dag_heads[branch] = heads[branch]
+                for dag_id in (commit.get("dags") or {}).values():
+                    self.dags.setdefault(dag_id, branch)
+
+    def _describe_head(self, branch):
+        try:
+            return get_dml(self.repo, branch)("commit", "describe")
+        except Exception as e:
+            logger.info(f"Failed to describe head of branch {branch} in {self.repo}: {e}", exc_info=True)
+            return None
+
+    def _describe_commit(self, commit_id):
+        try:
+            return get_dml(self.repo)("commit", "describe", commit_id)
+        except Exception as e:
+            logger.info(f"Failed to describe commit {commit_id} in {self.repo}: {e}", exc_info=True)
+            return None
+
+    def _lookup(self, table, key, check):
+        if key in table:
+            return table[key]
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Failed to refresh branch index for {self.repo}: {e}", exc_info=True)
+        if key in table:
+            return table[key]
+        branch = probe(self.branches, check)
+        if branch is not None:
+            table[key] = branch
+        return branch
+
+    def find_commit_branch(self, commit_id):
+        """Return a branch containing `commit_id`, or None."""
+        def check(branch):
+            return get_dml(self.repo, branch)("commit", "describe", commit_id)
+        return self._lookup(self.commits, commit_id, check)
+
+    def find_dag_branch(self, dag_id):
+        """Return a branch in which `dag_id` can be described, or None."""
+        def check(branch):
+            return get_dml(self.repo, branch)("dag", "describe", dag_id)
+        # names can move between commits, so only remember resolved ids
+        return self._lookup(self.dags if dag_id.startswith("dag/") else {}, dag_id, check)
+
+
+def get_branch_index(repo):
+    """Return the shared `BranchIndex` for `repo`."""
+    with _indexes_lock:
+        if repo not in _indexes:
+            _indexes[repo] = BranchIndex(repo)
+        return _indexes[repo]
@@ -0,0 +1,254 @@
+"""
+DaggerML UI Caching
+
+Provides a small thread-safe LRU cache with item and byte limits used to keep
+processed results for immutable DaggerML objects (DAGs, nodes) between requests,
+and a background-refreshing TTL cache for listings that change over time.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+#: All named caches, so that their statistics can be reported in one place.
+CACHES = {}
+
+_MISSING = object()
+
+
+def env_int(name, default):
+    """Read an integer setting from the environment, falling back to `default`."""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+
+def json_sizeof(value):
+    """Estimate the size of a value in bytes by its JSON encoding."""
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by item count and bytes.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the cache in `CACHES`.
+    max_items : int
+        Maximum number of entries. Zero disables the cache.
+    max_bytes : int, optional
+        Maximum total (estimated) size of all entries. None means unbounded.
+    sizeof : callable, optional
+        Function used to estimate the size of a value in bytes.
+    """
+
+    def __init__(self, name, max_items=128, max_bytes=None, sizeof=json_sizeof):
+        self.name = name
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the cached value for `key` (marking it recently used) or `default`."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, size=None):
+        """Store `value` under `key`, evicting least recently used entries as needed.
+
+        Values larger than `max_bytes` are not cached. Returns True if stored.
+        """
+        if self.max_items <= 0:
+            return False
+        size = self.sizeof(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Not caching {key} in {self.name}: {size} bytes exceeds limit")
+            return False
+        with self._lock:
+            old = self._data.pop(key, _MISSING)
+            if old is not _MISSING:
+                self.nbytes -= old[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while len(self._data) > self.max_items or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                _, (_, old_size) = self._data.popitem(last=False)
+                self.nbytes -= old_size
+                self.evictions += 1
+        return True
+
+    def pop(self, key, default=None):
+        """Remove `key` from the cache and return its value (or `default`)."""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            if item is _MISSING:
+                return default
+            self.nbytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of cache statistics."""
+        return {
+            "name": self.name,
+            "items": len(self._data),
+            "bytes": self.nbytes,
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def cache_stats():
+    """Return statistics for all registered caches."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+class RefreshingCache:
+    """Cache for slowly changing listings that refreshes entries in the background.
+
+    Entries younger than `ttl` seconds are served as they are. Older entries are
+    still served (marked stale) while a single background refresh runs, until
+    they are older than `max_stale` seconds, after which they are reloaded
+    synchronously. Every lookup also returns staleness metadata.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the cache in `CACHES`.
+    ttl : float
+        Seconds after which an entry is refreshed in the background.
+    max_stale : float
+        Seconds after which a stale entry is no longer served.
+    max_items : int
+        Maximum number of entries (least recently used are dropped first).
+    max_workers : int
+        Number of threads used for background refreshes.
+    """
+
+    def __init__(self, name, ttl=30, max_stale=600, max_items=256, max_workers=4):
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"dml-ui-{name}")
+        CACHES[name] = self
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Background refresh of {key} in {self.name} failed: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key, loader):
+        """Return ``(value, metadata)`` for `key`, calling `loader()` to (re)load it.
+
+        Exceptions raised by a synchronous load propagate to the caller; failed
+        background refreshes are logged and the stale value kept.
+        """
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+        if item is None or now - item[1] > self.max_stale:
+            self.misses += 1
+            value = loader()
+            self._store(key, value)
+            return value, {"fetched_at": time.time(), "age": 0.0, "stale": False, "refreshing": False}
+        value, fetched_at = item
+        age = now - fetched_at
+        stale = age > self.ttl
+        if stale:
+            self.stale_hits += 1
+            with self._lock:
+                start = key not in self._refreshing
+                self._refreshing.add(key)
+            if start:
+                self._executor.submit(self._refresh, key, loader)
+        else:
+            self.hits += 1
+        return value, {"fetched_at": fetched_at, "age": age, "stale": stale, "refreshing": stale}
+
+    def invalidate(self, match=None):
+        """Drop entries for which `match(key)` is true (all entries if `match` is None)."""
+        with self._lock:
+            for key in [k for k in self._data if match is None or match(k)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.invalidate()
+        self.hits = self.misses = self.stale_hits = self.refreshes = self.refresh_errors = 0
+
+    def stats(self):
+        """Return a dictionary of cache statistics."""
+        return {
+            "name": self.name,
+            "items": len(self._data),
+            "ttl": self.ttl,
+            "max_stale": self.max_stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+        }
@@ -1,18 +1,37 @@
 """CloudWatch utilities for retrieving logs."""
+from __future__ import annotations
+
+import heapq
 import logging
-from typing import Dict, Optional
+import time
+from typing import Iterator
 
-import boto3
+from dml_ui.aws import get_aws_client
+from dml_ui.cache import LRUCache, env_int
+from dml_ui.fanout import gather
 
 logger = logging.getLogger(__name__)
 
+#: Search result pages by stream and query.
+LOG_SEARCH_CACHE = LRUCache(
+    "log_search",
+    max_items=env_int("DML_UI_LOG_SEARCH_CACHE_ITEMS", 512),
+    max_bytes=env_int("DML_UI_LOG_SEARCH_CACHE_BYTES", 64 * 2**20),
+)
+#: Seconds a search page of a stream that may still grow is reused.
+LOG_SEARCH_TTL = env_int("DML_UI_LOG_SEARCH_TTL", 30)
+
 
 class CloudWatchLogs:
     """Client for CloudWatch Logs operations."""
 
-    def __init__(self):
-        """Initialize the CloudWatch logs client."""
-        self.client = boto3.client("logs")
+    def __init__(self, client=None):
+        """Initialize the CloudWatch logs client.
+
+        Uses the process-wide client from `get_aws_client` unless a client
+        (e.g. one pointed at a local stand-in) is passed.
+        """
+        self.client = client if client is not None else get_aws_client("logs")
         # Extract region from client if available
         if self.client and hasattr(self.client, 'meta') and hasattr(self.client.meta, 'region_name'):
             self.region = self.client.meta.region_name
@@ -23,25 +42,24 @@ class CloudWatchLogs:
         self,
         log_group_name: str,
         log_stream_name: str,
-        start_time: Optional[int] = None,
-        end_time: Optional[int] = None,
-        next_token: Optional[str] = None,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        next_token: str | None = None,
         limit: int = 1000,
         start_from_head: bool = True
-    ) -> Dict:
+    ) -> dict:
         """Get log events from CloudWatch with optional time range and pagination."""
-        print("=== CloudWatch get_log_events called ===")
-        print(f"log_group_name: {log_group_name}")
-        print(f"log_stream_name: {log_stream_name}")
-        print(f"start_time: {start_time}")
-        print(f"end_time: {end_time}")
-        print(f"next_token: {next_token}")
-        print(f"limit: {limit}")
-        print(f"start_from_head: {start_from_head}")
+        logger.debug("=== CloudWatch get_log_events called ===")
+        logger.debug(f"log_group_name: {log_group_name}")
+        logger.debug(f"log_stream_name: {log_stream_name}")
+        logger.debug(f"start_time: {start_time}")
+        logger.debug(f"end_time: {end_time}")
+        logger.debug(f"next_token: {next_token}")
+        logger.debug(f"limit: {limit}")
+        logger.debug(f"start_from_head: {start_from_head}")
         
         if not self.client:
             logger.warning("CloudWatch logs client unavailable")
-            print("CloudWatch logs client unavailable - returning empty response")
             return {
                 "events": [],
                 "nextForwardToken": None,
@@ -62,14 +80,14 @@ class CloudWatchLogs:
         if next_token:
             params["nextToken"] = next_token
 
-        print(f"CloudWatch API params: {params}")
+        logger.debug(f"CloudWatch API params: {params}")
         
         try:
             response = self.client.get_log_events(**params)
-            print(f"CloudWatch API response keys: {list(response.keys())}")
-            print(f"Number of events: {len(response.get('events', []))}")
-            print(f"nextForwardToken: {response.get('nextForwardToken')}")
-            print(f"nextBackwardToken: {response.get('nextBackwardToken')}")
+            logger.debug(f"CloudWatch API response keys: {list(response.keys())}")
+            logger.debug(f"Number of events: {len(response.get('events', []))}")
+            logger.debug(f"nextForwardToken: {response.get('nextForwardToken')}")
+            logger.debug(f"nextBackwardToken: {response.get('nextBackwardToken')}")
             
             result = {
                 "events": response.get("events", []),
@@ -78,13 +96,12 @@ class CloudWatchLogs:
             }
             
             if result["events"]:
-                print(f"First event: {result['events'][0]}")
-                print(f"Last event: {result['events'][-1]}")
+                logger.debug(f"First event: {result['events'][0]}")
+                logger.debug(f"Last event: {result['events'][-1]}")
             
             return result
         except Exception as e:
             logger.error(f"Failed to get CloudWatch logs: {e}")
-            print(f"CloudWatch API error: {e}")
             return {
                 "events": [],
                 "nextForwardToken": None,
@@ -92,13 +109,170 @@ class CloudWatchLogs:
                 "error": str(e)
             }
 
+    def tail(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        next_token: str | None = None,
+        limit: int = 1000,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        timeout: float = 300,
+        stop_when_idle: bool = False,
+        sleep=time.sleep,
+    ) -> Iterator[dict]:
+        """Follow a log stream from `next_token` (or its start), yielding each page.
+
+        Pages are fetched back to back while they have events. Once the end of
+        the stream is reached, polling backs off exponentially from
+        `min_interval` to `max_interval` seconds, and resets when new events
+        arrive. Empty pages are yielded too, so callers can send keep-alives.
+
+        Tailing stops after `timeout` seconds, on the first error (yielded as a
+        page with an "error" key), or, with `stop_when_idle`, once the end of
+        the stream is reached (for streams that can't grow anymore).
+        """
+        deadline = time.monotonic() + timeout
+        interval = min_interval
+        while True:
+            params = {
+                "logGroupName": log_group_name,
+                "logStreamName": log_stream_name,
+                "limit": min(limit, 1000),
+                "startFromHead": True,
+            }
+            if next_token:
+                params["nextToken"] = next_token
+            try:
+                response = self.client.get_log_events(**params)
+            except Exception as e:
+                logger.exception("Failed to tail CloudWatch logs")
+                yield {"events": [], "nextForwardToken": next_token, "error": str(e)}
+                return
+            events = response.get("events", [])
+            # at the end of a stream CloudWatch returns the token it was given
+            next_token = response.get("nextForwardToken") or next_token
+            yield {"events": events, "nextForwardToken": next_token}
+            if events:
+                interval = min_interval
+                if time.monotonic() > deadline:
+                    return
+                continue
+            if stop_when_idle or time.monotonic() + interval > deadline:
+                return
+            sleep(interval)
+            interval = min(interval * 2, max_interval)
+
+    def read_stored_events(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        store,
+        start: int = 0,
+        limit: int = 100,
+        page_size: int = 1000,
+        max_requests: int = 20,
+    ) -> dict:
+        """Read events ``[start, start + limit)`` of a stream that can't change anymore.
+
+        Events come from the `LogSegmentStore` `store`. Events it doesn't
+        have yet are fetched forward from its frontier, in pages of
+        `page_size` (at most `max_requests` calls), and appended to it, so
+        every event is fetched from CloudWatch once.
+
+        Returns a dict with ``events``, ``start``, ``complete`` (whether the
+        whole stream is stored) and, once complete, ``total``.
+        """
+        end = start + limit
+        error = None
+        with store.lock(log_group_name, log_stream_name):
+            next_index, token, complete = store.frontier(log_group_name, log_stream_name)
+            for _ in range(max_requests):
+                if complete or next_index >= end:
+                    break
+                params = {
+                    "logGroupName": log_group_name,
+                    "logStreamName": log_stream_name,
+                    "limit": min(page_size, 10000),
+                    "startFromHead": True,
+                }
+                if token:
+                    params["nextToken"] = token
+                try:
+                    response = self.client.get_log_events(**params)
+                except Exception as e:
+                    logger.exception("Failed to get CloudWatch logs")
+                    error = str(e)
+                    break
+                events = response.get("events", [])
+                next_token = response.get("nextForwardToken")
+                # at the end of a stream CloudWatch returns the token it was given
+                complete = not events and (not next_token or next_token == token)
+                store.append(log_group_name, log_stream_name, next_index, events, next_token or token, complete)
+                # re-read, in case another worker extended the stream meanwhile
+                next_index, token, complete = store.frontier(log_group_name, log_stream_name)
+        out = {
+            "events": store.read(log_group_name, log_stream_name, start, limit),
+            "start": start,
+            "complete": complete,
+        }
+        if complete:
+            out["total"] = next_index
+        if error:
+            out["error"] = error
+        return out
+
+    def filter_log_events(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        filter_pattern: str | None = None,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        next_token: str | None = None,
+        limit: int = 100,
+        max_requests: int = 10,
+    ) -> dict:
+        """Search one log stream with a CloudWatch filter pattern.
+
+        CloudWatch may return pages with few or no matches while it scans, so up
+        to `max_requests` calls are made until `limit` events are found or the
+        stream is exhausted.
+        """
+        params = {
+            "logGroupName": log_group_name,
+            "logStreamNames": [log_stream_name],
+            "limit": min(limit, 10000),
+        }
+        if filter_pattern:
+            params["filterPattern"] = filter_pattern
+        if start_time:
+            params["startTime"] = start_time
+        if end_time:
+            params["endTime"] = end_time
+        events = []
+        for _ in range(max_requests):
+            if next_token:
+                params["nextToken"] = next_token
+            params["limit"] = min(limit - len(events), 10000)
+            try:
+                response = self.client.filter_log_events(**params)
+            except Exception as e:
+                logger.exception("Failed to search CloudWatch logs")
+                return {"events": events, "nextToken": next_token, "error": str(e)}
+            events.extend(response.get("events", []))
+            next_token = response.get("nextToken")
+            if not next_token or len(events) >= limit:
+                break
+        return {"events": events, "nextToken": next_token}
+
     def get_log_streams(
         self,
         log_group_name: str,
-        prefix: Optional[str] = None,
-        next_token: Optional[str] = None,
+        prefix: str | None = None,
+        next_token: str | None = None,
         limit: int = 50,
-    ) -> Dict:
+    ) -> dict:
         """Get log streams from CloudWatch with optional filtering."""
         if not self.client:
             logger.warning("CloudWatch logs client unavailable")
@@ -132,3 +306,97 @@ class CloudWatchLogs:
                 "nextToken": None,
                 "error": str(e)
             }
+
+
+def search_logs(
+    log_streams: dict,
+    filter_pattern: str | None = None,
+    start_time: int | None = None,
+    end_time: int | None = None,
+    cursor: dict | None = None,
+    limit: int = 100,
+    final: bool = False,
+    cloudwatch: CloudWatchLogs | None = None,
+) -> dict:
+    """Search several log streams in parallel and merge the matches by timestamp.
+
+    Events are ordered across pages too: a page only returns events up to the
+    smallest last timestamp among the streams that have more matches, since
+    those could still have earlier events. Events past that point are left in
+    the cursor (as the page token they came from and how many of its events
+    were already returned) and returned on a later page.
+
+    Parameters
+    ----------
+    log_streams : dict
+        Stream name (e.g. "stdout") to ``{"log_group", "log_stream"}``.
+    filter_pattern : str, optional
+        CloudWatch filter pattern: terms, quoted phrases, or JSON selectors
+        such as ``{ $.level = "ERROR" }`` for structured logs.
+    start_time, end_time : int, optional
+        Time range in milliseconds since the epoch.
+    cursor : dict, optional
+        The "cursor" of the previous result, ``[token, skip]`` by stream name.
+        Streams missing from it are done.
+    limit : int
+        Maximum number of matches per stream and page.
+    final : bool
+        Whether the streams can't grow anymore (finished DAGs), in which case
+        pages are cached for good instead of for `LOG_SEARCH_TTL` seconds.
+    cloudwatch : CloudWatchLogs, optional
+        Client wrapper to use, defaults to one around the shared logs client.
+
+    Returns
+    -------
+    dict
+        ``events`` (each with a "stream" key), ``cursor`` (None once all
+        streams are exhausted) and ``errors`` by stream name.
+    """
+    cloudwatch = cloudwatch or CloudWatchLogs()
+    names = list(log_streams) if cursor is None else [x for x in log_streams if x in cursor]
+
+    positions = {name: (cursor or {}).get(name) or [None, 0] for name in names}
+
+    def search(name):
+        details = log_streams[name]
+        token = positions[name][0]
+        key = (details["log_group"], details["log_stream"], filter_pattern, start_time, end_time, token, limit)
+        cached = LOG_SEARCH_CACHE.get(key)
+        if cached is not None and (cached["expires"] is None or cached["expires"] > time.time()):
+            return cached["page"]
+        page = cloudwatch.filter_log_events(
+            details["log_group"],
+            details["log_stream"],
+            filter_pattern=filter_pattern,
+            start_time=start_time,
+            end_time=end_time,
+            next_token=token,
+            limit=limit,
+        )
+        if not page.get("error"):
+            expires = None if final else time.time() + LOG_SEARCH_TTL
+            LOG_SEARCH_CACHE.set(key, {"page": page, "expires": expires})
+        return page
+
+    results = gather({name: (lambda name=name: search(name)) for name in names})
+    pages, errors = {}, {}
+    for name in names:
+        error = results.failed(name)
+        page = {"events": [], "error": str(error)} if error is not None else results[name]
+        if page.get("error"):
+            errors[name] = page["error"]
+        pages[name] = (page["events"][positions[name][1]:], page.get("nextToken"))
+    # streams with more matches could still have events up to their last timestamp
+    ends = [events[-1].get("timestamp", 0) if events else None for events, more in pages.values() if more]
+    bound = None if not ends else float("-inf") if None in ends else min(ends)
+    merged, next_cursor = [], {}
+    for name, (events, more) in pages.items():
+        ready = [x for x in events if bound is None or x.get("timestamp", 0) <= bound]
+        merged.append([{**x, "stream": name} for x in ready])
+        if len(ready) < len(events):
+            token, skip = positions[name]
+            next_cursor[name] = [token, skip + len(ready)]
+        elif more:
+            next_cursor[name] = [more, 0]
+    events = list(heapq.merge(*merged, key=lambda x: x.get("timestamp", 0)))
+    return {"events": events, "cursor": next_cursor or None, "errors": errors}
@@ -0,0 +1,100 @@
+"""
+DaggerML UI Columnar Encoding
+
+Converts DAG node and edge records into column-oriented tables, with
+dictionary-encoded enum columns, for compact transfer to the frontend as JSON,
+MessagePack or Arrow IPC.
+"""
+
+import io
+import json
+
+#: Columns that hold a small set of repeated values and are dictionary-encoded.
+NODE_DICTIONARY_COLUMNS = ["node_type", "data_type"]
+EDGE_DICTIONARY_COLUMNS = ["type"]
+
+
+def to_columns(records, dictionary_columns=()):
+    """Convert a list of dicts into a table of columns.
+
+    Parameters
+    ----------
+    records : list of dict
+        Rows to convert. Missing keys become None.
+    dictionary_columns : iterable of str
+        Columns to dictionary-encode: values are replaced with integer codes
+        into ``dictionaries[column]`` (None stays None).
+
+    Returns
+    -------
+    dict
+        ``{"length": int, "columns": {name: list}, "dictionaries": {name: list}}``
+    """
+    names = list(dict.fromkeys(k for record in records for k in record))
+    columns = {name: [record.get(name) for record in records] for name in names}
+    dictionaries = {}
+    for name in dictionary_columns:
+        if name not in columns:
+            continue
+        codes = {}
+        columns[name] = [None if x is None else codes.setdefault(x, len(codes)) for x in columns[name]]
+        dictionaries[name] = list(codes)
+    return {"length": len(records), "columns": columns, "dictionaries": dictionaries}
+
+
+def dag_table(dag_data, table):
+    """Return the ``nodes`` or ``edges`` of `dag_data` as a column table."""
+    if table == "nodes":
+        return to_columns(dag_data["nodes"], NODE_DICTIONARY_COLUMNS)
+    if table == "edges":
+        return to_columns(dag_data["edges"], EDGE_DICTIONARY_COLUMNS)
+    raise ValueError(f"Unknown table: {table}")
+
+
+def columnar_dag_data(dag_data):
+    """Return a copy of `dag_data` with ``nodes`` and ``edges`` as column tables."""
+    return {**dag_data, "nodes": dag_table(dag_data, "nodes"), "edges": dag_table(dag_data, "edges")}
+
+
+def _series(name, values, dictionary=None):
+    import polars as pl
+
+    if dictionary is not None:
+        return pl.Series(name, [None if x is None else dictionary[x] for x in values], dtype=pl.Categorical)
+    present = [x for x in values if x is not None]
+    if all(isinstance(x, str) for x in present):
+        return pl.Series(name, values, dtype=pl.Utf8)
+    if all(isinstance(x, bool) for x in present):
+        return pl.Series(name, values, dtype=pl.Boolean)
+    if all(isinstance(x, int) and not isinstance(x, bool) for x in present):
+        return pl.Series(name, values, dtype=pl.Int64)
+    if all(isinstance(x, list) and all(isinstance(y, str) for y in x) for x in present):
+        return pl.Series(name, values, dtype=pl.List(pl.Utf8))
+    # anything else (dicts, mixed lists) is sent as JSON text
+    return pl.Series(name, [None if x is None else json.dumps(x, default=str) for x in values], dtype=pl.Utf8)
+
+
+def arrow_ipc(table):
+    """Serialize a table from `to_columns` as an Arrow IPC stream using polars.
+
+    Dictionary-encoded columns become Arrow dictionary (categorical) columns.
+    """
+    import polars as pl
+
+    series = [_series(name, values, table["dictionaries"].get(name)) for name, values in table["columns"].items()]
+    buf = io.BytesIO()
+    pl.DataFrame(series).write_ipc_stream(buf)
+    return buf.getvalue()
+
+
+def msgpack_dumps(obj):
+    """Serialize `obj` with MessagePack.
+
+    Raises
+    ------
+    ImportError
+        If the optional ``msgpack`` package is not installed.
+    """
+    import msgpack
+
+    return msgpack.packb(obj, default=str)
@@ -0,0 +1,150 @@
+"""
+DaggerML UI Request Fan-out
+
+Runs the independent `dml` queries of a request (listings, describes, loads)
+concurrently on a shared thread pool, with a per-request concurrency limit and
+per-call timeouts, so page latency approaches the slowest call rather than the
+sum of all of them.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from flask import copy_current_request_context, has_request_context
+
+from dml_ui.cache import env_int
+
+logger = logging.getLogger(__name__)
+
+#: Size of the process-wide pool shared by all requests.
+POOL_WORKERS = env_int("DML_UI_FANOUT_WORKERS", 16)
+#: Maximum number of calls of a single request running at the same time.
+MAX_CONCURRENCY = env_int("DML_UI_FANOUT_CONCURRENCY", 4)
+#: Seconds a single call may take before its result is abandoned.
+CALL_TIMEOUT = env_int("DML_UI_CALL_TIMEOUT", 60)
+#: Seconds between checks for queued calls that started running.
+_START_POLL = 0.05
+
+_local = threading.local()
+
+
+def _initializer():
+    _local.worker = True
+
+
+_pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="dml-ui-fanout", initializer=_initializer)
+
+
+class FanoutResults(dict):
+    """Results of `gather` by name. Looking up a failed call raises its exception."""
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    def failed(self, name):
+        """Return the exception raised by call `name`, or None if it succeeded."""
+        value = super().__getitem__(name)
+        return value if isinstance(value, BaseException) else None
+
+
+def remaining_time():
+    """Seconds left before the fan-out call running on this thread times out, or None.
+
+    Pooled `Dml` handles use this as the timeout of their `dml` subprocesses,
+    so a call that timed out doesn't keep its worker busy.
+    """
+    deadline = getattr(_local, "deadline", None)
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+class _Call:
+    """A call of `gather` whose deadline is set when it starts running."""
+
+    def __init__(self, name, fn, timeout):
+        self.name = name
+        self.fn = fn
+        self.timeout = timeout
+        self.deadline = None
+
+    def __call__(self):
+        self.deadline = _local.deadline = time.monotonic() + self.timeout
+        try:
+            return self.fn()
+        finally:
+            _local.deadline = None
+
+
+def _run_inline(calls):
+    results = FanoutResults()
+    for name, fn in calls.items():
+        try:
+            results[name] = fn()
+        except Exception as e:
+            logger.debug(f"Call {name} failed", exc_info=True)
+            results[name] = e
+    return results
+
+
+def gather(calls, timeout=CALL_TIMEOUT, max_concurrency=MAX_CONCURRENCY):
+    """Run independent zero-argument callables concurrently.
+
+    Parameters
+    ----------
+    calls : dict
+        Mapping of name to callable. None values are skipped.
+    timeout : float
+        Seconds each call may run, counted from when it starts rather than
+        when it is queued, before it is reported as a `TimeoutError`. The
+        thread is not interrupted, but `dml` subprocesses run by pooled
+        handles are killed at the same deadline (see `remaining_time`).
+    max_concurrency : int
+        Maximum number of these calls running at the same time.
+
+    Returns
+    -------
+    FanoutResults
+        The result (or raised exception) of each call, by name.
+
+    Notes
+    -----
+    Calls see the current Flask request context, so they may use `url_for`.
+    Calls made from inside a fan-out worker run inline, so that nested fan-outs
+    can't exhaust the shared pool and deadlock.
+    """
+    calls = {k: v for k, v in calls.items() if v is not None}
+    if has_request_context():
+        calls = {k: copy_current_request_context(v) for k, v in calls.items()}
+    if len(calls) <= 1 or getattr(_local, "worker", False):
+        return _run_inline(calls)
+    results = FanoutResults()
+    queue = [_Call(name, fn, timeout) for name, fn in calls.items()]
+    running = {}
+    while queue or running:
+        while queue and len(running) < max(1, max_concurrency):
+            call = queue.pop(0)
+            running[_pool.submit(call)] = call
+        # calls still waiting for a pool thread have no deadline yet
+        deadlines = [x.deadline for x in running.values() if x.deadline is not None]
+        wait_for = min(deadlines) - time.monotonic() if deadlines else None
+        if len(deadlines) < len(running):
+            wait_for = _START_POLL if wait_for is None else min(wait_for, _START_POLL)
+        done, _ = wait(running, timeout=max(0, wait_for), return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future).name
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.debug(f"Call {name} failed", exc_info=True)
+                results[name] = e
+        now = time.monotonic()
+        for future, call in list(running.items()):
+            if call.deadline is not None and call.deadline <= now:
+                del running[future]
+                logger.warning(f"Call {call.name} timed out after {timeout}s")
+                results[call.name] = TimeoutError(f"{call.name} timed out after {timeout}s")
+    return results
@@ -1,12 +1,51 @@
+import base64
+import inspect
+import json
 import logging
 from argparse import ArgumentParser
+from collections.abc import Iterator
+from html import escape
 
-from daggerml import Dml
-from flask import Flask, jsonify, render_template, request, url_for
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 
-from dml_ui.cloudwatch import CloudWatchLogs
-from dml_ui.plugins import discover_dashboard_plugins
-from dml_ui.util import get_dag_info, get_node_info
+from dml_ui.branches import get_branch_index
+from dml_ui.cache import CACHES, RefreshingCache, cache_stats, env_int
+from dml_ui.cloudwatch import CloudWatchLogs, search_logs
+from dml_ui.columnar import arrow_ipc, columnar_dag_data, dag_table, msgpack_dumps
+from dml_ui.fanout import gather
+from dml_ui.logstore import get_log_store
+from dml_ui.plugins import PLUGINS, call_plugin
+from dml_ui.pool import get_dml
+from dml_ui.responses import (
+    compress_response,
+    is_not_modified,
+    make_etag,
+    mark_immutable,
+    not_modified,
+)
+from dml_ui.util import (
+    decode_cursor,
+    describe_nodes,
+    encode_cursor,
+    get_dag_info,
+    get_edge_index,
+    get_node_info,
+    get_node_value,
+    is_dag_id,
+    is_finished,
+    is_node_id,
+    page_value,
+    select_dag_nodes,
+)
+from dml_ui.workers import PLUGIN_JOBS, PLUGIN_POOL, PluginMemoryError, PluginTimeout
 
 logger = logging.getLogger(__name__)
 app = Flask(__name__)
@@ -41,8 +80,38 @@ def get_breadcrumbs(repo, branch, dag_id=None, commit_id=None):
             })
     return breadcrumbs
 
+#: Repo, branch and DAG listings for the sidebar, refreshed in the background.
+SIDEBAR_CACHE = RefreshingCache(
+    "sidebar",
+    ttl=env_int("DML_UI_SIDEBAR_TTL", 30),
+    max_stale=env_int("DML_UI_SIDEBAR_MAX_STALE", 600),
+)
+
+#: Prefix of /logs pagination tokens that are event indexes in the log segment store.
+SEGMENT_TOKEN_PREFIX = "seg:"
+
+#: Polling interval bounds (seconds) and connection lifetime of /logs/stream.
+LOG_TAIL_MIN_INTERVAL = env_int("DML_UI_LOG_TAIL_MIN_INTERVAL", 1)
+LOG_TAIL_MAX_INTERVAL = env_int("DML_UI_LOG_TAIL_MAX_INTERVAL", 15)
+LOG_TAIL_TIMEOUT = env_int("DML_UI_LOG_TAIL_TIMEOUT", 300)
+
+#: Maximum number of node ids accepted by /api/nodes.
+MAX_BATCH_NODES = env_int("DML_UI_MAX_BATCH_NODES", 1000)
+#: Maximum number of nodes of one /api/nodes request resolved at the same time.
+BATCH_CONCURRENCY = env_int("DML_UI_BATCH_CONCURRENCY", 8)
+
+
 def get_sidebar_data(dml, repo, branch, dag_id=None):
-    """Generate sidebar navigation data with all sections"""
+    """Generate sidebar navigation data with all sections
+
+    The listings come from `SIDEBAR_CACHE` (fetched concurrently on a miss),
+    and each section carries its staleness metadata under "cache".
+    """
+    listings = gather({
+        "repos": lambda: SIDEBAR_CACHE.get(("repos",), lambda: dml("repo", "list")),
+        "branches": (lambda: SIDEBAR_CACHE.get(("branches", repo), lambda: dml("branch", "list"))) if repo else None,
+        "dags": (lambda: SIDEBAR_CACHE.get(("dags", repo, branch), lambda: dml("dag", "list"))) if repo and branch else None,
+    })
     sidebar = {
         "title": "Navigation", 
         "sections": [],
@@ -51,7 +120,7 @@ def get_sidebar_data(dml, repo, branch, dag_id=None):
     # Always show repositories section
     repo_section = {"title": "Repositories", "type": "repos", "items": [], "collapsed": bool(repo)}
     try:
-        repos = dml("repo", "list")
+        repos, repo_section["cache"] = listings["repos"]
         for repo_item in repos:
             is_current = repo == repo_item["name"]
             repo_section["items"].append({
@@ -74,7 +143,7 @@ def get_sidebar_data(dml, repo, branch, dag_id=None):
     if repo:
         branch_section = {"title": "Branches", "type": "branches", "items": [], "collapsed": bool(branch)}
         try:
-            branches = dml("branch", "list")
+            branches, branch_section["cache"] = listings["branches"]
             for branch_name in branches:
                 is_current = branch == branch_name
                 branch_section['items'].append({
@@ -97,7 +166,7 @@ def get_sidebar_data(dml, repo, branch, dag_id=None):
     if repo and branch:
         dag_section = {"title": "DAGs", "type": "dags", "items": [], "collapsed": bool(dag_id)}
         try:
-            dags = dml("dag", "list")
+            dags, dag_section["cache"] = listings["dags"]
             for dag_item in dags:
                 dag_name = dag_item.get("name", dag_item["id"][:8])
                 is_current = dag_id == dag_item["id"]
@@ -130,36 +199,22 @@ def commit_route():
     # This is for non-HEAD commits that are accessed directly by commit ID
     if not branch and commit_id and repo:
         try:
-            # Create a DML instance without branch to query branches
-            temp_dml = Dml(repo=repo)
-            # Try to find which branch contains this commit
-            branches_result = temp_dml("branch", "list")
-            if branches_result and "branches" in branches_result:
-                # Try each branch to see if it contains the commit
-                for branch_name in branches_result["branches"]:
-                    try:
-                        branch_dml = Dml(repo=repo, branch=branch_name)
-                        commit_data = branch_dml("commit", "describe", commit_id)
-                        if commit_data:
-                            # Found the commit in this branch, use it
-                            branch = branch_name
-                            break
-                    except Exception:
-                        # Commit not in this branch, try next
-                        continue
+            branch = get_branch_index(repo).find_commit_branch(commit_id)
         except Exception as e:
             logger.error(f"Failed to find branch for commit {commit_id}: {e}")
     
     # Create DML instance with the determined branch (or None if not found)
-    dml = Dml(repo=repo, branch=branch)
+    dml = get_dml(repo, branch)
     
-    # Get commit data
+    # Get commit data (and the sidebar, concurrently)
+    results = gather({
+        "commit": lambda: dml("commit", "describe", commit_id) if commit_id else dml("commit", "describe"),
+        "sidebar": lambda: get_sidebar_data(dml, repo, branch),
+    })
     try:
-        if commit_id:
-            commit_data = dml("commit", "describe", commit_id)
-        else:
+        commit_data = results["commit"]
+        if not commit_id:
             # Get current commit (HEAD) if no commit_id specified
-            commit_data = dml("commit", "describe")
             commit_id = commit_data.get("id") if commit_data else None
     except Exception as e:
         logger.error(f"Failed to get commit data: {e}")
@@ -167,7 +222,7 @@ def commit_route():
     
     # Generate breadcrumbs and sidebar
     breadcrumbs = get_breadcrumbs(repo, branch, commit_id=commit_id)
-    sidebar = get_sidebar_data(dml, repo, branch)
+    sidebar = results["sidebar"]
     return render_template(
         "commit.html",
         repo=repo,
@@ -185,7 +240,7 @@ def dag_route():
     dag_id = request.args.get("dag_id")
     if not dag_id:
         return "DAG ID is required", 400
-    dml = Dml(repo=repo, branch=branch)
+    dml = get_dml(repo, branch)
     breadcrumbs = get_breadcrumbs(repo, branch, dag_id=dag_id)
     sidebar = get_sidebar_data(dml, repo, branch, dag_id=dag_id)
     return render_template(
@@ -203,11 +258,15 @@ def node_route():
     branch = request.args.get("branch")
     dag_id = request.args.get("dag_id")
     node_id = request.args.get("node_id")
-    dml = Dml(repo=repo, branch=branch)
+    dml = get_dml(repo, branch)
     # Get DAG data for breadcrumbs and sidebar
     breadcrumbs = get_breadcrumbs(repo, branch, dag_id=dag_id)
-    sidebar = get_sidebar_data(dml, repo, branch, dag_id=dag_id)
-    data = get_node_info(dml, dag_id, node_id)
+    results = gather({
+        "sidebar": lambda: get_sidebar_data(dml, repo, branch, dag_id=dag_id),
+        "data": lambda: get_node_info(dml, dag_id, node_id),
+    })
+    sidebar = results["sidebar"]
+    data = results["data"]
     return render_template(
         "node.html",
         breadcrumbs=breadcrumbs,
@@ -230,7 +289,7 @@ def main():
     elif repo:
         from flask import redirect
         return redirect(url_for("repo_route", repo=repo))
-    dml = Dml(repo=repo, branch=branch)
+    dml = get_dml(repo, branch)
     breadcrumbs = get_breadcrumbs(repo, branch)
     sidebar = get_sidebar_data(dml, repo, branch)
     return render_template("index.html", breadcrumbs=breadcrumbs, sidebar=sidebar)
@@ -240,12 +299,16 @@ def get_logs():
     """
     Fetch logs for a specific DAG with pagination.
 
+    Logs of finished DAGs are served from the local log segment store when one
+    is configured (DML_UI_LOG_SEGMENT_DB). Their pagination tokens are then
+    event indexes ("seg:<index>"), so any page can be read back from disk.
+
     Query Parameters:
     - stream: The log stream name to fetch (e.g. stdout, stderr)
     - next_token: Token for pagination
     - limit: Maximum number of log events to return
     """
-    dml = Dml(repo=request.args.get("repo"), branch=request.args.get("branch"))
+    dml = get_dml(request.args.get("repo"), request.args.get("branch"))
     dag_id = request.args.get("dag_id")
     stream = request.args.get("stream_name")
     next_token = request.args.get("next_token")
@@ -267,13 +330,23 @@ def get_logs():
     # Get the logs from CloudWatch
     logger.info(f"Fetching logs for DAG {dag_id}, stream {stream} with limit {limit}")
     cloudwatch_logs = CloudWatchLogs()
-    logs = cloudwatch_logs.get_log_events(
-        log_group_name=log_group,
-        log_stream_name=log_stream,
-        next_token=next_token,
-        limit=min(limit, 1000),  # Limit to 1000 events max
-        start_from_head=True
-    )
+    log_store = get_log_store()
+    limit = min(limit, 1000)  # Limit to 1000 events max
+    if log_store is not None and is_finished(dag_info["dag_data"]) and (not next_token or is_segment_token(next_token)):
+        start = int(next_token[len(SEGMENT_TOKEN_PREFIX):]) if next_token else 0
+        logs = cloudwatch_logs.read_stored_events(log_group, log_stream, log_store, start=start, limit=limit)
+        end = start + len(logs["events"])
+        more = not logs["complete"] or end < logs["total"]
+        logs["nextForwardToken"] = f"{SEGMENT_TOKEN_PREFIX}{end}" if more else None
+        logs["nextBackwardToken"] = f"{SEGMENT_TOKEN_PREFIX}{max(start - limit, 0)}" if start > 0 else None
+    else:
+        logs = cloudwatch_logs.get_log_events(
+            log_group_name=log_group,
+            log_stream_name=log_stream,
+            next_token=next_token,
+            limit=limit,
+            start_from_head=True
+        )
     # Add AWS region and log stream details for console link
     logs["aws_region"] = cloudwatch_logs.region
     logs["log_group"] = log_group
@@ -281,24 +354,189 @@ def get_logs():
     return jsonify(logs)
 
 
-@app.route("/api/dag", methods=["GET"])
-def api_dag_data():
+def is_segment_token(token):
+    """Check whether a /logs pagination token is a log segment store event index."""
+    return isinstance(token, str) and token.startswith(SEGMENT_TOKEN_PREFIX) and token[len(SEGMENT_TOKEN_PREFIX):].isdigit()
+
+
+def format_sse(data, event=None, event_id=None):
+    """Format one Server-Sent Events message."""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@app.route("/logs/stream", methods=["GET"])
+def stream_logs():
     """
-    API endpoint to get DAG data dynamically.
-    Returns JSON with all DAG information including nodes, edges, stats, etc.
+    Tail a DAG's log stream as Server-Sent Events.
+    The log stream is resolved once, then new events are pushed in batches
+    ("events" messages whose id is the CloudWatch forward token) as they
+    arrive. Polling backs off while the stream is idle. For finished DAGs the
+    stream ends with an "end" message once all events were sent; otherwise the
+    connection is closed after DML_UI_LOG_TAIL_TIMEOUT seconds and the browser
+    resumes from the Last-Event-ID on reconnect.
+
+    Query Parameters:
+    - dag_id: The DAG ID
+    - stream_name: The log stream name to follow (e.g. stdout, stderr)
+    - next_token: Forward token to start from (default: Last-Event-ID, or the start of the stream)
+    - repo: Repository name
+    - branch: Branch name
+    """
+    dml = get_dml(request.args.get("repo"), request.args.get("branch"))
+    dag_id = request.args.get("dag_id")
+    stream = request.args.get("stream_name")
+    next_token = request.args.get("next_token") or request.headers.get("Last-Event-ID")
+    dag_info = get_dag_info(dml, dag_id)
+    log_streams = dag_info.get("log_streams", {})
+    if stream not in log_streams:
+        error_response = {
+            "error": f"Log stream {stream} not found for DAG {dag_id}",
+            "available_streams": list(log_streams.keys())
+        }
+        return jsonify(error_response), 404
+    stream_details = log_streams[stream]
+    finished = is_finished(dag_info["dag_data"])
+    cloudwatch_logs = CloudWatchLogs()
+    log_store = get_log_store()
+    stored_range = None
+    if is_segment_token(next_token):
+        # continue a page read from the segment store: send the rest of the
+        # stored events, then tail from where the store ends
+        start = int(next_token[len(SEGMENT_TOKEN_PREFIX):])
+        next_token = None
+        if log_store is not None:
+            next_index, next_token, _ = log_store.frontier(stream_details["log_group"], stream_details["log_stream"])
+            stored_range = range(start, next_index, 1000)
+    pages = cloudwatch_logs.tail(
+        log_group_name=stream_details["log_group"],
+        log_stream_name=stream_details["log_stream"],
+        next_token=next_token,
+        min_interval=LOG_TAIL_MIN_INTERVAL,
+        max_interval=LOG_TAIL_MAX_INTERVAL,
+        timeout=LOG_TAIL_TIMEOUT,
+        stop_when_idle=finished,
+    )
+
+    def generate():
+        yield format_sse({
+            "aws_region": cloudwatch_logs.region,
+            "log_group": stream_details["log_group"],
+            "log_stream": stream_details["log_stream"],
+        }, event="meta")
+        for offset in stored_range or []:
+            events = log_store.read(stream_details["log_group"], stream_details["log_stream"], offset, 1000)
+            event_id = f"{SEGMENT_TOKEN_PREFIX}{offset + len(events)}"
+            yield format_sse({"events": events}, event="events", event_id=event_id)
+        idle = False
+        for page in pages:
+            if page.get("error"):
+                yield format_sse({"error": page["error"]}, event="end")
+                return
+            idle = not page["events"]
+            if idle:
+                # keeps proxies from timing out and detects closed connections
+                yield ": idle\n\n"
+            else:
+                yield format_sse({"events": page["events"]}, event="events", event_id=page["nextForwardToken"])
+        if finished and idle:
+            yield format_sse({}, event="end")
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route("/logs/search", methods=["GET"])
+def search_dag_logs():
+    """
+    Search a DAG's log streams server-side.
+    Runs a CloudWatch filter query over each selected stream in parallel and
+    returns the matches merged by timestamp, each tagged with its stream, plus
+    a cursor for the next page of matches.
+
+    Query Parameters:
+    - dag_id: The DAG ID
+    - pattern: CloudWatch filter pattern (terms, "quoted phrases", or JSON selectors like { $.level = "ERROR" })
+    - streams: Comma-separated stream names (default: all, e.g. stdout,stderr)
+    - start_time: Start of the time range, in milliseconds since the epoch
+    - end_time: End of the time range, in milliseconds since the epoch
+    - limit: Maximum number of matches per stream (default 100, max 1000)
+    - cursor: The cursor of the previous page
+    - repo: Repository name
+    - branch: Branch name
     """
+    dml = get_dml(request.args.get("repo"), request.args.get("branch"))
+    dag_id = request.args.get("dag_id")
+    dag_info = get_dag_info(dml, dag_id)
+    log_streams = dag_info.get("log_streams", {})
+    names = [x for x in request.args.get("streams", "").split(",") if x] or list(log_streams)
+    missing = [x for x in names if x not in log_streams]
+    if missing:
+        error_response = {
+            "error": f"Log streams {missing} not found for DAG {dag_id}",
+            "available_streams": list(log_streams.keys())
+        }
+        return jsonify(error_response), 404
     try:
-        repo = request.args.get("repo")
-        branch = request.args.get("branch")
-        dag_id = request.args.get("dag_id")
-        prune = request.args.get("prune", "false").lower() == "true"
-        if not dag_id:
-            return jsonify({"error": "dag_id parameter is required"}), 400
-        dml = Dml(repo=repo, branch=branch)
-        data = get_dag_info(dml, dag_id, prune=prune)
-        # Extract components, keeping argv for frontend
-        log_streams = data.pop("log_streams", {})
-        dag_data = data.pop("dag_data")
+        cursor = json.loads(base64.urlsafe_b64decode(request.args["cursor"])) if request.args.get("cursor") else None
+    except ValueError:
+        cursor = False
+    if cursor is False or not isinstance(cursor, (dict, type(None))) or not all(
+        isinstance(x, list) and len(x) == 2 and isinstance(x[0], (str, type(None)))
+        and isinstance(x[1], int) and x[1] >= 0
+        for x in (cursor or {}).values()
+    ):
+        return jsonify({"error": "Invalid cursor"}), 400
+    result = search_logs(
+        {x: log_streams[x] for x in names},
+        filter_pattern=request.args.get("pattern") or None,
+        start_time=request.args.get("start_time", type=int),
+        end_time=request.args.get("end_time", type=int),
+        cursor=cursor,
+        limit=max(1, min(request.args.get("limit", 100, type=int), 1000)),
+        final=is_finished(dag_info["dag_data"]),
+    )
+    if result["cursor"] is not None:
+        result["cursor"] = base64.urlsafe_b64encode(json.dumps(result["cursor"]).encode()).decode()
+    return jsonify(result)
+
+
+def get_url_templates(repo, branch, dag_id):
+    """URL templates for node and DAG links, with `{node_id}` / `{dag_id}` placeholders.
+
+    The frontend fills these in itself, so responses don't need a `url_for` call per node.
+    """
+    node_url = url_for("node_route", repo=repo, branch=branch, dag_id=dag_id, node_id="__NODE_ID__")
+    dag_url = url_for("dag_route", repo=repo, branch=branch, dag_id="__DAG_ID__")
+    return {
+        "node": node_url.replace("__NODE_ID__", "{node_id}"),
+        "dag": dag_url.replace("__DAG_ID__", "{dag_id}"),
+    }
+
+
+def build_dag_response(data, repo, branch, dag_id, fmt="compact"):
+    """Build the /api/dag response body from `get_dag_info` output.
+
+    The "compact" format sends nodes as-is (sublists are lists of node ids) along
+    with URL templates. The "columnar" and "msgpack" formats additionally send
+    nodes and edges as column tables (see `dml_ui.columnar`). The "legacy" format
+    adds a `link` to every node, a `parent_link` to fn/import nodes and
+    `[id, link]` pairs to sublists.
+    """
+    data = dict(data)
+    log_streams = data.pop("log_streams", {})
+    dag_data = data.pop("dag_data")
+    if fmt == "legacy":
+        # The DAG info may be cached, so copy instead of modifying it in place
+        dag_data = dict(dag_data)
+        dag_data["nodes"] = [dict(node) for node in dag_data["nodes"]]
         # Add node links for frontend navigation
         for node in dag_data["nodes"]:
             node["link"] = url_for(
@@ -324,18 +562,251 @@ def api_dag_data():
                         ]
                         for x in node["sublist"]
                     ]
-        # Prepare response data
-        response_data = {
-            "dag_data": dag_data,
-            "log_streams": log_streams,
-            **data  # Include script, error, result, html_uri etc.
-        }
-        return jsonify(response_data)
+    else:
+        if fmt in ["columnar", "msgpack"]:
+            dag_data = columnar_dag_data(dag_data)
+        data["urls"] = get_url_templates(repo, branch, dag_id)
+    return {
+        "dag_data": dag_data,
+        "log_streams": log_streams,
+        "format": fmt,
+        **data  # Include script, error, result, html_uri etc.
+    }
+
+
+#: Response formats of /api/dag selectable through the Accept header.
+DAG_FORMAT_MIMETYPES = {
+    "application/json": "compact",
+    "application/vnd.dml.columnar+json": "columnar",
+    "application/msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+@app.route("/api/dag", methods=["GET"])
+def api_dag_data():
+    """
+    API endpoint to get DAG data dynamically.
+    Returns JSON with all DAG information including nodes, edges, stats, etc.
+
+    Query Parameters:
+    - format: "compact" (default) sends URL templates instead of per-node links,
+      "legacy" sends the old shape with `link`, `parent_link` and `[id, link]` sublists,
+      "columnar" sends nodes and edges as dictionary-encoded column tables,
+      "msgpack" sends the columnar body as MessagePack (needs the `msgpack` package),
+      "arrow" sends one table as an Arrow IPC stream.
+      Without this parameter the format is negotiated from the Accept header.
+    - table: For format=arrow, "nodes" (default) or "edges"
+    """
+    try:
+        repo = request.args.get("repo")
+        branch = request.args.get("branch")
+        dag_id = request.args.get("dag_id")
+        prune = request.args.get("prune", "false").lower() == "true"
+        fmt = request.args.get("format")
+        if fmt is None:
+            mimetype = request.accept_mimetypes.best_match(list(DAG_FORMAT_MIMETYPES), default="application/json")
+            fmt = DAG_FORMAT_MIMETYPES[mimetype]
+        if not dag_id:
+            return jsonify({"error": "dag_id parameter is required"}), 400
+        if fmt not in ["compact", "legacy", *DAG_FORMAT_MIMETYPES.values()]:
+            return jsonify({"error": f"Unknown format: {fmt}"}), 400
+        table = request.args.get("table", "nodes")
+        if table not in ["nodes", "edges"]:
+            return jsonify({"error": f"Unknown table: {table}"}), 400
+        # DAG ids are content-addressed, so a matching ETag needs no dml call at all
+        etag = make_etag("api_dag", repo, branch, dag_id, prune, fmt, table) if is_dag_id(dag_id) else None
+        if etag and is_not_modified(etag):
+            return not_modified(etag)
+        dml = get_dml(repo, branch)
+        data = get_dag_info(dml, dag_id, prune=prune)
+        headers = {"Vary": "Accept"}
+        if fmt == "arrow":
+            payload = arrow_ipc(dag_table(data["dag_data"], table))
+            response = app.response_class(payload, mimetype="application/vnd.apache.arrow.stream", headers=headers)
+        elif fmt == "msgpack":
+            try:
+                payload = msgpack_dumps(build_dag_response(data, repo, branch, dag_id, fmt))
+            except ImportError:
+                return jsonify({"error": "msgpack format requires the msgpack package"}), 406
+            response = app.response_class(payload, mimetype="application/msgpack", headers=headers)
+        else:
+            response = jsonify(build_dag_response(data, repo, branch, dag_id, fmt))
+            response.headers.update(headers)
+            if fmt == "columnar":
+                response.mimetype = "application/vnd.dml.columnar+json"
+        # presigned HTML URLs expire, so responses containing one can't be cached for good
+        if etag and is_finished(data["dag_data"]) and not data.get("html_resource"):
+            mark_immutable(response, etag)
+        return response
     except Exception as e:
         logger.error(f"Error fetching DAG data: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/<string:kind>/plugins", methods=["GET"])
+@app.route("/api/dag/nodes", methods=["GET"])
+def api_dag_nodes():
+    """
+    API endpoint to page through a DAG's nodes, optionally within a neighborhood window.
+    Returns JSON with one page of nodes, the edges pointing into them from the
+    selection, the selection size and a cursor for the next page.
+
+    Query Parameters:
+    - dag_id, repo, branch, prune: as for /api/dag
+    - around: Node id (or "result") to center a neighborhood window on
+    - hops: Window radius (default 1 for direction=both, unbounded otherwise; -1 for unbounded)
+    - direction: Follow edges to "ancestors", "descendants" or "both"
+    - node_type: Only return nodes of this type
+    - name_prefix: Only return nodes whose name starts with this prefix
+    - limit: Page size (default 500, max 5000)
+    - cursor: The next_cursor of the previous page
+    """
+    repo = request.args.get("repo")
+    branch = request.args.get("branch")
+    dag_id = request.args.get("dag_id")
+    if not dag_id:
+        return jsonify({"error": "dag_id parameter is required"}), 400
+    prune = request.args.get("prune", "false").lower() == "true"
+    direction = request.args.get("direction", "both")
+    hops = request.args.get("hops", 1 if direction == "both" else -1, type=int)
+    limit = max(1, min(request.args.get("limit", 500, type=int), 5000))
+    query = {
+        "dag_id": dag_id,
+        "prune": prune,
+        "around": request.args.get("around"),
+        "hops": None if hops < 0 else hops,
+        "direction": direction,
+        "node_type": request.args.get("node_type"),
+        "name_prefix": request.args.get("name_prefix"),
+    }
+    try:
+        offset = decode_cursor(query, request.args["cursor"]) if request.args.get("cursor") else 0
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    etag = make_etag("api_dag_nodes", repo, branch, query, offset, limit) if is_dag_id(dag_id) else None
+    if etag and is_not_modified(etag):
+        return not_modified(etag)
+    try:
+        dml = get_dml(repo, branch)
+        dag_data = get_dag_info(dml, dag_id, prune=prune)["dag_data"]
+        index_key = (dag_data["id"], prune) if dag_data.get("id") and is_finished(dag_data) else None
+        index = get_edge_index(dag_data, key=index_key)
+        selection = select_dag_nodes(dag_data, index=index, **{k: v for k, v in query.items() if k not in ["dag_id", "prune"]})
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Error fetching DAG nodes")
+        return jsonify({"error": str(e)}), 500
+    page = selection[offset:offset + limit]
+    selected_ids = {n["id"] for n in selection}
+    edges = [x for n in page for x in index.by_target.get(n["id"], ()) if x["source"] in selected_ids]
+    next_offset = offset + len(page)
+    response = jsonify({
+        "dag_id": dag_data.get("id", dag_id),
+        "urls": get_url_templates(repo, branch, dag_id),
+        "nodes": page,
+        "edges": edges,
+        "total": len(selection),
+        "offset": offset,
+        "next_cursor": encode_cursor(query, next_offset) if next_offset < len(selection) else None,
+    })
+    if etag and is_finished(dag_data):
+        mark_immutable(response, etag)
+    return response
+
+@app.route("/api/node/value", methods=["GET"])
+def api_node_value():
+    """
+    API endpoint to page through a node's value.
+    Returns JSON with one page of the value's top-level elements, each formatted
+    as a bounded preview, so that large values can be browsed past the preview
+    shown on the node page.
+
+    Query Parameters:
+    - dag_id: The DAG ID (required)
+    - node_id: The node ID (required)
+    - repo: Repository name
+    - branch: Branch name
+    - offset: Index of the first element (default 0)
+    - limit: Number of elements (default 100, max 1000; strings are paged by 100 * limit characters)
+    """
+    repo = request.args.get("repo")
+    branch = request.args.get("branch")
+    dag_id = request.args.get("dag_id")
+    node_id = request.args.get("node_id")
+    if not dag_id or not node_id:
+        return jsonify({"error": "dag_id and node_id parameters are required"}), 400
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+    etag = make_etag("api_node_value", repo, branch, dag_id, node_id, offset, limit) if is_dag_id(dag_id) else None
+    if etag and is_not_modified(etag):
+        return not_modified(etag)
+    try:
+        val = get_node_value(get_dml(repo, branch), dag_id, node_id)
+    except Exception as e:
+        logger.exception("Error fetching node value")
+        return jsonify({"error": str(e)}), 500
+    try:
+        page = page_value(val, offset=offset, limit=limit)
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify({"dag_id": dag_id, "node_id": node_id, **page})
+    if etag:
+        mark_immutable(response, etag)
+    return response
+
+@app.route("/api/nodes", methods=["GET", "POST"])
+def api_nodes():
+    """
+    API endpoint to describe many nodes in one request.
+    Returns JSON with the `node describe` output and a bounded value preview of
+    each distinct node, keyed by node id. Nodes that fail to resolve get an
+    "error" entry instead.
+
+    Query Parameters:
+    - ids: Comma-separated node ids (or a JSON body {"ids": [...]} with POST)
+    - repo: Repository name
+    - branch: Branch name
+    - preview: Whether to include value previews (default true)
+    - preview_items: Element budget of each preview (default 20)
+    - preview_bytes: Size limit of each preview (default 2048)
+    """
+    repo = request.args.get("repo")
+    branch = request.args.get("branch")
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        node_ids = (body.get("ids") if isinstance(body, dict) else None) or []
+    else:
+        node_ids = [x for x in request.args.get("ids", "").split(",") if x]
+    if not isinstance(node_ids, list) or not node_ids:
+        return jsonify({"error": "ids parameter is required"}), 400
+    # check the types before hashing the ids to drop duplicates
+    invalid = [x for x in node_ids if not isinstance(x, str) or not is_node_id(x)]
+    if invalid:
+        return jsonify({"error": f"Invalid node ids: {invalid[:10]}"}), 400
+    node_ids = list(dict.fromkeys(node_ids))
+    if len(node_ids) > MAX_BATCH_NODES:
+        return jsonify({"error": f"At most {MAX_BATCH_NODES} node ids can be requested at once"}), 400
+    preview = request.args.get("preview", "true").lower() == "true"
+    max_items = max(1, min(request.args.get("preview_items", 20, type=int), 1000))
+    max_bytes = max(64, min(request.args.get("preview_bytes", 2048, type=int), 2**20))
+    etag = make_etag("api_nodes", repo, branch, node_ids, preview, max_items, max_bytes) if request.method == "GET" else None
+    if etag and is_not_modified(etag):
+        return not_modified(etag)
+    nodes = describe_nodes(
+        get_dml(repo, branch),
+        node_ids,
+        preview=preview,
+        max_items=max_items,
+        max_bytes=max_bytes,
+        max_concurrency=BATCH_CONCURRENCY,
+    )
+    response = jsonify({"nodes": nodes})
+    # node ids are content-addressed, so a complete answer never changes
+    if etag and not any("error" in x for x in nodes.values()):
+        mark_immutable(response, etag)
+    return response
+
+@app.route("/api/<any(dag, node):kind>/plugins", methods=["GET"])
 def api_plugins(kind):
     """
     API endpoint to list all available dashboard plugins.
@@ -344,12 +815,14 @@ def api_plugins(kind):
     logger.info(f"Fetching {kind} plugins")
     try:
         plugins_list = []
-        for _id, plugin_cls in discover_dashboard_plugins(kind).items():
+        for _id, plugin_cls in PLUGINS.get(kind).items():
             logger.info(f"Found plugin: {_id} - {plugin_cls.NAME}")
             plugins_list.append({
                 "id": _id,
                 "name": plugin_cls.NAME,
                 "description": plugin_cls.__doc__ or 'No description available',
+                "streaming": inspect.isgeneratorfunction(plugin_cls.render),
+                "progress": bool(plugin_cls.REPORTS_PROGRESS),
             })
         logger.info(f"Total {kind} plugins found: {len(plugins_list)}")
         return jsonify(plugins_list)
@@ -357,16 +830,86 @@ def api_plugins(kind):
         logger.error(f"Error loading {kind} plugins: {e}")
         return jsonify({"error": f"Failed to load {kind} plugins"}), 500
 
+def plugin_document_head(plugin_cls):
+    """Return the start of the HTML document wrapping a plugin's output in its iframe."""
+    return f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{plugin_cls.NAME}</title>
+        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+        <style>
+            body {{
+                margin: 0;
+                padding: 20px;
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            }}
+            .plugin-container {{
+                max-width: 100%;
+                overflow-x: auto;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="plugin-container">
+    """
+
+PLUGIN_DOCUMENT_TAIL = """
+        </div>
+        <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
+        <script src="https://unpkg.com/htmx.org@1.9.10"></script>
+    </body>
+    </html>
+    """
+
+def plugin_document(plugin_cls, rendered_content):
+    """Wrap the output of a plugin's `render` in a complete HTML document for its iframe."""
+    return plugin_document_head(plugin_cls) + rendered_content + PLUGIN_DOCUMENT_TAIL
+
+def stream_plugin_document(plugin_cls, render):
+    """Yield the HTML document of a streamed render: the shell first, then each chunk of `render()`.
+
+    Errors can't change the status code anymore once the shell is sent, so
+    they are rendered in place of the remaining content.
+    """
+    yield plugin_document_head(plugin_cls)
+    try:
+        result = render()
+        yield from [result] if isinstance(result, str) else result
+    except Exception as e:
+        logger.exception(f"Error streaming plugin {plugin_cls._id()}")
+        yield f"""
+        <div class="alert alert-danger">
+            <h4><i class="fas fa-exclamation-triangle"></i> Plugin Error</h4>
+            <p><strong>Plugin:</strong> {escape(plugin_cls._id())}</p>
+            <p><strong>Error:</strong> {escape(str(e))}</p>
+        </div>
+        """
+    yield PLUGIN_DOCUMENT_TAIL
+
+def streamed_html(chunks):
+    """Return a response sending HTML chunks as they are produced."""
+    response = Response(stream_with_context(chunks), mimetype="text/html")
+    # keep proxies from buffering the whole page
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 # @app.route("/api/node/plugins/<string:plugin_id>", methods=["GET"])
-@app.route("/api/<string:kind>/plugins/<string:plugin_id>", methods=["GET"])
+@app.route("/api/<any(dag, node):kind>/plugins/<string:plugin_id>", methods=["GET"])
 def api_dashboard_content(kind, plugin_id):
     """
     API endpoint to get Dashboard content for a specific plugin.
     Returns HTML content that will be embedded in an iframe.
+
+    Query Parameters:
+    - async: If 1, start rendering in the background and return the job status
+      (202) to poll at /api/plugins/jobs/<job_id> instead of the HTML
     """
     try:
         # Find the plugin by ID
-        plugin_cls = discover_dashboard_plugins(kind).get(plugin_id)
+        plugin_cls = PLUGINS.get(kind).get(plugin_id)
         if not plugin_cls:
             return f"<div style='text-align: center; padding: 50px;'><h3>{kind.capitalize()} Plugin '{plugin_id}' not found</h3></div>", 404
         
@@ -376,6 +919,7 @@ def api_dashboard_content(kind, plugin_id):
         # Remove VS Code specific parameters that shouldn't be passed to plugins
         kw.pop("id", None)
         kw.pop("vscodeBrowserReqId", None)
+        async_render = kw.pop("async", None) in ("1", "true")
         # Get method_args as a list, even if there's only one value
         method_args = request.args.getlist("method_args")
         
@@ -387,98 +931,56 @@ def api_dashboard_content(kind, plugin_id):
         if not branch and repo and dag_id:
             logger.info(f"No branch provided for plugin, trying to find branch for DAG {dag_id} in repo {repo}")
             try:
-                # Create a DML instance without branch to query branches
-                temp_dml = Dml(repo=repo)
-                # Try to find which branch contains this DAG
-                branches_result = temp_dml("branch", "list")
-                logger.info(f"Available branches result: {branches_result}")
-                if branches_result and "branches" in branches_result and branches_result["branches"]:
-                    # Try each branch to see if it contains the DAG
-                    for branch_name in branches_result["branches"]:
-                        try:
-                            logger.info(f"Trying branch: {branch_name}")
-                            branch_dml = Dml(repo=repo, branch=branch_name)
-                            # Try to load the DAG to see if it exists in this branch
-                            dag_data = branch_dml("dag", "describe", dag_id)
-                            if dag_data:
-                                # Found the DAG in this branch, use it
-                                logger.info(f"Found DAG {dag_id} in branch {branch_name}")
-                                branch = branch_name
-                                kw["branch"] = branch
-                                break
-                        except Exception as e:
-                            # DAG not in this branch, try next
-                            logger.info(f"DAG {dag_id} not found in branch {branch_name}: {e}")
-                            continue
-                    
+                index = get_branch_index(repo)
+                branch = index.find_dag_branch(dag_id)
+                if branch:
+                    logger.info(f"Found DAG {dag_id} in branch {branch}")
+                elif index.branches:
                     # If we still don't have a branch, use the first available branch as fallback
-                    if not branch:
-                        logger.warning(f"Could not find branch containing DAG {dag_id}, using first available branch as fallback")
-                        branch = branches_result["branches"][0]
-                        kw["branch"] = branch
-                        logger.info(f"Using fallback branch: {branch}")
+                    logger.warning(f"Could not find branch containing DAG {dag_id}, using first available branch as fallback")
+                    branch = index.branches[0]
                 else:
                     logger.warning(f"No branches found in repository {repo}, using 'main' as fallback")
                     # Ultimate fallback - use "main" if no branches can be listed
                     branch = "main"
-                    kw["branch"] = branch
-                    logger.info(f"Using ultimate fallback branch: {branch}")
             except Exception as e:
                 logger.error(f"Failed to find branch for DAG {dag_id}: {e}")
                 # Ultimate fallback - use "main" if all else fails
-                if not branch:
-                    branch = "main"
-                    kw["branch"] = branch
-                    logger.info(f"Exception fallback, using branch: {branch}")
+                branch = "main"
+            kw["branch"] = branch
+            logger.info(f"Using branch: {branch}")
         
         # Final safety check - ensure we always have a branch
         if not kw.get("branch"):
             kw["branch"] = "main"
             logger.info("Final safety fallback, using branch: main")
         
-        plugin_instance = plugin_cls(**kw)
         if method:
             # If a method is specified, call it with the provided arguments and return the result
-            if not hasattr(plugin_instance, method):
+            if not callable(getattr(plugin_cls, method, None)):
                 return f"<div style='text-align: center; padding: 50px;'><h3>Method '{method}' not found in {kind.capitalize()} Plugin '{plugin_id}'</h3></div>", 404
-            method_result = getattr(plugin_instance, method)(*method_args)
+            method_result = call_plugin(plugin_cls, kw, method, method_args, run=PLUGIN_POOL.run)
             # For HTMX requests, return HTML directly
+            if isinstance(method_result, Iterator):
+                return streamed_html(method_result)
             if isinstance(method_result, str):
                 return method_result, 200, {'Content-Type': 'text/html'}
             else:
                 return jsonify(method_result), 200
-        rendered_content = plugin_instance.render()
+        if async_render:
+            job = PLUGIN_JOBS.submit(plugin_cls, kw)
+            return jsonify(plugin_job_json(job)), 202
+        if inspect.isgeneratorfunction(plugin_cls.render):
+            # send the document shell before the plugin has even loaded its DAG
+            def render():
+                return call_plugin(plugin_cls, kw, run=PLUGIN_POOL.run)
+
+            return streamed_html(stream_plugin_document(plugin_cls, render))
+        rendered_content = call_plugin(plugin_cls, kw, run=PLUGIN_POOL.run)
+        if isinstance(rendered_content, Iterator):
+            return streamed_html(stream_plugin_document(plugin_cls, lambda: rendered_content))
         # Wrap content in a complete HTML document for iframe
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{plugin_cls.NAME}</title>
-            <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-            <style>
-                body {{
-                    margin: 0;
-                    padding: 20px;
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                }}
-                .plugin-container {{
-                    max-width: 100%;
-                    overflow-x: auto;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="plugin-container">
-                {rendered_content}
-            </div>
-            <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-            <script src="https://unpkg.com/htmx.org@1.9.10"></script>
-        </body>
-        </html>
-        """
-        return html_content, 200, {'Content-Type': 'text/html'}
+        return plugin_document(plugin_cls, rendered_content), 200, {'Content-Type': 'text/html'}
     except Exception as e:
         logger.error(f"Error rendering {kind.capitalize()} plugin {plugin_id}: {e}", exc_info=True)
         rendered_content = f"""
@@ -492,8 +994,79 @@ def api_dashboard_content(kind, plugin_id):
             </details>
         </div>
         """
+        if isinstance(e, PluginTimeout):
+            return rendered_content, 504
+        if isinstance(e, PluginMemoryError):
+            return rendered_content, 503
         return rendered_content, 500
 
+def plugin_job_json(job):
+    """Return the status of a background render with the URLs to poll and fetch it."""
+    out = job.to_dict()
+    out["status_url"] = url_for("api_plugin_job", job_id=job.id)
+    out["result_url"] = url_for("api_plugin_job_result", job_id=job.id)
+    return out
+
+@app.route("/api/plugins/jobs/<string:job_id>", methods=["GET"])
+def api_plugin_job(job_id):
+    """
+    API endpoint reporting the state and progress of a background plugin render.
+    """
+    job = PLUGIN_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": f"No plugin job {job_id} (it may have expired)"}), 404
+    return jsonify(plugin_job_json(job))
+
+@app.route("/api/plugins/jobs/<string:job_id>/result", methods=["GET"])
+def api_plugin_job_result(job_id):
+    """
+    API endpoint returning the HTML document of a finished background plugin render.
+    Returns the job status with 202 while it's still running.
+    """
+    job = PLUGIN_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": f"No plugin job {job_id} (it may have expired)"}), 404
+    if job.finished is None:
+        return jsonify(plugin_job_json(job)), 202
+    if job.state != "done":
+        error = job.error or "The render was cancelled"
+        return f"""
+        <div class="alert alert-danger">
+            <h4><i class="fas fa-exclamation-triangle"></i> Plugin Error</h4>
+            <p><strong>Plugin:</strong> {escape(job.call.plugin_id)}</p>
+            <p><strong>Error:</strong> {escape(error)}</p>
+        </div>
+        """, 409 if job.state == "cancelled" else 500, {'Content-Type': 'text/html'}
+    cached = PLUGIN_JOBS.result(job)
+    if cached is None:
+        return jsonify({"error": f"The result of plugin job {job_id} has expired, render it again"}), 410
+    return plugin_document(job.plugin_cls, cached["result"]), 200, {'Content-Type': 'text/html'}
+
+@app.route("/api/plugins/jobs/<string:job_id>/cancel", methods=["POST"])
+def api_plugin_job_cancel(job_id):
+    """
+    API endpoint to cancel a queued or running background plugin render.
+    """
+    if not PLUGIN_JOBS.cancel(job_id):
+        return jsonify({"error": f"No unfinished plugin job {job_id}"}), 404
+    return jsonify(plugin_job_json(PLUGIN_JOBS.get(job_id)))
+
+@app.route("/api/plugins/calls", methods=["GET"])
+def api_plugin_calls():
+    """
+    API endpoint listing the plugin calls queued for or running in worker processes.
+    """
+    return jsonify({"calls": PLUGIN_POOL.calls(), "stats": PLUGIN_POOL.stats()})
+
+@app.route("/api/plugins/calls/<string:call_id>/cancel", methods=["POST"])
+def api_plugin_call_cancel(call_id):
+    """
+    API endpoint to cancel a queued or running plugin call (its worker is restarted).
+    """
+    if not PLUGIN_POOL.cancel(call_id):
+        return jsonify({"error": f"No plugin call {call_id}"}), 404
+    return jsonify({"cancelled": call_id})
+
 @app.route("/repo")
 def repo_route():
     repo = request.args.get("repo")
@@ -502,7 +1075,7 @@ def repo_route():
         return "Repository is required", 400
     
     # For repo view, we don't need a specific branch context
-    dml = Dml(repo=repo) if not branch else Dml(repo=repo, branch=branch)
+    dml = get_dml(repo, branch)
     breadcrumbs = get_breadcrumbs(repo, branch)
     sidebar = get_sidebar_data(dml, repo, branch)
     
@@ -529,7 +1102,7 @@ def get_commit_log():
     
     try:
         # We create Dml with repo only to get all commits from all branches
-        dml = Dml(repo=repo)
+        dml = get_dml(repo)
         # Call dml commit log with JSON output to get all commits
         commits = dml("commit", "log", "--output", "json")
         return jsonify(commits)
@@ -537,11 +1110,57 @@ def get_commit_log():
         logger.error(f"Failed to get commit log: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/cache", methods=["GET"])
+def api_cache_stats():
+    """
+    API endpoint reporting size and hit/miss counters for the server side caches.
+    """
+    return jsonify(cache_stats())
+
+@app.route("/api/cache/clear", methods=["POST"])
+def api_cache_clear():
+    """
+    API endpoint to clear server side caches, e.g. after pushing new commits.
+
+    Query Parameters:
+    - name: Name of the cache to clear (default: all caches)
+    """
+    name = request.args.get("name")
+    if name is not None and name not in CACHES:
+        return jsonify({"error": f"Unknown cache: {name}"}), 404
+    for cache_name, cache in CACHES.items():
+        if name in [None, cache_name]:
+            cache.clear()
+    return jsonify(cache_stats())
+
+@app.route("/api/plugins/reload", methods=["POST"])
+def api_plugins_reload():
+    """
+    API endpoint to rescan the dashboard plugin entry points.
+    Returns JSON with the registered plugin ids and load failures by group.
+
+    Query Parameters:
+    - kind: Plugin group to reload, e.g. dag or node (default: all)
+    """
+    kind = request.args.get("kind")
+    if kind is not None and kind not in PLUGINS.groups:
+        return jsonify({"error": f"Unknown plugin kind: {kind}"}), 404
+    PLUGINS.reload(kind)
+    return jsonify(PLUGINS.stats())
+
+@app.after_request
+def compress(response):
+    """Compress text responses according to the client's Accept-Encoding."""
+    return compress_response(response)
+
 @app.errorhandler(404)
 def page_not_found(error):
     """Custom 404 error handler"""
     return render_template("404.html"), 404
 
+# build the plugin registry at startup rather than on the first plugin request
+PLUGINS.load(*PLUGINS.groups)
+
 def run():
     parser = ArgumentParser()
     parser.add_argument("-p", "--port", type=int, default=5000)
@@ -0,0 +1,204 @@
+"""
+DaggerML UI Log Segment Store
+
+Optional on-disk (SQLite) store of CloudWatch log events for streams that can't
+change anymore (those of finished DAGs). Each stream is stored as a contiguous
+run of compressed segments from its first event, so any range of events can be
+read back by index without calling CloudWatch again.
+
+Enable it by pointing ``DML_UI_LOG_SEGMENT_DB`` at a database file.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from dml_ui.cache import CACHES, env_int
+
+logger = logging.getLogger(__name__)
+
+#: Number of in-process locks that fetches of different streams are spread over.
+LOCK_STRIPES = 64
+
+
+class LogSegmentStore:
+    """Size-bounded store of log stream segments in a SQLite database.
+
+    For every stream the store keeps the index and CloudWatch forward token of
+    the first event not stored yet (its frontier), and whether the end of the
+    stream was reached. When the stored size exceeds `max_bytes`, the least
+    recently read streams are deleted.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file (created if missing).
+    max_bytes : int
+        Maximum total compressed size of all segments.
+    name : str
+        Name used to register the store's statistics in `CACHES`.
+    """
+
+    def __init__(self, path, max_bytes=1 << 30, name="log_segments"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS streams ("
+                "grp TEXT NOT NULL, stream TEXT NOT NULL, next_index INTEGER NOT NULL, next_token TEXT, "
+                "complete INTEGER NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL, "
+                "PRIMARY KEY (grp, stream))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "grp TEXT NOT NULL, stream TEXT NOT NULL, start INTEGER NOT NULL, count INTEGER NOT NULL, "
+                "events BLOB NOT NULL, PRIMARY KEY (grp, stream, start))"
+            )
+        CACHES[name] = self
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other worker processes proceed during writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lock(self, group, stream):
+        """Return the in-process lock serializing fetches of one stream.
+
+        Streams share a fixed set of locks by hash, so the number of locks
+        doesn't grow with the number of streams ever fetched.
+        """
+        return self._locks[hash((group, stream)) % len(self._locks)]
+
+    def frontier(self, group, stream):
+        """Return ``(next_index, next_token, complete)`` for a stream (``(0, None, False)`` if unknown)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT next_index, next_token, complete FROM streams WHERE grp = ? AND stream = ?", (group, stream)
+            ).fetchone()
+        if row is None:
+            return 0, None, False
+        return row[0], row[1], bool(row[2])
+
+    def append(self, group, stream, start, events, next_token, complete):
+        """Store the events fetched from the frontier at `start` and move the frontier past them."""
+        blob = zlib.compress(json.dumps(events, separators=(",", ":")).encode()) if events else None
+        size = len(blob) if blob else 0
+        with self._connect() as conn:
+            (index,) = conn.execute(
+                "SELECT COALESCE(MAX(next_index), 0) FROM streams WHERE grp = ? AND stream = ?", (group, stream)
+            ).fetchone()
+            if index != start:
+                # another worker got here first
+                return
+            if blob:
+                conn.execute(
+                    "INSERT OR IGNORE INTO segments (grp, stream, start, count, events) VALUES (?, ?, ?, ?, ?)",
+                    (group, stream, start, len(events), blob),
+                )
+            conn.execute(
+                "INSERT INTO streams (grp, stream, next_index, next_token, complete, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (grp, stream) DO UPDATE SET "
+                "next_index = excluded.next_index, next_token = excluded.next_token, complete = excluded.complete, "
+                "size = size + excluded.size, accessed = excluded.accessed",
+                (group, stream, start + len(events), next_token, int(complete), size, time.time()),
+            )
+            self.writes += 1
+            self._evict(conn)
+
+    def read(self, group, stream, start, limit):
+        """Return the stored events with indexes in ``[start, start + limit)``."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT start, events FROM segments WHERE grp = ? AND stream = ? AND start < ? AND start + count > ? "
+                "ORDER BY start",
+                (group, stream, start + limit, start),
+            ).fetchall()
+            conn.execute("UPDATE streams SET accessed = ? WHERE grp = ? AND stream = ?", (time.time(), group, stream))
+        events = []
+        for seg_start, blob in rows:
+            seg = json.loads(zlib.decompress(blob))
+            events.extend(seg[max(start - seg_start, 0):start + limit - seg_start])
+        if events:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return events
+
+    def _evict(self, conn):
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM streams").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        for group, stream, size in conn.execute("SELECT grp, stream, size FROM streams ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            conn.execute("DELETE FROM segments WHERE grp = ? AND stream = ?", (group, stream))
+            conn.execute("DELETE FROM streams WHERE grp = ? AND stream = ?", (group, stream))
+            excess -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Delete all segments and reset the counters."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM segments")
+            conn.execute("DELETE FROM streams")
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of store statistics."""
+        try:
+            with self._connect() as conn:
+                streams, nbytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM streams").fetchone()
+        except sqlite3.Error:
+            streams = nbytes = None
+        return {
+            "name": self.name,
+            "path": self.path,
+            "streams": streams,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_log_store():
+    """Return the shared log segment store, or None if `DML_UI_LOG_SEGMENT_DB` is not set."""
+    global _store
+    if _store is None and os.getenv("DML_UI_LOG_SEGMENT_DB"):
+        with _store_lock:
+            if _store is None:
+                _store = LogSegmentStore(
+                    os.environ["DML_UI_LOG_SEGMENT_DB"],
+                    max_bytes=env_int("DML_UI_LOG_SEGMENT_MAX_BYTES", 1 << 30),
+                )
+    return _store
+
+
+def set_log_store(store):
+    """Replace the shared log segment store (None disables it)."""
+    global _store
+    _store = store
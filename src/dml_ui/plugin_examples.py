@@ -1,6 +1,8 @@
 import logging
+from html import escape
 
 from dml_ui.plugins import DagDashboardPlugin, NodeDashboardPlugin
+from dml_ui.util import preview_value
 
 logger = logging.getLogger(__name__)
 
@@ -8,6 +10,7 @@ logger = logging.getLogger(__name__)
 class ExampleDagPlugin(DagDashboardPlugin):
     """Educational DAG dashboard demonstrating DAG operations, backend methods, and data visualization."""
     NAME = "DAG Operations Tutorial"
+    CACHEABLE = True
 
     def render(self):
         dag_id = self.dag._ref.to if hasattr(self.dag, '_ref') else 'Unknown'
@@ -349,6 +352,7 @@ def analyze_dag_stats(self):
 class ExampleNodePlugin(NodeDashboardPlugin):
     """An example node dashboard showing node-level information."""
     NAME = "Example Node Dashboard"
+    CACHEABLE = True
 
     def render(self):
         node_id = self.node.ref.to if hasattr(self.node, 'ref') else 'Unknown'
@@ -357,7 +361,7 @@ class ExampleNodePlugin(NodeDashboardPlugin):
         node_type = "Unknown"
         try:
             # Access the node's value
-            node_value = str(self.node.value())[:200] + ("..." if len(str(self.node.value())) > 200 else "")
+            node_value = preview_value(self.node.value(), max_items=20, max_bytes=200)["text"]
             # Get node metadata - we need the DAG ID for this
             if hasattr(self, '_current_dag_id'):
                 dag_data = self.dml("dag", "describe", self._current_dag_id)
@@ -399,7 +403,7 @@ class ExampleNodePlugin(NodeDashboardPlugin):
                             <div class="row mt-3">
                                 <div class="col-12">
                                     <h6>Node Value Preview</h6>
-                                    <pre class="bg-light p-2 rounded" style="max-height: 200px; overflow-y: auto;">{node_value}</pre>
+                                    <pre class="bg-light p-2 rounded" style="max-height: 200px; overflow-y: auto;">{escape(node_value)}</pre>
                                 </div>
                             </div>
                         </div>
@@ -1,14 +1,53 @@
 import importlib.metadata
 import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
 
+from daggerml.core import Dag, Node
 from flask import url_for
-from daggerml.core import Dag, Dml, Node
+
+from dml_ui.cache import CACHES, LRUCache, env_int
+from dml_ui.pool import get_dml
 
 logger = logging.getLogger(__name__)
 
+#: Output of `render` and method calls of cacheable plugins.
+PLUGIN_RESULT_CACHE = LRUCache(
+    "plugin_results",
+    max_items=env_int("DML_UI_PLUGIN_CACHE_ITEMS", 1024),
+    max_bytes=env_int("DML_UI_PLUGIN_CACHE_BYTES", 128 * 2**20),
+)
+#: Streamed renders larger than this are passed through without being cached.
+PLUGIN_STREAM_CACHE_BYTES = env_int("DML_UI_PLUGIN_STREAM_CACHE_BYTES", 16 * 2**20)
+#: Plugin groups, each read from the ``dml_ui.dashboard.<group>`` entry points.
+PLUGIN_GROUPS = ("dag", "node")
+
 class DashboardPlugin:
-    """Base dashboard plugin class."""
+    """Base dashboard plugin class.
+
+    `self.dml` is a pooled handle, so node values read through it (including
+    ``node.value()`` on nodes of `self.dag`) come from the shared node value
+    cache. Treat them as read-only.
+
+    Set `CACHEABLE` if the output of `render` and of the methods called through
+    `method_call_url` depends only on the plugin's arguments. Their results are
+    then cached for DAG ids (not names), for `CACHE_TTL` seconds if set, and
+    until `VERSION` changes.
+
+    Set `REPORTS_PROGRESS` if `render` calls `progress`. The UI then renders
+    the dashboard as a background job and polls it for progress. Jobs live in
+    the memory of the server process that started them, so this needs a
+    single-process server (or sticky sessions).
+    """
     NAME = None
+    CACHEABLE = False
+    REPORTS_PROGRESS = False
+    CACHE_TTL = None
+    VERSION = None
+    _progress = None
 
     @classmethod
     def _id(cls):
@@ -16,9 +55,22 @@ class DashboardPlugin:
         return f"{cls.__module__}:{cls.__name__}"
 
     def render(self):
-        """Return HTML content for the dashboard."""
+        """Return HTML content for the dashboard.
+
+        May also yield the HTML in chunks (or return an iterator of them), which
+        are sent to the browser as they are produced.
+        """
         raise NotImplementedError
 
+    def progress(self, fraction=None, message=None):
+        """Report the progress of a long `render` (a fraction in [0, 1] and/or a message).
+
+        Shown in the UI while the dashboard is rendered as a background job
+        (see `REPORTS_PROGRESS`); ignored otherwise.
+        """
+        if self._progress is not None:
+            self._progress(fraction, message)
+
     def url_for(self, obj):
         """Returns the URL for the provided DAG or Node object.
         
@@ -37,7 +89,7 @@ class DagDashboardPlugin(DashboardPlugin):
         self.repo = repo
         self.branch = branch
         self.dag_id = dag_id
-        self.dml = Dml(repo=repo, branch=branch)
+        self.dml = get_dml(repo, branch)
         self.dag = self.dml.load(dag_id)
 
     def method_call_url(self, method_name, *args):
@@ -59,7 +111,7 @@ class NodeDashboardPlugin(DashboardPlugin):
         self.branch = branch
         self.dag_id = dag_id
         self.node_id = node_id
-        self.dml = Dml(repo=repo, branch=branch)
+        self.dml = get_dml(repo, branch)
         self.dag = self.dml.load(dag_id)
         self.node = self.dag[node_id]
 
@@ -77,8 +129,94 @@ class NodeDashboardPlugin(DashboardPlugin):
             # method_args=args,
         )
 
-def discover_dashboard_plugins(group):
-    """Discover all available plugins for a given group"""
+def plugin_cache_key(plugin_cls, kw, method=None, args=()):
+    """Return the result cache key of a plugin call, or None if it can't be cached."""
+    dag_id = kw.get("dag_id") or ""
+    if not plugin_cls.CACHEABLE or not dag_id.startswith("dag/"):
+        return None
+    # the DAG is immutable, but the HTML embeds URLs (`method_call_url`) of its branch
+    extra = tuple(sorted((k, v) for k, v in kw.items() if k not in ("repo", "branch", "dag_id", "node_id")))
+    return (
+        plugin_cls._id(),
+        plugin_cls.VERSION,
+        kw.get("repo"),
+        kw.get("branch"),
+        dag_id,
+        kw.get("node_id"),
+        method,
+        tuple(args),
+        extra,
+    )
+
+
+def cached_plugin_result(key):
+    """Return the unexpired `PLUGIN_RESULT_CACHE` entry ``{"result", "expires"}`` under `key`, or None."""
+    cached = PLUGIN_RESULT_CACHE.get(key)
+    if cached is not None and (cached["expires"] is None or cached["expires"] > time.time()):
+        return cached
+    return None
+
+
+def store_plugin_result(key, result, ttl=None):
+    """Cache a plugin result under `key`, for `ttl` seconds if given."""
+    expires = None if ttl is None else time.time() + ttl
+    size = len(result) if isinstance(result, str) else None
+    return PLUGIN_RESULT_CACHE.set(key, {"result": result, "expires": expires}, size=size)
+
+
+def run_plugin(plugin_cls, kw, method=None, args=(), progress=None):
+    """Return ``plugin_cls(**kw).render()``, or the result of ``method(*args)`` if given.
+
+    `progress(fraction, message)` receives the plugin's `progress` reports.
+    """
+    plugin = plugin_cls(**kw)
+    plugin._progress = progress
+    return getattr(plugin, method)(*args) if method else plugin.render()
+
+
+def call_plugin(plugin_cls, kw, method=None, args=(), run=run_plugin):
+    """Return the result of ``run(plugin_cls, kw, method, args)``, through the result cache.
+
+    Results of cacheable plugins are served from `PLUGIN_RESULT_CACHE`, in which
+    case the plugin isn't instantiated (nor its DAG loaded) at all. Exceptions
+    are not cached. Pass ``run=PLUGIN_POOL.run`` to compute results in a
+    worker process.
+    """
+    key = plugin_cache_key(plugin_cls, kw, method, args)
+    if key is not None:
+        cached = cached_plugin_result(key)
+        if cached is not None:
+            return cached["result"]
+    result = run(plugin_cls, kw, method, args)
+    if key is not None:
+        if isinstance(result, Iterator):
+            return _cache_stream(key, result, plugin_cls.CACHE_TTL)
+        store_plugin_result(key, result, plugin_cls.CACHE_TTL)
+    return result
+
+
+def _cache_stream(key, chunks, ttl):
+    """Pass `chunks` through, caching their concatenation once the stream completes."""
+    parts, size = [], 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > PLUGIN_STREAM_CACHE_BYTES:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        store_plugin_result(key, "".join(parts), ttl)
+
+
+def discover_dashboard_plugins(group, failures=None):
+    """Discover all available plugins for a given group
+
+    This scans the entry points of every installed distribution, so use
+    `PLUGINS.get(group)` instead on request paths. Load errors are logged and,
+    if a `failures` dict is given, recorded in it by entry point name.
+    """
     plugins = {}
     for entry_point in importlib.metadata.entry_points(group=f"dml_ui.dashboard.{group}"):
         try:
@@ -86,4 +224,109 @@ def discover_dashboard_plugins(group):
             plugins[plugin_cls._id()] = plugin_cls
         except Exception as e:
             logger.warning(f"Failed to load plugin from entry point {entry_point.name}: {e}")
-    return plugins
\ No newline at end of file
+            if failures is not None:
+                failures[entry_point.name] = f"{type(e).__name__}: {e}"
+    return plugins
+
+
+class PluginRegistry:
+    """Dashboard plugin classes by group, discovered once and then looked up by id.
+
+    A group is scanned on first use (or by `load`), and rescanned by `reload`,
+    or automatically when a directory on `sys.path` changes (a distribution was
+    installed or removed). Already imported plugin modules are not re-imported.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the registry's statistics in `CACHES`.
+    check_interval : float
+        Minimum seconds between two `sys.path` mtime checks. Zero disables
+        automatic reloads.
+    groups : tuple of str
+        The known groups. Others raise `KeyError`, so that group names taken
+        from URLs can't grow the registry.
+    """
+
+    def __init__(self, name="plugins", check_interval=5, groups=PLUGIN_GROUPS):
+        self.name = name
+        self.check_interval = check_interval
+        self.groups = tuple(groups)
+        self.plugins = {}
+        self.failures = {}
+        self.loaded_at = {}
+        self.reloads = 0
+        self._signature = None
+        self._checked_at = 0
+        self._lock = threading.RLock()
+        CACHES[name] = self
+
+    @staticmethod
+    def _path_signature():
+        out = []
+        for path in sys.path:
+            try:
+                out.append(os.stat(path or ".").st_mtime_ns)
+            except OSError:
+                out.append(None)
+        return tuple(out)
+
+    def _check(self):
+        if self.check_interval <= 0 or time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        signature = self._path_signature()
+        if self._signature is not None and signature != self._signature:
+            logger.info("Installed distributions changed, reloading dashboard plugins")
+            self.reload()
+        self._signature = signature
+
+    def load(self, *groups):
+        """Scan the entry points of `groups` (again)."""
+        with self._lock:
+            if self._signature is None:
+                self._signature = self._path_signature()
+                self._checked_at = time.monotonic()
+            for group in groups:
+                if group not in self.groups:
+                    raise KeyError(f"Unknown plugin group: {group}")
+                failures = {}
+                self.plugins[group] = discover_dashboard_plugins(group, failures)
+                self.failures[group] = failures
+                self.loaded_at[group] = time.time()
+                logger.info(f"Loaded {len(self.plugins[group])} {group} plugins ({len(failures)} failed)")
+
+    def get(self, group):
+        """Return the plugin classes of `group` by plugin id (`KeyError` for unknown groups)."""
+        self._check()
+        plugins = self.plugins.get(group)
+        if plugins is None:
+            with self._lock:
+                if group not in self.plugins:
+                    self.load(group)
+                plugins = self.plugins[group]
+        return plugins
+
+    def reload(self, group=None):
+        """Rescan `group`, or all groups loaded so far."""
+        with self._lock:
+            self.load(*([group] if group is not None else list(self.plugins)))
+            self.reloads += 1
+
+    def clear(self):
+        """Rescan all loaded groups."""
+        self.reload()
+
+    def stats(self):
+        """Return a dictionary of registry statistics, including load failures."""
+        return {
+            "name": self.name,
+            "groups": {k: sorted(v) for k, v in self.plugins.items()},
+            "failures": self.failures,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+        }
+
+
+#: The process-wide plugin registry.
+PLUGINS = PluginRegistry(check_interval=env_int("DML_UI_PLUGIN_RELOAD_INTERVAL", 5))
\ No newline at end of file
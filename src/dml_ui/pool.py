@@ -0,0 +1,159 @@
+"""
+DaggerML UI Dml Handle Pool
+
+Keeps one reusable `Dml` handle per (repo, branch) instead of constructing a new
+one in every route, plugin and branch probe. Handles read node values through a
+process-wide cache, since node values are immutable.
+"""
+
+import json
+import logging
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+from daggerml import Dml, Error
+from daggerml.util import kwargs2opts, raise_ex
+
+from dml_ui.cache import CACHES, LRUCache, env_int, json_sizeof
+from dml_ui.fanout import remaining_time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+#: Node values by node id, shared by all handles (and the DAGs and nodes loaded from them).
+NODE_VALUE_CACHE = LRUCache(
+    "node_values",
+    max_items=env_int("DML_UI_NODE_VALUE_CACHE_ITEMS", 4096),
+    max_bytes=env_int("DML_UI_NODE_VALUE_CACHE_BYTES", 256 * 2**20),
+)
+#: Values larger than this (estimated JSON size) are loaded every time instead of cached.
+NODE_VALUE_MAX_BYTES = env_int("DML_UI_NODE_VALUE_MAX_BYTES", 16 * 2**20)
+
+
+class CachingDml(Dml):
+    """`Dml` handle whose `get_node_value` reads through `NODE_VALUE_CACHE`.
+
+    `Dag` and `Node` objects loaded from the handle inherit it, so
+    ``dml.load(dag_id)[node_id].value()`` is cached too. Cached values are
+    shared and must not be mutated.
+
+    Inside a `gather` call, `dml` subprocesses are killed when the call times
+    out, and raise `TimeoutError`.
+    """
+
+    def __call__(self, *args, input=None, as_text=False):
+        timeout = remaining_time()
+        if timeout is None:
+            return super().__call__(*args, input=input, as_text=as_text)
+        # same as `Dml.__call__`, with a timeout on the subprocess
+        argv = [shutil.which("dml"), *kwargs2opts(**self.kwargs), *args]
+        try:
+            resp = subprocess.run(argv, check=False, capture_output=True, text=True, input=input, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            raise TimeoutError(f"dml {' '.join(args[:2])} killed after {timeout:.1f}s") from e
+        if resp.returncode != 0:
+            raise_ex(Error(resp.stderr or "DML command failed", origin="dml", type="CliError"))
+        if resp.stderr:
+            logger.error(resp.stderr.rstrip())
+        try:
+            return resp.stdout or "" if as_text else json.loads(resp.stdout or "null")
+        except json.decoder.JSONDecodeError:
+            return resp.stdout
+
+    def get_node_value(self, ref, cache=True):
+        """Return the value of the node `ref`. Pass ``cache=False`` to bypass the cache."""
+        key = getattr(ref, "to", None)
+        if not cache or not isinstance(key, str):
+            return super().__getattr__("get_node_value")(ref)
+        value = NODE_VALUE_CACHE.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = super().__getattr__("get_node_value")(ref)
+        size = json_sizeof(value)
+        if size <= NODE_VALUE_MAX_BYTES:
+            NODE_VALUE_CACHE.set(key, value, size=size)
+        else:
+            logger.debug(f"Not caching value of {key}: {size} bytes")
+        return value
+
+
+class DmlPool:
+    """Thread-safe registry of `Dml` handles keyed by (repo, branch).
+
+    Handles are stateless wrappers around the `dml` CLI, so one handle can be
+    shared by concurrent requests.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the pool's metrics in `CACHES`.
+    max_items : int
+        Maximum number of handles kept; the least recently used is evicted.
+    max_age : float
+        Seconds after which a handle is replaced with a fresh one.
+    """
+
+    def __init__(self, name="dml_pool", max_items=64, max_age=3600):
+        self.name = name
+        self.max_items = max_items
+        self.max_age = max_age
+        self.hits = 0
+        self.creations = 0
+        self.evictions = 0
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, repo=None, branch=None):
+        """Return the shared `Dml` handle for `repo` and `branch`."""
+        key = (repo, branch)
+        now = time.monotonic()
+        with self._lock:
+            item = self._handles.get(key)
+            if item is not None and now - item[1] <= self.max_age:
+                self._handles.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                self.evictions += 1
+            dml = CachingDml(repo=repo, branch=branch)
+            self._handles[key] = (dml, now)
+            self._handles.move_to_end(key)
+            self.creations += 1
+            while len(self._handles) > self.max_items:
+                self._handles.popitem(last=False)
+                self.evictions += 1
+            return dml
+
+    def clear(self):
+        """Drop all handles and reset the counters."""
+        with self._lock:
+            self._handles.clear()
+            self.hits = self.creations = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of pool statistics."""
+        return {
+            "name": self.name,
+            "items": len(self._handles),
+            "max_items": self.max_items,
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "creations": self.creations,
+            "evictions": self.evictions,
+        }
+
+
+DML_POOL = DmlPool(
+    max_items=env_int("DML_UI_DML_POOL_SIZE", 64),
+    max_age=env_int("DML_UI_DML_POOL_MAX_AGE", 3600),
+)
+
+
+def get_dml(repo=None, branch=None):
+    """Return the pooled `Dml` handle for `repo` and `branch`."""
+    return DML_POOL.get(repo, branch)
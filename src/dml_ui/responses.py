@@ -0,0 +1,140 @@
+"""
+DaggerML UI Response Helpers
+
+Conditional-GET (ETag/304) handling for responses derived from immutable
+DaggerML ids, and negotiated gzip/brotli compression of text responses.
+"""
+
+import gzip
+import hashlib
+import importlib.metadata
+import json
+import logging
+from pathlib import Path
+
+from flask import current_app, request
+
+from dml_ui.cache import env_int
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, fall back to gzip only
+    brotli = None
+
+
+def _source_fingerprint():
+    """Hash the package's code and templates, standing in for a version when there is none."""
+    root = Path(__file__).parent
+    digest = hashlib.sha1()
+    for path in sorted([*root.glob("*.py"), *root.glob("templates/**/*")]):
+        if path.is_file():
+            digest.update(path.relative_to(root).as_posix().encode())
+            digest.update(path.read_bytes())
+    return f"src-{digest.hexdigest()[:16]}"
+
+
+try:
+    APP_VERSION = importlib.metadata.version("dml-ui")
+except importlib.metadata.PackageNotFoundError:
+    APP_VERSION = None
+
+#: Part of every ETag, so that responses change when their format does.
+ETAG_VERSION = APP_VERSION or _source_fingerprint()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+#: Without a released version the code can change under the same ETag prefix
+#: at any time, so clients revalidate (and get a cheap 304) instead.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+CACHE_CONTROL = IMMUTABLE_CACHE_CONTROL if APP_VERSION else REVALIDATE_CACHE_CONTROL
+
+#: Responses smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = env_int("DML_UI_MIN_COMPRESS_SIZE", 1024)
+GZIP_LEVEL = env_int("DML_UI_GZIP_LEVEL", 5)
+BROTLI_QUALITY = env_int("DML_UI_BROTLI_QUALITY", 4)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+    "application/vnd.dml.columnar+json",
+    "text/css",
+    "text/html",
+    "text/plain",
+}
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the ids and parameters that fully determine a response.
+
+    The app version (or a fingerprint of the source, when running from a
+    checkout) is included so that responses change when their format does.
+    """
+    key = json.dumps([ETAG_VERSION, *parts], default=str)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def is_not_modified(etag):
+    """Check whether the request's If-None-Match matches `etag` (or a compressed variant)."""
+    if not request.if_none_match:
+        return False
+    return any(request.if_none_match.contains(x) for x in [etag, f"{etag}-gzip", f"{etag}-br"])
+
+
+def not_modified(etag):
+    """Return an empty 304 response for `etag`."""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def mark_immutable(response, etag):
+    """Set `etag` and an immutable Cache-Control on a successful response.
+
+    The response is only marked immutable for a released version; otherwise
+    clients are asked to revalidate it.
+    """
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def compress_response(response):
+    """Compress a response with brotli or gzip, depending on the request's Accept-Encoding.
+
+    Streamed, passthrough, already encoded, small and non-text responses are left
+    alone. A strong ETag gets an encoding suffix, since the bytes differ.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"]:
+        encoding = "br"
+    elif accept["gzip"]:
+        encoding = "gzip"
+    else:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    if encoding == "br":
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
@@ -0,0 +1,205 @@
+"""
+DaggerML UI Snapshot Store
+
+Optional on-disk (SQLite) store for processed `get_dag_info` payloads of
+immutable DAG ids. The database can be shared by all workers on a host, so a
+restarted or cold worker doesn't have to re-describe popular DAGs.
+
+Enable it by pointing ``DML_UI_SNAPSHOT_DB`` at a database file.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from argparse import ArgumentParser
+
+from dml_ui.cache import CACHES, env_int
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Size-bounded key/value store of JSON snapshots in a SQLite database.
+
+    Values are stored zlib-compressed. When the stored size exceeds
+    `max_bytes`, the least recently read snapshots are deleted.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file (created if missing).
+    max_bytes : int
+        Maximum total compressed size of all snapshots.
+    name : str
+        Name used to register the store's statistics in `CACHES`.
+    """
+
+    def __init__(self, path, max_bytes=1 << 30, name="snapshots"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_accessed ON snapshots (accessed)")
+        CACHES[name] = self
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            dirname = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(dirname, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other worker processes proceed during writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        """Return the snapshot stored under `key`, or `default`."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM snapshots WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE snapshots SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read snapshot {key}: {e}")
+            return default
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key, value):
+        """Store `value` (JSON-serializable) under `key`, evicting old snapshots if needed."""
+        blob = zlib.compress(json.dumps(value, default=str, separators=(",", ":")).encode())
+        if len(blob) > self.max_bytes:
+            return False
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), time.time()),
+                )
+                self.writes += 1
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write snapshot {key}: {e}")
+            return False
+        return True
+
+    def _evict(self, conn):
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM snapshots").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        for key, size in conn.execute("SELECT key, size FROM snapshots ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            conn.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+            excess -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Delete all snapshots and reset the counters."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshots")
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of store statistics."""
+        try:
+            with self._connect() as conn:
+                items, nbytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM snapshots").fetchone()
+        except sqlite3.Error:
+            items = nbytes = None
+        return {
+            "name": self.name,
+            "path": self.path,
+            "items": items,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Return the shared snapshot store, or None if `DML_UI_SNAPSHOT_DB` is not set."""
+    global _store
+    if _store is None and os.getenv("DML_UI_SNAPSHOT_DB"):
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(
+                    os.environ["DML_UI_SNAPSHOT_DB"],
+                    max_bytes=env_int("DML_UI_SNAPSHOT_MAX_BYTES", 1 << 30),
+                )
+    return _store
+
+
+def set_snapshot_store(store):
+    """Replace the shared snapshot store (None disables it)."""
+    global _store
+    _store = store
+
+
+def warm():
+    """Pre-populate the snapshot store with the DAGs of the most recent commits."""
+    from dml_ui.branches import get_branch_index
+    from dml_ui.pool import get_dml
+    from dml_ui.util import get_dag_info
+
+    parser = ArgumentParser(description=warm.__doc__)
+    parser.add_argument("--repo", required=True, help="Repository to read the commit log from")
+    parser.add_argument("-n", "--commits", type=int, default=20, help="Number of recent commits to warm")
+    parser.add_argument("--db", default=os.getenv("DML_UI_SNAPSHOT_DB"), help="Snapshot database path")
+    args = parser.parse_args()
+    if not args.db:
+        parser.error("--db or DML_UI_SNAPSHOT_DB is required")
+    logging.basicConfig(level=logging.INFO)
+    store = get_snapshot_store()
+    if store is None or store.path != args.db:
+        store = SnapshotStore(args.db, max_bytes=env_int("DML_UI_SNAPSHOT_MAX_BYTES", 1 << 30))
+        set_snapshot_store(store)
+    # one log walk serves both the branch index and the choice of commits;
+    # only the commits being warmed are described
+    commits = get_dml(args.repo)("commit", "log", "--output", "json") or []
+    index = get_branch_index(args.repo)
+    index.refresh(force=True, log=commits, dags=False)
+    commits = sorted(commits, key=lambda x: x.get("created") or "", reverse=True)[:args.commits]
+    dag_ids = {}
+    for commit in commits:
+        commit_branch = index.find_commit_branch(commit["id"])
+        try:
+            commit_data = get_dml(args.repo, commit_branch)("commit", "describe", commit["id"])
+        except Exception as e:
+            logger.warning(f"Failed to describe commit {commit['id']}: {e}", exc_info=True)
+            continue
+        for dag_id in (commit_data.get("dags") or {}).values():
+            dag_ids.setdefault(dag_id, commit_branch)
+    for dag_id, dag_branch in dag_ids.items():
+        try:
+            get_dag_info(get_dml(args.repo, dag_branch), dag_id)
+            logger.info(f"Warmed {dag_id}")
+        except Exception as e:
+            logger.warning(f"Failed to warm {dag_id}: {e}", exc_info=True)
+    print(json.dumps(store.stats()))
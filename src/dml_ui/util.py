@@ -5,19 +5,85 @@ Provides utility functions for processing and formatting DAG data for the web in
 Handles node filtering, resource resolution, and data transformation for UI components.
 """
 
+import base64
+import hashlib
+import json
 import logging
 import re
+from collections import defaultdict
 from pprint import pformat
 
 from daggerml import Error, Resource
 from daggerml.core import Ref
 
-from dml_util.aws.s3 import S3Store
+from dml_ui.aws import presigned_html_url
+from dml_ui.cache import LRUCache, env_int
+from dml_ui.fanout import gather
+from dml_ui.store import get_snapshot_store
 
 logger = logging.getLogger(__name__)
 
+#: Processed `get_dag_info` output for committed DAGs, keyed by resolved DAG id.
+DAG_INFO_CACHE = LRUCache(
+    "dag_info",
+    max_items=env_int("DML_UI_DAG_CACHE_ITEMS", 256),
+    max_bytes=env_int("DML_UI_DAG_CACHE_BYTES", 256 * 2**20),
+)
 
-def filter_nodes(nodes, edges):
+#: Edge indexes for cached DAG data, sized by edge count.
+EDGE_INDEX_CACHE = LRUCache(
+    "edge_index",
+    max_items=env_int("DML_UI_DAG_CACHE_ITEMS", 256),
+    max_bytes=env_int("DML_UI_EDGE_INDEX_MAX_EDGES", 2_000_000),
+)
+
+#: `node describe` output by node id (node ids are content-addressed, so entries never go stale).
+NODE_DESCRIBE_CACHE = LRUCache(
+    "node_describe",
+    max_items=env_int("DML_UI_NODE_DESCRIBE_CACHE_ITEMS", 16384),
+    max_bytes=env_int("DML_UI_NODE_DESCRIBE_CACHE_BYTES", 64 * 2**20),
+)
+
+#: Maximum number of elements (across all nesting levels) shown in a value preview.
+PREVIEW_ITEMS = env_int("DML_UI_PREVIEW_ITEMS", 200)
+#: Maximum size in bytes of a formatted value preview.
+PREVIEW_BYTES = env_int("DML_UI_PREVIEW_BYTES", 64 * 2**10)
+#: Maximum number of characters of a single string shown in a value preview.
+PREVIEW_STRING = env_int("DML_UI_PREVIEW_STRING", 2000)
+
+
+class EdgeIndex:
+    """One-pass adjacency index over DAG edges.
+
+    Edges are grouped by target, by source and by edge type, each group
+    keeping the original edge order, so that lookups are linear in the
+    number of matching edges rather than in the size of the DAG.
+
+    Parameters
+    ----------
+    edges : list of dict
+        List of edge dictionaries with ``source``, ``target`` and ``type`` keys.
+    """
+
+    def __init__(self, edges):
+        self.by_target = defaultdict(list)
+        self.by_source = defaultdict(list)
+        self.by_type = defaultdict(list)
+        for edge in edges:
+            self.by_target[edge["target"]].append(edge)
+            self.by_source[edge["source"]].append(edge)
+            self.by_type[edge["type"]].append(edge)
+
+    def sources(self, target, edge_type=None):
+        """Return the sources of edges pointing at `target`, optionally of one type."""
+        return [x["source"] for x in self.by_target.get(target, ()) if edge_type is None or x["type"] == edge_type]
+
+    def targets(self, source, edge_type=None):
+        """Return the targets of edges coming from `source`, optionally of one type."""
+        return [x["target"] for x in self.by_source.get(source, ()) if edge_type is None or x["type"] == edge_type]
+
+
+def filter_nodes(nodes, edges, index=None):
     """Filter out internal DML nodes to show only user-relevant nodes.
 
     Parameters
@@ -26,25 +92,141 @@ def filter_nodes(nodes, edges):
         List of node dictionaries.
     edges : list of dict
         List of edge dictionaries.
+    index : EdgeIndex, optional
+        Prebuilt index of `edges`, built on demand if not provided.
 
     Returns
     -------
     tuple of (list, list)
         Filtered nodes and edges with DML internal nodes removed.
     """
+    index = EdgeIndex(edges) if index is None else index
+    dml_ids = {n["id"] for n in nodes if n["node_type"] == "dml"}
     filtered_nodes = []
     filtered_edges = []
     for node in nodes:
-        if node["node_type"] == "dml":
+        if node["id"] in dml_ids:
             continue
         filtered_nodes.append(node)
-        for edge in edges:
-            if edge["source"] == node["id"]:
-                filtered_edges.append(edge)
-    filtered_edges = [edge for edge in filtered_edges if edge["target"] not in [n["id"] for n in nodes if n["node_type"] == "dml"]]
+        filtered_edges.extend(x for x in index.by_source.get(node["id"], ()) if x["target"] not in dml_ids)
     return filtered_nodes, filtered_edges
 
 
+def annotate_nodes(dag_data, index=None):
+    """Add ``sublist`` (fn arguments) and ``parent`` (DAG id) to fn and import nodes.
+
+    Parameters
+    ----------
+    dag_data : dict
+        Output of ``dml("dag", "describe", ...)``, modified in place.
+    index : EdgeIndex, optional
+        Prebuilt index of the DAG's edges, built on demand if not provided.
+
+    Returns
+    -------
+    EdgeIndex
+        The edge index used, so callers can reuse it.
+    """
+    index = EdgeIndex(dag_data["edges"]) if index is None else index
+    for node in dag_data["nodes"]:
+        if node["node_type"] in ["import", "fn"]:
+            if node["node_type"] == "fn":
+                node["sublist"] = index.sources(node["id"], "node")
+            (node["parent"],) = index.sources(node["id"], "dag")
+    return index
+
+
+def get_edge_index(dag_data, key=None):
+    """Return an `EdgeIndex` for `dag_data`, cached under `key` when one is given."""
+    index = EDGE_INDEX_CACHE.get(key) if key is not None else None
+    if index is None:
+        index = EdgeIndex(dag_data["edges"])
+        if key is not None:
+            # the index holds references to the (already cached) edges, so count it by edge count
+            EDGE_INDEX_CACHE.set(key, index, size=len(dag_data["edges"]))
+    return index
+
+
+def select_dag_nodes(dag_data, index=None, around=None, hops=1, direction="both", node_type=None, name_prefix=None):
+    """Select a window of a DAG's nodes, keeping their original order.
+
+    Parameters
+    ----------
+    dag_data : dict
+        Output of ``dml("dag", "describe", ...)``.
+    index : EdgeIndex, optional
+        Prebuilt index of the DAG's edges, built on demand if not provided.
+    around : str, optional
+        Node id to center a neighborhood on, or ``"result"`` for the DAG result.
+    hops : int, optional
+        Neighborhood radius around `around`. None means unbounded.
+    direction : str
+        Follow edges to ``"ancestors"`` (sources), ``"descendants"`` (targets) or ``"both"``.
+    node_type : str, optional
+        Only keep nodes of this node type.
+    name_prefix : str, optional
+        Only keep nodes whose name starts with this prefix.
+
+    Returns
+    -------
+    list of dict
+        The selected nodes.
+    """
+    if direction not in ["both", "ancestors", "descendants"]:
+        raise ValueError(f"Invalid direction: {direction}")
+    nodes = dag_data["nodes"]
+    if around is not None:
+        if around == "result":
+            around = dag_data.get("result")
+        node_ids = {n["id"] for n in nodes}
+        if around not in node_ids:
+            raise KeyError(f"Node {around} not found in DAG")
+        index = EdgeIndex(dag_data["edges"]) if index is None else index
+        seen = {around}
+        frontier = [around]
+        depth = 0
+        while frontier and (hops is None or depth < hops):
+            neighbors = []
+            for node_id in frontier:
+                if direction != "descendants":
+                    neighbors.extend(index.sources(node_id))
+                if direction != "ancestors":
+                    neighbors.extend(index.targets(node_id))
+            frontier = [x for x in dict.fromkeys(neighbors) if x in node_ids and x not in seen]
+            seen.update(frontier)
+            depth += 1
+        nodes = [n for n in nodes if n["id"] in seen]
+    if node_type:
+        nodes = [n for n in nodes if n["node_type"] == node_type]
+    if name_prefix:
+        nodes = [n for n in nodes if (n.get("name") or "").startswith(name_prefix)]
+    return nodes
+
+
+def encode_cursor(query, offset):
+    """Encode a pagination cursor tying `offset` to the query it belongs to."""
+    digest = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()[:16]
+    return base64.urlsafe_b64encode(f"{digest}:{offset}".encode()).decode()
+
+
+def decode_cursor(query, cursor):
+    """Decode a cursor produced by `encode_cursor` for the same `query` into an offset.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed or was issued for a different query.
+    """
+    try:
+        _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset = int(offset)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if offset < 0 or encode_cursor(query, offset) != cursor:
+        raise ValueError("Cursor does not match this query")
+    return offset
+
+
 def get_sub(resource):
     """Recursively resolve resource substitutions to get the final resource."""
     while (sub := (resource.data or {}).get("sub")) is not None:
@@ -52,14 +234,126 @@ def get_sub(resource):
     return resource
 
 
+class _Elided:
+    """Stand-in for the parts of a value left out of a preview."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return self.text
+
+
+def _truncate(val, state, depth):
+    # `state` is shared across the recursion: the remaining element budget and
+    # whether anything was left out
+    if isinstance(val, (str, bytes)):
+        if len(val) <= PREVIEW_STRING:
+            return val
+        state["truncated"] = True
+        return _Elided(f"{val[:PREVIEW_STRING]!r}... <{len(val) - PREVIEW_STRING} more characters>")
+    if not isinstance(val, (list, tuple, set, frozenset, dict)):
+        return val
+    if depth <= 0:
+        state["truncated"] = state["truncated"] or len(val) > 0
+        return _Elided("{...}" if isinstance(val, dict) else "[...]")
+    out = []
+    items = val.items() if isinstance(val, dict) else val
+    for item in items:
+        if state["items"] <= 0:
+            break
+        state["items"] -= 1
+        if isinstance(val, dict):
+            out.append((item[0], _truncate(item[1], state, depth - 1)))
+        else:
+            out.append(_truncate(item, state, depth - 1))
+    if len(out) < len(val):
+        state["truncated"] = True
+        more = _Elided(f"<{len(val) - len(out)} more items>")
+        out.append(("...", more) if isinstance(val, dict) else more)
+    if isinstance(val, dict):
+        return dict(out)
+    return tuple(out) if isinstance(val, tuple) else out
+
+
+def preview_value(val, max_items=None, max_bytes=None, depth=3):
+    """Format a bounded preview of a node value.
+
+    Only the first `max_items` elements (counted across all nesting levels, in
+    depth-first order) and the first `PREVIEW_STRING` characters of each string
+    are formatted, so the cost is independent of the size of `val`.
+
+    Parameters
+    ----------
+    val : Any
+        The value to preview.
+    max_items : int, optional
+        Element budget, defaults to `PREVIEW_ITEMS`.
+    max_bytes : int, optional
+        Size limit of the formatted text, defaults to `PREVIEW_BYTES`.
+    depth : int
+        Nesting depth past which collections are shown as ``[...]``.
+
+    Returns
+    -------
+    dict
+        ``text`` (the formatted preview), ``truncated`` (whether anything was
+        left out) and, for collections and strings, ``length``.
+    """
+    max_items = PREVIEW_ITEMS if max_items is None else max_items
+    max_bytes = PREVIEW_BYTES if max_bytes is None else max_bytes
+    state = {"items": max_items, "truncated": False}
+    text = pformat(_truncate(val, state, depth), depth=depth)
+    truncated = state["truncated"]
+    if len(text) > max_bytes:
+        text = text.encode()[:max_bytes].decode(errors="ignore") + "\n... <truncated>"
+        truncated = True
+    out = {"text": text, "truncated": truncated}
+    if isinstance(val, (str, bytes, list, tuple, set, frozenset, dict)):
+        out["length"] = len(val)
+    return out
+
+
+def page_value(val, offset=0, limit=100):
+    """Return one page of the top-level elements of a collection (or characters of a string).
+
+    Each element is formatted with `preview_value`, keyed by its index (or by
+    its key, for dicts).
+    """
+    if isinstance(val, (str, bytes)):
+        limit *= 100
+        chunk = val[offset:offset + limit]
+        items = [{"key": offset, "text": chunk if isinstance(chunk, str) else repr(chunk)}] if chunk else []
+    elif isinstance(val, dict):
+        keys = list(val)[offset:offset + limit]
+        items = [{"key": k, "text": preview_value(val[k])["text"]} for k in keys]
+    elif isinstance(val, (list, tuple)):
+        items = [{"key": i, "text": preview_value(x)["text"]} for i, x in enumerate(val[offset:offset + limit], offset)]
+    elif isinstance(val, (set, frozenset)):
+        # sets have no stable order across processes, so page a sorted copy
+        ordered = sorted(val, key=repr)[offset:offset + limit]
+        items = [{"key": i, "text": preview_value(x)["text"]} for i, x in enumerate(ordered, offset)]
+    else:
+        raise TypeError(f"Values of type {type(val).__name__} can't be paged")
+    next_offset = min(offset + limit, len(val))
+    return {
+        "offset": offset,
+        "limit": limit,
+        "total": len(val),
+        "items": items,
+        "next_offset": next_offset if next_offset < len(val) else None,
+    }
+
+
 def get_node_repr(dag, node_id):
     """Get a comprehensive representation of a DAG node for display in the UI.
 
     Returns a dictionary containing script content, HTML URIs, stack traces,
-    formatted values, and argument details for the specified node.
+    a bounded preview of the value (see `preview_value`), and argument details
+    for the specified node.
     """
-    val = dag[node_id].value()
-    stack_trace = html_uri = script = None
+    val = dag.dml.get_node_value(Ref(node_id)) if is_node_id(node_id) else dag[node_id].value()
+    stack_trace = html_uri = html_resource = script = None
     if isinstance(val, Error):
         try:
             stack_trace = "\n".join([x.strip() for x in val.context["trace"] if x.strip()])
@@ -69,57 +363,155 @@ def get_node_repr(dag, node_id):
         script = (get_sub(val[0]).data or {}).get("script")
     elif isinstance(val, Resource):
         script = (get_sub(val).data or {}).get("script")
-        s3 = S3Store()
-        if re.match(r"^s3://.*\.html$", val.uri) and s3.exists(val):
-            bucket, key = s3.parse_uri(val)
-            html_uri = s3.client.generate_presigned_url(
-                "get_object",
-                Params={
-                    "Bucket": bucket,
-                    "Key": key,
-                    "ResponseContentDisposition": "inline",
-                    "ResponseContentType": "text/html",
-                },
-                ExpiresIn=3600,  # URL expires in 1 hour
-            )
+        if re.match(r"^s3://.*\.html$", val.uri):
+            html_resource = val.uri
+            html_uri = presigned_html_url(val)
     
     # Check if this is an argv node and parse the arguments
     # Argv nodes typically contain lists of basic Python types (strings, numbers, etc.)
     argv_elements = []
-    if isinstance(val, list) and len(val) > 0:
+    if isinstance(val, list) and 0 < len(val) <= PREVIEW_ITEMS:
         # Check if this looks like command line arguments
         if all(isinstance(item, (str, int, float, bool)) for item in val):
             argv_elements = val
     
+    preview = preview_value(val)
     return {
         "script": script,
         "html_uri": html_uri,
+        "html_resource": html_resource,
         "stack_trace": stack_trace,
-        "value": pformat(val, depth=3),
+        "value": preview["text"],
+        "value_truncated": preview["truncated"],
+        "value_length": preview.get("length"),
         "argv_elements": argv_elements,
     }
 
 
+def is_node_id(node_id):
+    """Check whether `node_id` is a node id (as opposed to a node name)."""
+    return isinstance(node_id, str) and node_id.startswith("node/")
+
+
+def get_node_value(dml, dag_id, node_id):
+    """Return the value of a node, given its id or its name in `dag_id`.
+
+    Node ids are read directly (through the handle's node value cache) without
+    loading the DAG.
+    """
+    if is_node_id(node_id):
+        return dml.get_node_value(Ref(node_id))
+    return dml.load(dag_id)[node_id].value()
+
+
+def is_dag_id(dag_id):
+    """Check whether `dag_id` is a resolved (content-addressed) DAG id rather than a name."""
+    return isinstance(dag_id, str) and dag_id.startswith("dag/")
+
+
+def is_finished(dag_data):
+    """Check whether described DAG data is final (has a result or an error)."""
+    return dag_data.get("result") is not None or bool(dag_data.get("error"))
+
+
 def get_dag_info(dml, dag_id, prune=False):
     """Retrieve comprehensive information about a DAG for display in the UI.
 
     Gathers all necessary data about a DAG including its structure, nodes,
     edges, environment information, and log streams.
+
+    DAG ids are content-addressed, so the output for a finished DAG is cached by
+    its resolved id in `DAG_INFO_CACHE`, and in the on-disk snapshot store when
+    one is configured. With `prune=True` the DAG data is passed
+    through `prune_dag_data`, and that result is cached as a separate entry. The
+    returned dictionary may be shared between requests and must not be modified
+    by callers.
+
+    Presigned HTML URLs expire, so they are refreshed (through the presigned
+    URL cache) on every call rather than served from the cached output.
     """
-    out = {"dag_data": dml("dag", "describe", dag_id)}
-    dag_data = out["dag_data"]
+    out = _get_dag_info(dml, dag_id, prune)
+    if out.get("html_resource"):
+        out = {**out, "html_uri": presigned_html_url(Resource(out["html_resource"]))}
+    return out
+
+
+def _get_dag_info(dml, dag_id, prune):
+    dag_data = None
+    key = dag_id
+    if not is_dag_id(dag_id):
+        # names can move, so resolve them to an id before consulting the cache
+        dag_data = dml("dag", "describe", dag_id)
+        key = dag_data.get("id") or dag_id
+    cacheable = is_dag_id(key)
+    if prune and cacheable:
+        out = DAG_INFO_CACHE.get((key, "pruned"))
+        if out is not None:
+            return out
+    out = DAG_INFO_CACHE.get(key) if cacheable else None
+    store = get_snapshot_store() if cacheable else None
+    if out is None and store is not None:
+        out = store.get(key)
+        if out is not None:
+            DAG_INFO_CACHE.set(key, out)
+    if out is None:
+        out = describe_dag(dml, dag_id, dag_data)
+        cacheable = cacheable and is_finished(out["dag_data"])
+        if cacheable:
+            DAG_INFO_CACHE.set(key, out)
+            if store is not None:
+                store.set(key, out)
+    if prune:
+        out = {**out, "dag_data": prune_dag_data(out["dag_data"])}
+        if cacheable:
+            DAG_INFO_CACHE.set((key, "pruned"), out)
+    return out
+
+
+def prune_dag_data(dag_data):
+    """Remove prunable nodes and edges from DAG data without modifying it.
+
+    Nodes marked ``prunable`` are dropped along with any edge touching them.
+    Remaining prunable edges are redirected to their ``prune_source`` when they
+    have one, and dropped otherwise.
+
+    Parameters
+    ----------
+    dag_data : dict
+        Output of ``dml("dag", "describe", ...)``.
+
+    Returns
+    -------
+    dict
+        A copy of `dag_data` with pruned ``nodes`` and ``edges``.
+    """
+    if not dag_data or dag_data.get("nodes") is None or dag_data.get("edges") is None:
+        return dag_data
+    pruned_ids = {node["id"] for node in dag_data["nodes"] if node.get("prunable") is True}
+    edges = []
+    for edge in dag_data["edges"]:
+        if edge["source"] in pruned_ids or edge["target"] in pruned_ids:
+            continue
+        if edge.get("prunable") is True:
+            if edge.get("prune_source"):
+                edges.append({**edge, "source": edge["prune_source"], "prunable": False})
+        else:
+            edges.append(edge)
+    nodes = [node for node in dag_data["nodes"] if node["id"] not in pruned_ids]
+    return {**dag_data, "nodes": nodes, "edges": edges}
+
+
+def describe_dag(dml, dag_id, dag_data=None):
+    """Build the (uncached) `get_dag_info` output, optionally reusing a `dag describe` result."""
+    if dag_data is None:
+        dag_data = dml("dag", "describe", dag_id)
+    out = {"dag_data": dag_data}
     
     # Debug logging
-    print(f"DEBUG: DAG {dag_id} has {len(dag_data.get('nodes', []))} nodes")
-    print(f"DEBUG: DAG result node: {dag_data.get('result')}")
+    logger.debug(f"DAG {dag_id} has {len(dag_data.get('nodes', []))} nodes")
+    logger.debug(f"DAG result node: {dag_data.get('result')}")
     
-    for node in dag_data["nodes"]:
-        if node["node_type"] in ["import", "fn"]:
-            if node["node_type"] == "fn":
-                node["sublist"] = [
-                    x["source"] for x in dag_data["edges"] if x["type"] == "node" and x["target"] == node["id"]
-                ]
-            (node["parent"],) = [x["source"] for x in dag_data["edges"] if x["type"] == "dag" and x["target"] == node["id"]]
+    annotate_nodes(dag_data)
     if dag_data.get("argv"):
         node = dml.get_node_value(Ref(dag_data["argv"]))
         out["script"] = (get_sub(node[0]).data or {}).get("script")
@@ -129,11 +521,11 @@ def get_dag_info(dml, dag_id, prune=False):
     # Extract result, error, and stack trace information
     if dag_data.get("result") is not None:
         val = dag_data["result"]
-        print(f"DEBUG: Processing result node {val}")
+        logger.debug(f"Processing result node {val}")
         tmp = get_node_repr(dag, val)
-        print(f"DEBUG: Result node repr keys: {list(tmp.keys())}")
+        logger.debug(f"Result node repr keys: {list(tmp.keys())}")
         # Extract individual components
-        for field in ["value", "stack_trace", "script", "html_uri"]:
+        for field in ["value", "stack_trace", "script", "html_uri", "html_resource"]:
             if tmp.get(field) is not None:
                 if field == "value":
                     # The result value is stored under the "result" key
@@ -141,20 +533,20 @@ def get_dag_info(dml, dag_id, prune=False):
                         # If there's a stack trace, this indicates an error
                         out["error"] = tmp["value"]
                         out["stack_trace"] = tmp["stack_trace"]
-                        print("DEBUG: Found error in result node")
+                        logger.debug("Found error in result node")
                     else:
                         # No stack trace means this is a successful result
                         out["result"] = tmp["value"]
-                        print("DEBUG: Found successful result")
+                        logger.debug("Found successful result")
                 else:
                     out[field] = tmp[field]
     if dag_data.get("error"):
         out["error"] = str(dag_data["error"])
-        print(f"DEBUG: Found error in DAG description: {out['error']}")
+        logger.debug(f"Found error in DAG description: {out['error']}")
     
-    print(f"DEBUG: Final out keys: {list(out.keys())}")
+    logger.debug(f"Final out keys: {list(out.keys())}")
     try:
-        env_data, = [dag[node["id"]].value() for node in dag_data["nodes"] if node["name"] == ".dml/env"]
+        env_data, = [dml.get_node_value(Ref(node["id"])) for node in dag_data["nodes"] if node["name"] == ".dml/env"]
         log_group = env_data["log_group"]
         out["log_streams"] = {k: {"log_group": log_group, "log_stream": env_data[f"log_{k}"]} for k in ["stdout", "stderr"]}
     except Exception as e:
@@ -163,11 +555,71 @@ def get_dag_info(dml, dag_id, prune=False):
     return out
 
 
+def describe_node(dml, node_id):
+    """Return `dml("node", "describe", node_id)`, cached for node ids in `NODE_DESCRIBE_CACHE`."""
+    if not is_node_id(node_id):
+        return dml("node", "describe", node_id)
+    out = NODE_DESCRIBE_CACHE.get(node_id)
+    if out is None:
+        out = dml("node", "describe", node_id)
+        if out is not None:
+            NODE_DESCRIBE_CACHE.set(node_id, out)
+    return out
+
+
+def describe_nodes(dml, node_ids, preview=True, max_items=20, max_bytes=2048, max_concurrency=8):
+    """Describe many nodes at once, with optional bounded previews of their values.
+
+    Parameters
+    ----------
+    dml : Dml
+        Handle used for the `dml` calls.
+    node_ids : list of str
+        Node ids. Duplicates are resolved once.
+    preview : bool
+        Whether to include a `preview_value` of each node's value.
+    max_items, max_bytes : int
+        Limits of each preview.
+    max_concurrency : int
+        Maximum number of nodes resolved at the same time.
+
+    Returns
+    -------
+    dict
+        ``{node_id: {"description": ..., "preview": ...}}``, or
+        ``{node_id: {"error": ...}}`` for nodes that could not be resolved.
+    """
+    def resolve(node_id):
+        out = {"description": describe_node(dml, node_id)}
+        if preview:
+            out["preview"] = preview_value(dml.get_node_value(Ref(node_id)), max_items=max_items, max_bytes=max_bytes)
+        return out
+
+    node_ids = list(dict.fromkeys(node_ids))
+    results = gather({x: (lambda x=x: resolve(x)) for x in node_ids}, max_concurrency=max_concurrency)
+    out = {}
+    for node_id in node_ids:
+        error = results.failed(node_id)
+        if error is not None:
+            logger.warning(f"Failed to describe node {node_id}: {error}")
+            out[node_id] = {"error": str(error)}
+        else:
+            out[node_id] = results[node_id]
+    return out
+
+
 def get_node_info(dml, dag_id, node_id):
-    """Retrieve detailed information about a specific node in a DAG."""
-    node_data = get_node_repr(dml.load(dag_id), node_id)
+    """Retrieve detailed information about a specific node in a DAG.
+
+    The node value and its description are fetched concurrently.
+    """
+    results = gather({
+        "repr": lambda: get_node_repr(dml.load(dag_id), node_id),
+        "description": lambda: describe_node(dml, node_id),
+    })
+    node_data = results["repr"]
     try:
-        node_description = dml("node", "describe", node_id)
+        node_description = results["description"]
         if node_description and "argv" in node_description:
             argv_elements = []
             for i, arg in enumerate(node_description["argv"] or []):
@@ -0,0 +1,670 @@
+"""
+DaggerML UI Plugin Workers
+
+Optionally runs dashboard plugin renders and method calls in a pool of
+long-lived worker processes instead of on the request thread, so CPU-heavy
+plugins (plotting, large value processing) neither block a request worker nor
+hold the GIL of the web process. Each worker keeps its own `Dml` handle pool
+and node value cache warm between calls.
+
+The pool is opt-in: set ``DML_UI_PLUGIN_WORKERS`` to the number of worker
+processes. By default plugins run inline, on the request thread, where none of
+the limits below apply.
+
+Every call run in a worker has a wall-clock deadline (queueing included) and an
+RSS limit, and can be cancelled; a worker that exceeds either, or is cancelled
+mid-call, is killed and replaced. Once a streamed render sent its first chunk,
+the deadline is replaced by an idle timeout between chunks, so long pages can
+keep streaming as long as they make progress.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import copy_current_request_context, has_request_context, request
+
+from dml_ui.cache import CACHES, env_int
+from dml_ui.plugins import (
+    cached_plugin_result,
+    call_plugin,
+    plugin_cache_key,
+    run_plugin,
+    store_plugin_result,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Number of worker processes (0, the default, runs plugins on the request thread).
+PLUGIN_WORKERS = env_int("DML_UI_PLUGIN_WORKERS", 0)
+#: Seconds a plugin call may take, including the wait for a free worker. For a
+#: streamed render this covers the time until its first chunk.
+PLUGIN_TIMEOUT = env_int("DML_UI_PLUGIN_TIMEOUT", 60)
+#: Seconds a streamed render may take between two chunks (after the first one).
+PLUGIN_STREAM_TIMEOUT = env_int("DML_UI_PLUGIN_STREAM_TIMEOUT", 60)
+#: Resident memory in bytes above which a worker is killed (0 disables the limit).
+PLUGIN_MAX_RSS = env_int("DML_UI_PLUGIN_MAX_RSS", 2 << 30)
+#: Seconds a background render job may take, including the wait for a free worker.
+PLUGIN_JOB_TIMEOUT = env_int("DML_UI_PLUGIN_JOB_TIMEOUT", 900)
+#: Seconds finished jobs (and results of non-cacheable plugins) are kept for polling clients.
+PLUGIN_JOB_TTL = env_int("DML_UI_PLUGIN_JOB_TTL", 600)
+
+
+class PluginError(Exception):
+    """A plugin call failed in a worker process."""
+
+
+class PluginTimeout(PluginError, TimeoutError):
+    """A plugin call did not finish before its deadline."""
+
+
+class PluginMemoryError(PluginError, MemoryError):
+    """A worker exceeded the RSS limit while running a plugin call."""
+
+
+class PluginCancelled(PluginError):
+    """A plugin call was cancelled."""
+
+
+def _rss(pid):
+    """Return the resident set size of process `pid` in bytes, or None if unknown."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn, max_rss):
+    # the parent handles interrupts and kills workers when it exits
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from dml_ui.impl import app
+
+    def progress(fraction, message):
+        conn.send(("progress", fraction, message))
+
+    while True:
+        try:
+            plugin_cls, kw, method, args, base_url = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            # plugins build links with url_for, which needs a request context
+            with app.test_request_context(base_url=base_url):
+                result = run_plugin(plugin_cls, kw, method, args, progress=progress)
+                if isinstance(result, Iterator):
+                    # a streamed render: pass the chunks on as they are produced
+                    for chunk in result:
+                        conn.send(("chunk", str(chunk)))
+                    conn.send(("end",))
+                else:
+                    conn.send(("ok", result))
+        except Exception as e:
+            logger.debug(f"Plugin call failed in worker {os.getpid()}", exc_info=True)
+            conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+        if max_rss and (_rss(os.getpid()) or 0) > max_rss:
+            # memory is rarely given back to the OS, so start over
+            return
+
+
+class _Worker:
+    def __init__(self, ctx, max_rss):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, max_rss), daemon=True, name="dml-ui-plugin")
+        self.process.start()
+        child.close()
+        self.calls = 0
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class PluginCall:
+    """A plugin call submitted to a `PluginWorkerPool` (queued or running)."""
+
+    def __init__(self, plugin_id, kw, method=None):
+        self.id = uuid.uuid4().hex
+        self.plugin_id = plugin_id
+        self.kw = kw
+        self.method = method
+        self.state = "queued"
+        self.submitted = time.time()
+        self.started = None
+        self.cancelled = False
+        self.progress = None
+        self.message = None
+
+    def set_progress(self, fraction=None, message=None):
+        """Record a progress report of the plugin."""
+        if fraction is not None:
+            self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = str(message)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "plugin_id": self.plugin_id,
+            "dag_id": self.kw.get("dag_id"),
+            "node_id": self.kw.get("node_id"),
+            "method": self.method,
+            "state": self.state,
+            "submitted": self.submitted,
+            "started": self.started,
+            "progress": self.progress,
+            "message": self.message,
+        }
+
+
+class PluginWorkerPool:
+    """Pool of worker processes running plugin calls one at a time each.
+
+    Workers are started on first use (or by `start`) and replaced when they
+    die, time out, exceed `max_rss` or are cancelled. Calls wait in FIFO order
+    for a free worker.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the pool's metrics in `CACHES`.
+    workers : int
+        Number of worker processes. Zero runs calls in the calling thread,
+        where `timeout`, `stream_timeout`, `max_rss` and `cancel` have no effect.
+    timeout : float
+        Default wall-clock limit of a call in seconds, queueing included (up to
+        the first chunk, for streamed renders).
+    stream_timeout : float
+        Seconds a streamed render may take between two chunks.
+    max_rss : int
+        Resident memory limit of a worker in bytes (0 disables it).
+    start_method : str
+        `multiprocessing` start method. "spawn" avoids forking a threaded server.
+    poll_interval : float
+        Seconds between deadline, memory and cancellation checks of a running call.
+    """
+
+    def __init__(
+        self,
+        name="plugin_workers",
+        workers=0,
+        timeout=60,
+        stream_timeout=60,
+        max_rss=2 << 30,
+        start_method="spawn",
+        poll_interval=0.05,
+    ):
+        self.name = name
+        self.size = workers
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.max_rss = max_rss
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = []
+        self._live = 0
+        self._calls = {}
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self.max_queued = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.memory_kills = 0
+        self.cancellations = 0
+        self.crashes = 0
+        self.spawned = 0
+        self.runs = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        CACHES[name] = self
+        if workers <= 0:
+            logger.warning(
+                f"Plugin pool {name} has no workers: plugins run on the request thread without "
+                "timeouts, memory limits or cancellation (set DML_UI_PLUGIN_WORKERS to enable them)"
+            )
+
+    def start(self):
+        """Start all workers now instead of on the first calls."""
+        with self._cond:
+            missing = self.size - self._live
+            self._live += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            worker = self._spawn()
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify_all()
+
+    def _spawn(self):
+        try:
+            worker = _Worker(self._ctx, self.max_rss)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify_all()
+            raise
+        self.spawned += 1
+        return worker
+
+    def _acquire(self, call, deadline):
+        with self._cond:
+            self._waiting.append(call)
+            self.max_queued = max(self.max_queued, len(self._waiting))
+            try:
+                while True:
+                    if call.cancelled:
+                        self.cancellations += 1
+                        raise PluginCancelled(f"Plugin call {call.id} was cancelled")
+                    # first come, first served
+                    if self._waiting[0] is call:
+                        if self._idle:
+                            worker = self._idle.pop()
+                            if worker.alive():
+                                return worker
+                            self._live -= 1
+                            continue
+                        if self._live < self.size:
+                            self._live += 1
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PluginTimeout(f"No plugin worker became available within {self.timeout}s")
+                    self._cond.wait(min(remaining, 1))
+            finally:
+                self._waiting.remove(call)
+                self._cond.notify_all()
+        return self._spawn()
+
+    def _release(self, worker):
+        with self._cond:
+            if worker is not None and worker.alive():
+                self._idle.append(worker)
+            else:
+                self._live -= 1
+            self._cond.notify_all()
+
+    def run(self, plugin_cls, kw, method=None, args=(), timeout=None, call=None):
+        """Return ``plugin_cls(**kw).render()`` (or ``method(*args)``) computed in a worker.
+
+        Has the signature of `dml_ui.plugins.run_plugin`, so it can be passed
+        to `call_plugin`. Results that are iterators (streamed renders) come
+        back as an iterator over the chunks as the worker produces them; the
+        worker is busy until it is exhausted or closed. `timeout` applies until
+        the first chunk, and `stream_timeout` between the following ones. Raises `PluginTimeout`,
+        `PluginMemoryError` or `PluginCancelled` if the call is stopped, and
+        `PluginError` if the plugin raised (with the worker's traceback).
+        """
+        if self.size <= 0:
+            if call is not None:
+                call.state = "running"
+                call.started = time.time()
+            return run_plugin(plugin_cls, kw, method, args, progress=call.set_progress if call else None)
+        timeout = self.timeout if timeout is None else timeout
+        call = call or PluginCall(plugin_cls._id(), kw, method)
+        base_url = request.url_root if has_request_context() else "http://localhost/"
+        deadline = time.monotonic() + timeout
+        self._calls[call.id] = call
+        streaming = False
+        try:
+            worker = self._acquire(call, deadline)
+            call.state = "running"
+            call.started = time.time()
+            self.wait_seconds += call.started - call.submitted
+            worker.calls += 1
+            try:
+                msg = (plugin_cls, kw, method, tuple(args), base_url)
+                status, payload = self._receive(worker, call, deadline, timeout, msg)
+                if status == "chunk":
+                    streaming = True
+                    return self._stream(worker, call, payload)
+                if status == "end":
+                    return iter(())
+                return payload
+            finally:
+                if not streaming:
+                    self._finish(worker, call)
+        finally:
+            if not streaming:
+                self._calls.pop(call.id, None)
+
+    def _finish(self, worker, call):
+        self.runs += 1
+        self.run_seconds += time.time() - call.started
+        self._release(None if call.state == "killed" else worker)
+        self._calls.pop(call.id, None)
+
+    def _stream(self, worker, call, first):
+        try:
+            yield first
+            while True:
+                # an idle timeout: a long page is fine as long as chunks keep coming
+                deadline = time.monotonic() + self.stream_timeout
+                status, payload = self._receive(worker, call, deadline, self.stream_timeout)
+                if status == "end":
+                    return
+                yield payload
+        except GeneratorExit:
+            # the consumer went away while the worker is still producing chunks
+            if call.state != "killed":
+                call.state = "killed"
+                worker.kill()
+            raise
+        finally:
+            self._finish(worker, call)
+
+    def _receive(self, worker, call, deadline, timeout, msg=None):
+        """Send `msg` (if any) and return the next ``(status, payload)`` from the worker.
+
+        Progress reports are recorded on the way, and the worker is killed if
+        the call is cancelled, runs past `deadline` or exceeds `max_rss`.
+        """
+        def stop(exc):
+            call.state = "killed"
+            worker.kill()
+            raise exc
+
+        try:
+            if msg is not None:
+                worker.conn.send(msg)
+            while True:
+                if worker.conn.poll(self.poll_interval):
+                    status, *payload = worker.conn.recv()
+                    if status != "progress":
+                        break
+                    call.set_progress(*payload)
+                    continue
+                if call.cancelled:
+                    self.cancellations += 1
+                    stop(PluginCancelled(f"Plugin call {call.id} was cancelled"))
+                if time.monotonic() > deadline:
+                    self.timeouts += 1
+                    stop(PluginTimeout(f"Plugin {call.plugin_id} timed out after {timeout}s"))
+                rss = _rss(worker.process.pid) if self.max_rss else None
+                if rss is not None and rss > self.max_rss:
+                    self.memory_kills += 1
+                    stop(PluginMemoryError(f"Plugin {call.plugin_id} exceeded {self.max_rss} bytes of memory"))
+                if not worker.alive():
+                    raise EOFError("worker exited")
+        except PluginError:
+            # PluginTimeout is an OSError too
+            raise
+        except (EOFError, OSError) as e:
+            self.crashes += 1
+            stop(PluginError(f"Plugin worker exited while running {call.plugin_id}: {e!r}"))
+        if status == "error":
+            self.errors += 1
+            message, tb = payload
+            logger.warning(f"Plugin {call.plugin_id} failed in worker {worker.process.pid}:\n{tb}")
+            raise PluginError(message)
+        if status in ("ok", "end"):
+            self.completed += 1
+        return status, payload[0] if payload else None
+
+    def cancel(self, call_id):
+        """Cancel a queued or running call. Returns False if there is no such call."""
+        call = self._calls.get(call_id)
+        if call is None:
+            return False
+        call.cancelled = True
+        with self._cond:
+            self._cond.notify_all()
+        return True
+
+    def calls(self):
+        """Return the queued and running calls."""
+        return [x.to_dict() for x in list(self._calls.values())]
+
+    def shutdown(self):
+        """Stop the idle workers (busy ones stop after their current call)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+        for worker in idle:
+            worker.kill()
+
+    def clear(self):
+        """Restart idle workers (dropping their caches) and reset the counters."""
+        self.shutdown()
+        self.max_queued = self.completed = self.errors = self.timeouts = 0
+        self.memory_kills = self.cancellations = self.crashes = self.spawned = self.runs = 0
+        self.wait_seconds = self.run_seconds = 0.0
+
+    def stats(self):
+        """Return a dictionary of pool metrics."""
+        calls = list(self._calls.values())
+        return {
+            "name": self.name,
+            "workers": self.size,
+            "live": self._live,
+            "idle": len(self._idle),
+            "queued": len(self._waiting),
+            "running": sum(x.state == "running" for x in calls),
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "memory_kills": self.memory_kills,
+            "cancellations": self.cancellations,
+            "crashes": self.crashes,
+            "spawned": self.spawned,
+            "avg_wait_ms": 1e3 * self.wait_seconds / self.runs if self.runs else None,
+            "avg_run_ms": 1e3 * self.run_seconds / self.runs if self.runs else None,
+            "timeout": self.timeout,
+            "stream_timeout": self.stream_timeout,
+            "max_rss": self.max_rss,
+        }
+
+
+#: The process-wide plugin worker pool.
+PLUGIN_POOL = PluginWorkerPool(
+    workers=PLUGIN_WORKERS,
+    timeout=PLUGIN_TIMEOUT,
+    stream_timeout=PLUGIN_STREAM_TIMEOUT,
+    max_rss=PLUGIN_MAX_RSS,
+    start_method=os.getenv("DML_UI_PLUGIN_START_METHOD", "spawn"),
+)
+
+
+class PluginJob:
+    """A dashboard render running in the background, polled for by clients."""
+
+    def __init__(self, plugin_cls, kw, key):
+        self.plugin_cls = plugin_cls
+        self.call = PluginCall(plugin_cls._id(), kw)
+        self.id = self.call.id
+        self.key = key
+        self.state = None
+        self.error = None
+        self.finished = None
+
+    @property
+    def result_key(self):
+        """Key of the finished HTML in `PLUGIN_RESULT_CACHE`."""
+        return self.key if self.key is not None else ("job", self.id)
+
+    def to_dict(self):
+        out = self.call.to_dict()
+        out.update({"state": self.state or self.call.state, "error": self.error, "finished": self.finished})
+        if self.state == "done":
+            out["progress"] = 1.0
+        return out
+
+
+class PluginJobs:
+    """Background dashboard renders, for plugins too slow to render within a request.
+
+    `submit` returns at once with a job whose status clients poll. Finished
+    HTML is stored in `PLUGIN_RESULT_CACHE`: under the plugin's usual key for
+    cacheable plugins (so a render already cached finishes immediately, and
+    concurrent submits of the same render share one job), and under the job id
+    for `ttl` seconds otherwise. Jobs are kept in memory, so they are only
+    visible to the server process that started them.
+
+    Parameters
+    ----------
+    name : str
+        Name used to register the job metrics in `CACHES`.
+    pool : PluginWorkerPool
+        Pool running the renders.
+    threads : int
+        Number of threads waiting on renders (they queue in the pool).
+    timeout : float
+        Wall-clock limit of a render in seconds, queueing included (up to the
+        first chunk, for streamed renders, which then have the pool's
+        `stream_timeout` between chunks).
+    ttl : float
+        Seconds finished jobs are kept.
+    """
+
+    def __init__(self, name="plugin_jobs", pool=None, threads=16, timeout=900, ttl=600):
+        self.name = name
+        self.pool = pool
+        self.timeout = timeout
+        self.ttl = ttl
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="dml-ui-plugin-job")
+        CACHES[name] = self
+
+    def submit(self, plugin_cls, kw):
+        """Start rendering ``plugin_cls(**kw)`` in the background and return its `PluginJob`."""
+        self._prune()
+        key = plugin_cache_key(plugin_cls, kw)
+        with self._lock:
+            if key is not None and key in self._active:
+                self.deduplicated += 1
+                return self._active[key]
+            job = PluginJob(plugin_cls, kw, key)
+            self._jobs[job.id] = job
+            self.submitted += 1
+            if key is not None and cached_plugin_result(key) is not None:
+                job.state = "done"
+                job.finished = time.time()
+                self.completed += 1
+                return job
+            if key is not None:
+                self._active[key] = job
+        fn = partial(self._run, job, plugin_cls, kw)
+        if has_request_context():
+            # plugins build links with url_for
+            fn = copy_current_request_context(fn)
+        self._executor.submit(fn)
+        return job
+
+    def _run(self, job, plugin_cls, kw):
+        try:
+            run = partial(self.pool.run, timeout=self.timeout, call=job.call)
+            result = call_plugin(plugin_cls, kw, run=run)
+            if isinstance(result, Iterator):
+                chunks = []
+                for chunk in result:
+                    chunks.append(chunk)
+                    self._check_inline(job)
+                result = "".join(chunks)
+            self._check_inline(job)
+            if job.key is None or cached_plugin_result(job.key) is None:
+                # not cached by call_plugin (not cacheable, or streamed and too large)
+                store_plugin_result(job.result_key, result, self.ttl)
+            job.state = "done"
+            self.completed += 1
+        except PluginCancelled:
+            job.state = "cancelled"
+            self.cancelled += 1
+        except Exception as e:
+            logger.warning(f"Background render of plugin {job.call.plugin_id} failed: {e}", exc_info=True)
+            job.state = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            self.failed += 1
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def _check_inline(self, job):
+        """Stop a render that ran in the job's thread if it was cancelled or ran out of time.
+
+        Workers are killed on cancellation or timeout, but a render run inline
+        (a pool without workers) can't be interrupted, so this is only checked
+        once it produced something.
+        """
+        if self.pool.size > 0:
+            return
+        if job.call.cancelled:
+            raise PluginCancelled(f"Plugin call {job.call.id} was cancelled")
+        if time.time() - job.call.submitted > self.timeout:
+            raise PluginTimeout(f"Plugin {job.call.plugin_id} timed out after {self.timeout}s")
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job_id in [k for k, v in self._jobs.items() if v.finished is not None and v.finished < cutoff]:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return the job `job_id`, or None if it's unknown or expired."""
+        return self._jobs.get(job_id)
+
+    def result(self, job):
+        """Return the cached result entry ``{"result", "expires"}`` of a finished job, or None if evicted."""
+        return cached_plugin_result(job.result_key) if job.state == "done" else None
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if there is no such unfinished job.
+
+        Without pool workers a running render can't be stopped: it runs to its
+        end, but the job still ends cancelled.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished is not None:
+            return False
+        job.call.cancelled = True
+        self.pool.cancel(job.call.id)
+        return True
+
+    def clear(self):
+        """Forget finished jobs and reset the counters."""
+        with self._lock:
+            for job_id in [k for k, v in self._jobs.items() if v.finished is not None]:
+                del self._jobs[job_id]
+        self.submitted = self.deduplicated = self.completed = self.failed = self.cancelled = 0
+
+    def stats(self):
+        """Return a dictionary of job metrics."""
+        jobs = list(self._jobs.values())
+        return {
+            "name": self.name,
+            "jobs": len(jobs),
+            "active": sum(x.finished is None for x in jobs),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "timeout": self.timeout,
+            "ttl": self.ttl,
+        }
+
+
+#: The process-wide background render jobs.
+PLUGIN_JOBS = PluginJobs(pool=PLUGIN_POOL, timeout=PLUGIN_JOB_TIMEOUT, ttl=PLUGIN_JOB_TTL)
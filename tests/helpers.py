@@ -0,0 +1,93 @@
+import os
+import unittest
+from unittest import mock
+
+from daggerml import Dml
+
+from dml_ui.cache import CACHES
+
+
+def log_events(start, stop):
+    """Events ``start`` to ``stop - 1`` of a `FakeLogsClient` stream."""
+    return [{"timestamp": i, "message": f"line {i}"} for i in range(start, stop)]
+
+
+class FakeLogsClient:
+    """Stand-in for a boto3 logs client: `get_log_events` over a fixed stream.
+
+    The token is the index of the next event. Events past `total` can be
+    added later by raising it, as if the stream grew.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.calls = 0
+
+    def get_log_events(self, logGroupName, logStreamName, limit, startFromHead, nextToken=None):
+        self.calls += 1
+        start = int(nextToken or 0)
+        stop = min(start + limit, self.total)
+        # like CloudWatch, the end of the stream returns the token it was given
+        return {"events": log_events(start, stop), "nextForwardToken": str(stop)}
+
+
+class FakeCloudWatch:
+    """Stand-in for `CloudWatchLogs` serving fixed pages of `page_size` events per stream.
+
+    `timestamps` maps stream names to the timestamps of their events, which
+    `filter_log_events` returns as matches.
+    """
+
+    def __init__(self, timestamps, page_size):
+        self.timestamps = timestamps
+        self.page_size = page_size
+        self.region = "us-east-1"
+
+    def filter_log_events(self, log_group, log_stream, next_token=None, **kwargs):
+        start = int(next_token or 0)
+        times = self.timestamps[log_stream][start:start + self.page_size]
+        end = start + len(times)
+        events = [{"timestamp": t, "message": f"{log_stream}-{t}"} for t in times]
+        return {"events": events, "nextToken": str(end) if end < len(self.timestamps[log_stream]) else None}
+
+
+def clear_caches():
+    """Reset every registered cache, so no state leaks between temporary repos."""
+    for cache in CACHES.values():
+        cache.clear()
+
+
+class DmlTestCase(unittest.TestCase):
+    """Test case with a temporary DaggerML repo, selected through the environment.
+
+    Temporary repos share the repo name, so the caches (including the pooled
+    `Dml` handles) are cleared for each test class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = Dml.temporary()
+        cls.dml = cls._tmp.__enter__()
+        cls._env = mock.patch.dict(os.environ, cls.dml.envvars)
+        cls._env.start()
+        cls.repo = cls.dml.kwargs["repo"]
+        cls.branch = cls.dml.kwargs["branch"]
+        clear_caches()
+
+    @classmethod
+    def tearDownClass(cls):
+        clear_caches()
+        cls._env.stop()
+        cls._tmp.__exit__(None, None, None)
+
+    @classmethod
+    def make_dag(cls, name="d"):
+        """Commit a small DAG (``d = {"x": c}``, ``c = [a, b]``) and return its id."""
+        dag = cls.dml.new(name, "test dag")
+        dag.a = 1
+        dag.b = 2
+        dag.c = [dag.a, dag.b]
+        dag.d = {"x": dag.c}
+        dag.commit(dag.d)
+        (dag_id,) = [x["id"] for x in cls.dml("dag", "list") if x["name"] == name]
+        return dag_id
@@ -0,0 +1,78 @@
+"""Dashboard plugins used by the worker tests.
+
+They live in an importable module so that spawned worker processes can load them.
+"""
+
+import os
+import threading
+import time
+
+from dml_ui.plugins import DashboardPlugin
+
+
+class FixturePlugin(DashboardPlugin):
+    NAME = "Fixture"
+
+    def __init__(self, **kw):
+        self.kw = kw
+
+
+class Echo(FixturePlugin):
+    REPORTS_PROGRESS = True
+
+    def render(self):
+        self.progress(0.5, "halfway")
+        return f"<p>{self.kw.get('text', '')}</p>"
+
+    def pid(self):
+        return os.getpid()
+
+
+class Sleepy(FixturePlugin):
+    def render(self):
+        time.sleep(float(self.kw.get("seconds", 30)))
+        return "<p>slept</p>"
+
+
+class Hog(FixturePlugin):
+    def render(self):
+        # bytes are written, so the pages count towards the RSS
+        data = b"x" * int(self.kw["nbytes"])
+        time.sleep(30)
+        return str(len(data))
+
+
+class Crash(FixturePlugin):
+    def render(self):
+        os._exit(1)
+
+
+class Failing(FixturePlugin):
+    def render(self):
+        raise ValueError("bad plugin")
+
+
+class Chunks(FixturePlugin):
+    def render(self):
+        for i in range(int(self.kw.get("count", 3))):
+            time.sleep(float(self.kw.get("delay", 0)))
+            yield f"<p>{i}</p>"
+            if i == 0:
+                time.sleep(float(self.kw.get("stall", 0)))
+
+
+class CachedEcho(Echo):
+    CACHEABLE = True
+    VERSION = "1"
+
+
+#: Set to let `Gated` renders finish (only for renders in the test process).
+GATE = threading.Event()
+
+
+class Gated(FixturePlugin):
+    CACHEABLE = True
+
+    def render(self):
+        assert GATE.wait(30)
+        return "<p>opened</p>"
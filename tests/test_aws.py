@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from dml_ui import aws
+from dml_ui.aws import PRESIGNED_URL_CACHE, AwsClients, presigned_html_url
+from dml_ui.cache import CACHES
+
+
+class TestAwsClients(unittest.TestCase):
+    def setUp(self):
+        self.clients = AwsClients(name="test_aws_clients")
+        self.addCleanup(CACHES.pop, "test_aws_clients", None)
+        self.created = []
+
+        def create(service):
+            # slow enough that concurrent first uses overlap
+            time.sleep(0.05)
+            self.created.append(service)
+            return object()
+
+        patcher = mock.patch.object(self.clients, "_create", create)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_clients_are_created_once_and_shared(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.clients.get("logs"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert self.created == ["logs"]
+        assert len({id(x) for x in results}) == 1
+        assert self.clients.get("s3") is not results[0]
+        stats = self.clients.stats()
+        assert (stats["creations"], stats["services"]) == (2, ["logs", "s3"])
+
+    def test_injected_clients_replace_created_ones(self):
+        fake = object()
+        self.clients.set("logs", fake)
+        assert self.clients.get("logs") is fake
+        assert self.created == []
+        self.clients.clear()
+        assert self.clients.get("logs") is not fake
+        assert self.created == ["logs"]
+
+    def test_connection_settings(self):
+        config = AwsClients(name="test_aws_clients").config
+        assert config.max_pool_connections >= 10
+        assert config.tcp_keepalive
+
+
+class FakeS3Store:
+    """`S3Store` stand-in counting existence checks and signed URLs."""
+
+    def __init__(self, exists=True):
+        self.exists_result = exists
+        self.heads = 0
+        self.client = mock.Mock()
+        self.client.generate_presigned_url.side_effect = lambda *args, **kwargs: f"url-{self.signed}"
+
+    @property
+    def signed(self):
+        return self.client.generate_presigned_url.call_count
+
+    def exists(self, resource):
+        self.heads += 1
+        return self.exists_result
+
+    def parse_uri(self, resource):
+        return resource.uri[5:].split("/", 1)
+
+
+class TestPresignedHtmlUrl(unittest.TestCase):
+    def setUp(self):
+        PRESIGNED_URL_CACHE.clear()
+        self.addCleanup(PRESIGNED_URL_CACHE.clear)
+        self.now = 1000.0
+        self.s3 = FakeS3Store()
+        for patcher in [
+            mock.patch("dml_ui.aws.time.time", lambda: self.now),
+            mock.patch.object(aws, "get_s3_store", lambda: self.s3),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.resource = SimpleNamespace(uri="s3://bucket/report.html")
+
+    def test_urls_are_refreshed_before_they_expire(self):
+        assert presigned_html_url(self.resource) == "url-1"
+        _, kwargs = self.s3.client.generate_presigned_url.call_args
+        assert kwargs["ExpiresIn"] == aws.PRESIGN_EXPIRES
+        assert kwargs["Params"]["Bucket"] == "bucket"
+        assert kwargs["Params"]["Key"] == "report.html"
+        refresh_at = self.now + aws.PRESIGN_EXPIRES - aws.PRESIGN_REFRESH_MARGIN
+        self.now = refresh_at - 1
+        assert presigned_html_url(self.resource) == "url-1"
+        # re-signed while the old URL still has PRESIGN_REFRESH_MARGIN seconds left
+        self.now = refresh_at
+        assert presigned_html_url(self.resource) == "url-2"
+        assert (self.s3.heads, self.s3.signed) == (1, 2)
+
+    def test_missing_objects_are_rechecked_after_a_while(self):
+        self.s3.exists_result = False
+        assert presigned_html_url(self.resource) is None
+        self.now += aws.MISSING_OBJECT_TTL - 1
+        assert presigned_html_url(self.resource) is None
+        assert self.s3.heads == 1
+        self.s3.exists_result = True
+        self.now += 1
+        assert presigned_html_url(self.resource) == "url-1"
+        assert self.s3.heads == 2
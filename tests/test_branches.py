@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+from daggerml import Dml
+
+from dml_ui import branches
+from dml_ui.branches import BranchIndex, probe
+from tests.helpers import DmlTestCase
+
+
+def dag_ids(dml):
+    return {x["name"]: x["id"] for x in dml("dag", "list")}
+
+
+class TestBranchIndex(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.make_dag("on-main")
+        cls.dml("branch", "create", "other")
+        cls.other = Dml(**{**cls.dml.kwargs, "branch": "other"})
+        cls.make_dag_on(cls.other, "on-other")
+
+    @staticmethod
+    def make_dag_on(dml, name):
+        dag = dml.new(name, "test dag")
+        dag.a = name
+        dag.commit(dag.a)
+
+    def setUp(self):
+        self.index = BranchIndex(self.repo)
+        self.index.refresh(force=True)
+
+    def test_finds_commit_branches(self):
+        log = {x["id"]: x for x in self.dml("commit", "log", "--output", "json")}
+        other_head = next(x for x in log.values() if x["head"] == "other")
+        assert self.index.find_commit_branch(other_head["id"]) == "other"
+        # commits reachable from both branches resolve to the first listed branch
+        for parent in other_head["parents"]:
+            assert self.index.find_commit_branch(parent) == "main"
+        assert self.index.find_commit_branch("commit/missing") is None
+
+    def test_indexes_dags_of_branch_heads(self):
+        main_dags, other_dags = dag_ids(self.dml), dag_ids(self.other)
+        assert self.index.dags[main_dags["on-main"]] == "main"
+        assert self.index.dags[other_dags["on-other"]] == "other"
+        with mock.patch.object(branches, "probe") as probe_:
+            assert self.index.find_dag_branch(other_dags["on-other"]) == "other"
+        probe_.assert_not_called()
+
+    def test_dags_of_older_commits_are_probed(self):
+        dag = self.dml.new("replaced", "test dag")
+        dag.a = 1
+        dag.commit(dag.a)
+        old_id = dag_ids(self.dml)["replaced"]
+        self.make_dag_on(self.dml, "replaced")
+        self.index.refresh(force=True)
+        assert old_id not in self.index.dags
+        # DAG ids can be described from any branch, so any one may answer first
+        branch = self.index.find_dag_branch(old_id)
+        assert branch in ["main", "other"]
+        assert self.index.dags[old_id] == branch
+
+    def test_refresh_only_describes_moved_heads(self):
+        calls = []
+        describe = self.index._describe_commit
+
+        def record(commit_id):
+            # describing runs outside the lock, so lookups aren't blocked behind it
+            assert not self.index._lock.locked()
+            calls.append(commit_id)
+            return describe(commit_id)
+
+        with mock.patch.object(self.index, "_describe_commit", record):
+            self.index.refresh(force=True)
+            assert calls == []
+            self.make_dag_on(self.dml, "later")
+            self.make_dag_on(self.dml, "latest")
+            self.index.refresh(force=True)
+        assert calls == [self.index.heads["main"]]
+        log = self.dml("commit", "log", "--output", "json")
+        assert set(self.index.commits) == {x["id"] for x in log}
+        assert self.index.dags[dag_ids(self.dml)["latest"]] == "main"
+
+    def test_refresh_is_rate_limited(self):
+        with mock.patch.object(branches, "get_dml") as get_dml:
+            self.index.refresh()
+        get_dml.assert_not_called()
+
+
+class TestProbe(unittest.TestCase):
+    def test_returns_a_matching_candidate(self):
+        assert probe(range(20), lambda x: x == 13) == 13
+
+    def test_errors_and_falsy_results_do_not_match(self):
+        def check(x):
+            if x == 1:
+                raise RuntimeError("boom")
+            return x == 2 and {}
+        assert probe([1, 2], check) is None
@@ -0,0 +1,150 @@
+import threading
+import unittest
+from unittest import mock
+
+from dml_ui.cache import CACHES, LRUCache, RefreshingCache, cache_stats
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used_item(self):
+        cache = LRUCache("test_lru_items", max_items=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" is now the least recently used
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_by_bytes(self):
+        cache = LRUCache("test_lru_bytes", max_items=100, max_bytes=10)
+        cache.set("a", "x", size=4)
+        cache.set("b", "y", size=4)
+        cache.set("c", "z", size=4)
+        assert "a" not in cache
+        assert len(cache) == 2
+        assert cache.nbytes == 8
+
+    def test_does_not_cache_values_over_the_byte_limit(self):
+        cache = LRUCache("test_lru_large", max_items=100, max_bytes=10)
+        cache.set("a", "x", size=4)
+        assert not cache.set("big", "y", size=11)
+        assert "big" not in cache
+        assert cache.get("a") == "x"
+
+    def test_replacing_a_key_updates_its_size(self):
+        cache = LRUCache("test_lru_replace", max_items=10, max_bytes=100)
+        cache.set("a", "x", size=40)
+        cache.set("a", "y", size=10)
+        assert cache.nbytes == 10
+        assert cache.get("a") == "y"
+
+    def test_zero_items_disables_the_cache(self):
+        cache = LRUCache("test_lru_disabled", max_items=0)
+        assert not cache.set("a", 1)
+        assert cache.get("a", "default") == "default"
+
+    def test_pop_clear_and_stats(self):
+        cache = LRUCache("test_lru_stats", max_items=10)
+        cache.set("a", [1, 2, 3])
+        assert cache.get("missing") is None
+        assert cache.pop("a") == [1, 2, 3]
+        assert cache.nbytes == 0
+        cache.set("b", 1)
+        cache.clear()
+        stats = cache.stats()
+        assert (stats["items"], stats["hits"], stats["misses"]) == (0, 0, 0)
+        assert CACHES["test_lru_stats"] is cache
+        assert cache_stats()["test_lru_stats"] == stats
+
+
+class TestRefreshingCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("dml_ui.cache.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # a single worker runs refreshes in order, so `wait()` sees them finished
+        self.cache = RefreshingCache("test_refreshing", ttl=10, max_stale=100, max_items=2, max_workers=1)
+        self.loads = []
+
+    def loader(self, value):
+        def load():
+            self.loads.append(value)
+            return value
+        return load
+
+    def wait(self):
+        self.cache._executor.submit(lambda: None).result()
+
+    def test_fresh_entries_are_served_from_the_cache(self):
+        meta = {"fetched_at": 1000.0, "age": 0.0, "stale": False, "refreshing": False}
+        assert self.cache.get("k", self.loader(1)) == (1, meta)
+        self.now += 5
+        value, meta = self.cache.get("k", self.loader(2))
+        assert (value, meta["age"], meta["stale"]) == (1, 5.0, False)
+        assert self.loads == [1]
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        self.cache.get("k", self.loader(1))
+        self.now += 20
+        value, meta = self.cache.get("k", self.loader(2))
+        assert (value, meta["stale"], meta["refreshing"]) == (1, True, True)
+        self.wait()
+        value, meta = self.cache.get("k", self.loader(3))
+        assert (value, meta["stale"]) == (2, False)
+        assert self.loads == [1, 2]
+        assert (self.cache.stale_hits, self.cache.refreshes) == (1, 1)
+
+    def test_only_one_refresh_runs_per_key(self):
+        self.cache.get("k", self.loader(1))
+        self.now += 20
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            self.loads.append("slow")
+            return 2
+
+        self.cache.get("k", slow)
+        self.cache.get("k", self.loader(3))
+        assert self.cache.stats()["refreshing"] == 1
+        release.set()
+        self.wait()
+        assert self.loads == [1, "slow"]
+        assert self.cache.stats()["refreshing"] == 0
+
+    def test_entries_past_max_stale_are_reloaded_synchronously(self):
+        self.cache.get("k", self.loader(1))
+        self.now += 200
+        value, meta = self.cache.get("k", self.loader(2))
+        assert (value, meta["stale"]) == (2, False)
+        assert self.cache.misses == 2
+
+    def test_failed_refreshes_keep_the_stale_value(self):
+        self.cache.get("k", self.loader(1))
+        self.now += 20
+
+        def fail():
+            raise RuntimeError("boom")
+
+        self.cache.get("k", fail)
+        self.wait()
+        assert self.cache.get("k", self.loader(2))[0] == 1
+        assert self.cache.refresh_errors == 1
+
+    def test_synchronous_load_errors_propagate(self):
+        with self.assertRaises(RuntimeError):
+            self.cache.get("k", mock.Mock(side_effect=RuntimeError("boom")))
+        assert "k" not in self.cache._data
+
+    def test_invalidate_and_max_items(self):
+        for key in "abc":
+            self.cache.get(key, self.loader(key))
+        assert list(self.cache._data) == ["b", "c"]
+        self.cache.invalidate(lambda key: key == "b")
+        assert list(self.cache._data) == ["c"]
+        self.cache.clear()
+        assert self.cache.stats()["items"] == 0
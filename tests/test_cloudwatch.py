@@ -0,0 +1,48 @@
+import unittest
+
+from dml_ui.cloudwatch import LOG_SEARCH_CACHE, search_logs
+from tests.helpers import FakeCloudWatch
+
+
+def read_all(cloudwatch, streams, limit):
+    pages, cursor = [], None
+    while True:
+        result = search_logs(streams, cursor=cursor, limit=limit, cloudwatch=cloudwatch)
+        pages.append(result["events"])
+        cursor = result["cursor"]
+        if cursor is None:
+            return pages
+        assert len(pages) < 100
+
+
+class TestSearchLogs(unittest.TestCase):
+    def setUp(self):
+        LOG_SEARCH_CACHE.clear()
+        self.streams = {x: {"log_group": "g", "log_stream": x} for x in ["stdout", "stderr"]}
+
+    def test_events_are_ordered_across_pages(self):
+        cloudwatch = FakeCloudWatch({"stdout": [1, 2, 3, 4, 5, 6], "stderr": [10, 11, 12]}, page_size=2)
+        pages = read_all(cloudwatch, self.streams, limit=2)
+        times = [x["timestamp"] for page in pages for x in page]
+        assert times == [1, 2, 3, 4, 5, 6, 10, 11, 12]
+        assert pages[0] == [{"timestamp": 1, "message": "stdout-1", "stream": "stdout"},
+                            {"timestamp": 2, "message": "stdout-2", "stream": "stdout"}]
+
+    def test_interleaved_streams(self):
+        cloudwatch = FakeCloudWatch({"stdout": [1, 4, 5, 8, 9], "stderr": [2, 3, 6, 7, 10]}, page_size=2)
+        pages = read_all(cloudwatch, self.streams, limit=2)
+        times = [x["timestamp"] for page in pages for x in page]
+        assert times == list(range(1, 11))
+        assert all(page for page in pages)
+
+    def test_held_back_events_are_in_the_cursor(self):
+        cloudwatch = FakeCloudWatch({"stdout": [1, 2, 3], "stderr": [5, 6]}, page_size=2)
+        result = search_logs(self.streams, limit=2, cloudwatch=cloudwatch)
+        assert [x["timestamp"] for x in result["events"]] == [1, 2]
+        assert result["cursor"] == {"stdout": ["2", 0], "stderr": [None, 0]}
+
+    def test_single_page(self):
+        cloudwatch = FakeCloudWatch({"stdout": [3], "stderr": [1, 2]}, page_size=5)
+        result = search_logs(self.streams, limit=5, cloudwatch=cloudwatch)
+        assert [x["stream"] for x in result["events"]] == ["stderr", "stderr", "stdout"]
+        assert result["cursor"] is None
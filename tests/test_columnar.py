@@ -0,0 +1,164 @@
+import io
+import json
+import unittest
+
+import msgpack
+import polars as pl
+
+from dml_ui.columnar import (
+    EDGE_DICTIONARY_COLUMNS,
+    NODE_DICTIONARY_COLUMNS,
+    arrow_ipc,
+    columnar_dag_data,
+    dag_table,
+    msgpack_dumps,
+    to_columns,
+)
+from dml_ui.impl import app
+from tests.helpers import DmlTestCase
+
+
+def to_records(table):
+    """Invert `to_columns`, dropping keys whose value is None."""
+    columns = dict(table["columns"])
+    for name, values in table["dictionaries"].items():
+        columns[name] = [None if x is None else values[x] for x in columns[name]]
+    rows = [{name: values[i] for name, values in columns.items()} for i in range(table["length"])]
+    return [{k: v for k, v in row.items() if v is not None} for row in rows]
+
+
+def without_none(records):
+    return [{k: v for k, v in x.items() if v is not None} for x in records]
+
+
+def read_arrow(payload):
+    """Decode an Arrow IPC stream into records, parsing the JSON text columns back."""
+    df = pl.read_ipc_stream(io.BytesIO(payload))
+    records = df.to_dicts()
+    for name, dtype in df.schema.items():
+        if dtype == pl.Utf8:
+            for x in records:
+                value = x[name]
+                if isinstance(value, str) and value[:1] in "{[":
+                    x[name] = json.loads(value)
+    return without_none(records)
+
+
+class TestToColumns(unittest.TestCase):
+    def test_dictionary_encoding(self):
+        records = [{"t": "a", "v": 1}, {"t": "b"}, {"t": "a", "v": 3}, {"t": None, "v": 4}]
+        table = to_columns(records, ["t", "missing"])
+        assert table == {
+            "length": 4,
+            "columns": {"t": [0, 1, 0, None], "v": [1, None, 3, 4]},
+            "dictionaries": {"t": ["a", "b"]},
+        }
+        assert to_records(table) == without_none(records)
+
+    def test_empty_dag(self):
+        dag_data = {"id": "dag/x", "nodes": [], "edges": []}
+        out = columnar_dag_data(dag_data)
+        assert out["id"] == "dag/x"
+        for table in ["nodes", "edges"]:
+            assert out[table] == {"length": 0, "columns": {}, "dictionaries": {}}
+            assert pl.read_ipc_stream(io.BytesIO(arrow_ipc(out[table]))).shape == (0, 0)
+        assert msgpack.unpackb(msgpack_dumps(out)) == out
+
+    def test_unknown_table(self):
+        with self.assertRaises(ValueError):
+            dag_table({"nodes": [], "edges": []}, "other")
+
+    def test_arrow_column_types(self):
+        table = to_columns(
+            [
+                {"s": "x", "i": 1, "b": True, "l": ["p"], "d": {"k": 1}, "c": "fn"},
+                {"s": None, "i": None, "b": None, "l": None, "d": None, "c": None},
+            ],
+            ["c"],
+        )
+        schema = pl.read_ipc_stream(io.BytesIO(arrow_ipc(table))).schema
+        assert dict(schema) == {
+            "s": pl.Utf8,
+            "i": pl.Int64,
+            "b": pl.Boolean,
+            "l": pl.List(pl.Utf8),
+            "d": pl.Utf8,
+            "c": pl.Categorical,
+        }
+
+
+class TestApiDagColumnar(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dag_id = cls.make_dag()
+        cls.client = app.test_client()
+        cls.params = {"dag_id": cls.dag_id, "repo": cls.repo, "branch": cls.branch}
+        cls.expected = cls.client.get("/api/dag", query_string=cls.params).get_json()
+
+    def get(self, headers=None, **params):
+        response = self.client.get("/api/dag", query_string={**self.params, **params}, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert "Accept" in response.headers["Vary"]
+        return response
+
+    def check_columnar(self, body):
+        assert body["urls"] == self.expected["urls"]
+        dag_data = body["dag_data"]
+        expected = self.expected["dag_data"]
+        assert {k: v for k, v in dag_data.items() if k not in ["nodes", "edges"]} == {
+            k: v for k, v in expected.items() if k not in ["nodes", "edges"]
+        }
+        assert set(dag_data["nodes"]["dictionaries"]) == set(NODE_DICTIONARY_COLUMNS)
+        assert set(dag_data["edges"]["dictionaries"]) == set(EDGE_DICTIONARY_COLUMNS)
+        assert dag_data["nodes"]["length"] == len(expected["nodes"])
+        assert to_records(dag_data["nodes"]) == without_none(expected["nodes"])
+        assert to_records(dag_data["edges"]) == without_none(expected["edges"])
+
+    def test_columnar_json(self):
+        response = self.get(format="columnar")
+        assert response.mimetype == "application/vnd.dml.columnar+json"
+        body = response.get_json()
+        assert body["format"] == "columnar"
+        self.check_columnar(body)
+
+    def test_msgpack(self):
+        response = self.get(format="msgpack")
+        assert response.mimetype == "application/msgpack"
+        body = msgpack.unpackb(response.get_data())
+        assert body["format"] == "msgpack"
+        self.check_columnar(body)
+
+    def test_arrow(self):
+        expected = self.expected["dag_data"]
+        for table in ["nodes", "edges"]:
+            response = self.get(format="arrow", table=table)
+            assert response.mimetype == "application/vnd.apache.arrow.stream"
+            assert read_arrow(response.get_data()) == without_none(expected[table])
+        df = pl.read_ipc_stream(io.BytesIO(self.get(format="arrow").get_data()))
+        assert df.height == len(expected["nodes"])
+        assert all(df.schema[x] == pl.Categorical for x in NODE_DICTIONARY_COLUMNS)
+
+    def test_accept_negotiation(self):
+        cases = {
+            "application/json": ("application/json", "compact"),
+            "application/vnd.dml.columnar+json": ("application/vnd.dml.columnar+json", "columnar"),
+            "application/msgpack": ("application/msgpack", "msgpack"),
+            "application/vnd.apache.arrow.stream": ("application/vnd.apache.arrow.stream", None),
+            "application/msgpack;q=0.5, application/json": ("application/json", "compact"),
+            "text/html": ("application/json", "compact"),
+        }
+        for accept, (mimetype, fmt) in cases.items():
+            response = self.get(headers={"Accept": accept})
+            assert response.mimetype == mimetype, accept
+            if mimetype == "application/msgpack":
+                assert msgpack.unpackb(response.get_data())["format"] == fmt
+            elif fmt:
+                assert response.get_json()["format"] == fmt
+        # an explicit format wins over the Accept header
+        response = self.get(headers={"Accept": "application/msgpack"}, format="compact")
+        assert response.get_json() == self.expected
+
+    def test_unknown_table(self):
+        response = self.client.get("/api/dag", query_string={**self.params, "format": "arrow", "table": "x"})
+        assert response.status_code == 400
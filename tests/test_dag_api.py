@@ -0,0 +1,66 @@
+from dml_ui.impl import app
+from tests.helpers import DmlTestCase
+
+
+class TestApiDagFormats(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dag_id = cls.make_dag()
+        cls.client = app.test_client()
+
+    def get(self, **params):
+        params = {"dag_id": self.dag_id, "repo": self.repo, "branch": self.branch, **params}
+        response = self.client.get("/api/dag", query_string=params)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return response.get_json()
+
+    def test_compact_is_the_default(self):
+        body = self.get()
+        assert body["format"] == "compact"
+        assert body["dag_data"]["id"] == self.dag_id
+        nodes = body["dag_data"]["nodes"]
+        assert nodes
+        assert not any("link" in x or "parent_link" in x for x in nodes)
+        fns = [x for x in nodes if x["node_type"] == "fn"]
+        assert fns
+        # sublists are plain node ids
+        assert all(isinstance(y, str) for x in fns for y in x["sublist"])
+
+    def test_url_templates(self):
+        urls = self.get()["urls"]
+        assert set(urls) == {"node", "dag"}
+        node_id = self.get()["dag_data"]["nodes"][0]["id"]
+        node_url = urls["node"].format(node_id=node_id)
+        assert node_url == (
+            f"/node?repo={self.repo}&branch={self.branch}&dag_id={self.dag_id}&node_id={node_id}"
+        )
+        assert urls["dag"].format(dag_id=self.dag_id) == (
+            f"/dag?repo={self.repo}&branch={self.branch}&dag_id={self.dag_id}"
+        )
+
+    def test_legacy_links(self):
+        compact = self.get()
+        body = self.get(format="legacy")
+        assert body["format"] == "legacy"
+        assert "urls" not in body
+        nodes = body["dag_data"]["nodes"]
+        assert [x["id"] for x in nodes] == [x["id"] for x in compact["dag_data"]["nodes"]]
+        for node, plain in zip(nodes, compact["dag_data"]["nodes"]):
+            assert node["link"] == compact["urls"]["node"].format(node_id=node["id"])
+            if node["node_type"] in ["import", "fn"]:
+                assert node["parent_link"] == compact["urls"]["dag"].format(dag_id=node["parent"])
+            else:
+                assert "parent_link" not in node
+            if node["node_type"] == "fn":
+                links = [compact["urls"]["node"].format(node_id=x) for x in plain["sublist"]]
+                assert node["sublist"] == [list(x) for x in zip(plain["sublist"], links)]
+
+    def test_legacy_does_not_modify_cached_dag_info(self):
+        self.get(format="legacy")
+        assert not any("link" in x for x in self.get()["dag_data"]["nodes"])
+
+    def test_bad_requests(self):
+        assert self.client.get("/api/dag", query_string={"repo": self.repo}).status_code == 400
+        params = {"dag_id": self.dag_id, "repo": self.repo, "branch": self.branch}
+        assert self.client.get("/api/dag", query_string={**params, "format": "xml"}).status_code == 400
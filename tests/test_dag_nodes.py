@@ -0,0 +1,84 @@
+import unittest
+
+from dml_ui.impl import app
+from dml_ui.util import decode_cursor, encode_cursor
+from tests.helpers import DmlTestCase
+
+
+class TestCursor(unittest.TestCase):
+    def setUp(self):
+        self.query = {"dag_id": "dag/x", "around": None, "hops": 1}
+
+    def test_round_trip(self):
+        for offset in [0, 1, 500, 10**9]:
+            assert decode_cursor(self.query, encode_cursor(self.query, offset)) == offset
+
+    def test_query_order_does_not_matter(self):
+        cursor = encode_cursor(self.query, 5)
+        assert decode_cursor(dict(reversed(list(self.query.items()))), cursor) == 5
+
+    def test_rejects_cursor_of_another_query(self):
+        cursor = encode_cursor(self.query, 5)
+        with self.assertRaises(ValueError):
+            decode_cursor({**self.query, "hops": 2}, cursor)
+
+    def test_rejects_tampered_and_malformed_cursors(self):
+        for cursor in ["", "not base64!", "Zm9v", encode_cursor(self.query, 5)[:-2] + "AA"]:
+            with self.assertRaises(ValueError):
+                decode_cursor(self.query, cursor)
+
+    def test_rejects_negative_offsets(self):
+        with self.assertRaises(ValueError):
+            decode_cursor(self.query, encode_cursor(self.query, -1))
+
+
+class TestApiDagNodes(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dag_id = cls.make_dag()
+        cls.dag_data = cls.dml("dag", "describe", cls.dag_id)
+        cls.ids = {n["name"]: n["id"] for n in cls.dag_data["nodes"] if n["name"]}
+        cls.client = app.test_client()
+
+    def get(self, **params):
+        params = {"dag_id": self.dag_id, "repo": self.repo, "branch": self.branch, **params}
+        return self.client.get("/api/dag/nodes", query_string=params)
+
+    def test_pages_follow_the_cursor(self):
+        expected = [n["id"] for n in self.dag_data["nodes"]]
+        seen, cursor = [], None
+        while True:
+            body = self.get(limit=2, **({"cursor": cursor} if cursor else {})).get_json()
+            assert body["total"] == len(expected)
+            seen.extend(n["id"] for n in body["nodes"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+    def test_cursor_of_another_query_is_rejected(self):
+        cursor = self.get(limit=2).get_json()["next_cursor"]
+        response = self.get(limit=2, cursor=cursor, node_type="fn")
+        assert response.status_code == 400
+
+    def test_around_window(self):
+        # c = [a, b] is one hop from a, b, its list literal and the result d
+        body = self.get(around=self.ids["c"]).get_json()
+        ids = {n["id"] for n in body["nodes"]}
+        assert {self.ids[x] for x in "abcd"} <= ids
+        assert all(e["source"] in ids and e["target"] in ids for e in body["edges"])
+        ancestors = {n["id"] for n in self.get(around=self.ids["c"], direction="ancestors").get_json()["nodes"]}
+        assert self.ids["d"] not in ancestors
+        assert {self.ids["a"], self.ids["b"]} <= ancestors
+        assert {n["id"] for n in self.get(around=self.ids["c"], hops=0).get_json()["nodes"]} == {self.ids["c"]}
+
+    def test_around_result(self):
+        body = self.get(around="result", direction="descendants").get_json()
+        assert [n["id"] for n in body["nodes"]] == [self.dag_data["result"]]
+        body = self.get(around="result", direction="ancestors", node_type="fn").get_json()
+        assert {n["id"] for n in body["nodes"]} == {self.ids["c"], self.ids["d"]}
+
+    def test_unknown_around_node(self):
+        assert self.get(around="node/missing").status_code == 400
+        assert self.get(around=self.ids["a"], direction="sideways").status_code == 400
@@ -0,0 +1,73 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from dml_ui import fanout
+from dml_ui.fanout import gather, remaining_time
+from dml_ui.pool import CachingDml
+
+
+class TestGather(unittest.TestCase):
+    def test_collects_results_and_errors(self):
+        def fail():
+            raise ValueError("boom")
+
+        results = gather({"a": lambda: 1, "b": fail, "c": None})
+        assert results["a"] == 1
+        assert isinstance(results.failed("b"), ValueError)
+        assert "c" not in results
+        with self.assertRaises(ValueError):
+            results["b"]
+
+    def test_timeouts_count_from_when_a_call_starts(self):
+        # a busy shared pool keeps the second call queued for ~0.3s
+        calls = {x: (lambda: time.sleep(0.3) or "ok") for x in "ab"}
+        with ThreadPoolExecutor(max_workers=1) as pool, mock.patch.object(fanout, "_pool", pool):
+            results = gather(calls, timeout=0.5, max_concurrency=2)
+        assert results == {"a": "ok", "b": "ok"}
+
+    def test_reports_slow_calls_as_timed_out(self):
+        release = threading.Event()
+        start = time.monotonic()
+        results = gather({"slow": lambda: release.wait(5), "fast": lambda: 1}, timeout=0.2)
+        release.set()
+        assert time.monotonic() - start < 2
+        assert isinstance(results.failed("slow"), TimeoutError)
+        assert results["fast"] == 1
+
+    def test_calls_see_their_deadline(self):
+        results = gather({x: remaining_time for x in "ab"}, timeout=10)
+        assert all(0 < x <= 10 for x in results.values())
+        assert remaining_time() is None
+
+
+class TestCallDeadline(unittest.TestCase):
+    def test_dml_subprocesses_are_killed_at_the_deadline(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            path = os.path.join(tmpd, "dml")
+            with open(path, "w") as f:
+                f.write("#!/bin/sh\nsleep 30\n")
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+            errors = []
+
+            def call():
+                try:
+                    return CachingDml()("status")
+                except Exception as e:
+                    errors.append(e)
+                    raise
+
+            start = time.monotonic()
+            with mock.patch.dict(os.environ, {"PATH": f"{tmpd}:{os.environ['PATH']}"}):
+                results = gather({"hung": call, "other": lambda: 1}, timeout=0.5)
+                deadline = time.monotonic() + 5
+                while not errors and time.monotonic() < deadline:
+                    time.sleep(0.05)
+        assert isinstance(results.failed("hung"), TimeoutError)
+        assert len(errors) == 1 and isinstance(errors[0], TimeoutError)
+        assert time.monotonic() - start < 5
@@ -0,0 +1,133 @@
+import time
+import unittest
+from unittest import mock
+
+from dml_ui import impl
+from dml_ui.cache import CACHES
+from dml_ui.plugins import PLUGIN_RESULT_CACHE
+from dml_ui.workers import PluginJobs, PluginWorkerPool
+from tests import plugin_fixtures
+from tests.plugin_fixtures import CachedEcho, Echo, Failing, Gated, Sleepy
+
+KW = {"repo": "r", "branch": "main", "dag_id": "dag/abc"}
+
+
+class JobsTestCase(unittest.TestCase):
+    workers = 0
+
+    def setUp(self):
+        PLUGIN_RESULT_CACHE.clear()
+        self.pool = PluginWorkerPool(name="test_job_workers", workers=self.workers, timeout=30)
+        self.jobs = PluginJobs(name="test_jobs", pool=self.pool, threads=4, timeout=30, ttl=60)
+        for name in ["test_job_workers", "test_jobs"]:
+            self.addCleanup(CACHES.pop, name, None)
+        self.addCleanup(self.pool.shutdown)
+        self.client = impl.app.test_client()
+        patcher = mock.patch.object(impl, "PLUGIN_JOBS", self.jobs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait(self, job, timeout=30):
+        deadline = time.monotonic() + timeout
+        while job.finished is None:
+            assert time.monotonic() < deadline, "job did not finish in time"
+            time.sleep(0.02)
+        return job
+
+
+class TestPluginJobs(JobsTestCase):
+    def test_render_lifecycle(self):
+        job = self.wait(self.jobs.submit(Echo, {**KW, "text": "hi"}))
+        assert job.to_dict()["state"] == "done"
+        assert job.to_dict()["progress"] == 1.0
+        # not cacheable, so the result is kept under the job id
+        assert job.result_key == ("job", job.id)
+        assert self.jobs.result(job)["result"] == "<p>hi</p>"
+        status = self.client.get(f"/api/plugins/jobs/{job.id}").get_json()
+        assert status["state"] == "done"
+        assert status["result_url"].endswith(f"/api/plugins/jobs/{job.id}/result")
+        response = self.client.get(status["result_url"])
+        assert response.status_code == 200
+        assert "<p>hi</p>" in response.get_data(as_text=True)
+        assert self.jobs.stats()["completed"] == 1
+
+    def test_cacheable_results_are_shared(self):
+        job = self.wait(self.jobs.submit(CachedEcho, {**KW, "text": "hi"}))
+        assert job.result_key == job.key
+        again = self.jobs.submit(CachedEcho, {**KW, "text": "hi"})
+        # already cached, so done without rendering
+        assert again.state == "done" and again.id != job.id
+        assert self.jobs.result(again)["result"] == "<p>hi</p>"
+
+    def test_concurrent_submits_share_a_job(self):
+        plugin_fixtures.GATE.clear()
+        self.addCleanup(plugin_fixtures.GATE.set)
+        job = self.jobs.submit(Gated, KW)
+        assert self.jobs.submit(Gated, KW) is job
+        status = self.client.get(f"/api/plugins/jobs/{job.id}/result")
+        assert status.status_code == 202
+        plugin_fixtures.GATE.set()
+        self.wait(job)
+        assert self.jobs.stats()["deduplicated"] == 1
+        assert self.jobs.submit(Gated, KW) is not job
+
+    def test_failed_renders(self):
+        job = self.wait(self.jobs.submit(Failing, KW))
+        assert job.state == "failed"
+        assert "ValueError: bad plugin" in job.error
+        response = self.client.get(f"/api/plugins/jobs/{job.id}/result")
+        assert response.status_code == 500
+        assert "bad plugin" in response.get_data(as_text=True)
+        assert self.jobs.stats()["failed"] == 1
+
+    def test_expired_jobs_and_results(self):
+        job = self.wait(self.jobs.submit(Echo, KW))
+        PLUGIN_RESULT_CACHE.clear()
+        assert self.client.get(f"/api/plugins/jobs/{job.id}/result").status_code == 410
+        self.jobs.ttl = 0
+        self.jobs.submit(Echo, KW)
+        assert self.jobs.get(job.id) is None
+        assert self.client.get(f"/api/plugins/jobs/{job.id}").status_code == 404
+        assert self.client.post(f"/api/plugins/jobs/{job.id}/cancel").status_code == 404
+
+
+    def test_cancel_an_inline_render(self):
+        # without workers the render can't be stopped, but the job ends cancelled
+        plugin_fixtures.GATE.clear()
+        self.addCleanup(plugin_fixtures.GATE.set)
+        job = self.jobs.submit(Gated, KW)
+        deadline = time.monotonic() + 30
+        while job.call.state != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        response = self.client.post(f"/api/plugins/jobs/{job.id}/cancel")
+        assert response.status_code == 200
+        plugin_fixtures.GATE.set()
+        assert self.wait(job).state == "cancelled"
+        assert self.client.get(f"/api/plugins/jobs/{job.id}/result").status_code == 409
+        assert self.jobs.stats()["cancelled"] == 1
+
+    def test_inline_renders_time_out(self):
+        self.jobs.timeout = 0.2
+        job = self.wait(self.jobs.submit(Sleepy, {**KW, "seconds": 0.5}))
+        assert job.state == "failed"
+        assert "PluginTimeout" in job.error
+        assert self.jobs.result(job) is None
+
+
+class TestPluginJobsInWorkers(JobsTestCase):
+    workers = 1
+
+    def test_cancel_a_running_job(self):
+        job = self.jobs.submit(Sleepy, KW)
+        deadline = time.monotonic() + 30
+        while job.call.state != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        response = self.client.post(f"/api/plugins/jobs/{job.id}/cancel")
+        assert response.status_code == 200
+        self.wait(job)
+        assert job.state == "cancelled"
+        assert self.client.get(f"/api/plugins/jobs/{job.id}/result").status_code == 409
+        assert not self.jobs.cancel(job.id)
+        assert self.jobs.stats()["cancelled"] == 1
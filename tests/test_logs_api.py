@@ -0,0 +1,184 @@
+import base64
+import json
+import time
+import unittest
+from unittest import mock
+
+from dml_ui import impl
+from dml_ui.aws import AWS_CLIENTS, set_aws_client
+from dml_ui.cloudwatch import LOG_SEARCH_CACHE
+from tests.helpers import FakeCloudWatch, FakeLogsClient, log_events
+
+LOG_STREAMS = {"stdout": {"log_group": "g", "log_stream": "s"}}
+
+
+def parse_sse(body):
+    """Split an event stream into ``(event, id, data)`` messages and ``(None, None, comment)`` comments."""
+    messages = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        fields = {}
+        for line in block.split("\n"):
+            name, _, value = line.partition(": ")
+            fields[name] = value
+        if "data" in fields:
+            messages.append((fields.get("event"), fields.get("id"), json.loads(fields["data"])))
+        else:
+            messages.append((None, None, fields[""]))
+    return messages
+
+
+class LogsApiTestCase(unittest.TestCase):
+    finished = True
+
+    def setUp(self):
+        self.client = impl.app.test_client()
+        dag_info = {"dag_data": {"result": "node/x" if self.finished else None}, "log_streams": LOG_STREAMS}
+        for patcher in [
+            mock.patch.object(impl, "get_dag_info", return_value=dag_info),
+            mock.patch.object(impl, "get_log_store", return_value=None),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(AWS_CLIENTS.clear)
+
+    def use_logs(self, logs_client):
+        set_aws_client("logs", logs_client)
+        return logs_client
+
+
+class TestStreamLogs(LogsApiTestCase):
+    def stream(self, headers=None, **params):
+        params = {"dag_id": "dag/x", "stream_name": "stdout", **params}
+        response = self.client.get("/logs/stream", query_string=params, headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        assert response.headers["Cache-Control"] == "no-cache"
+        return parse_sse(response.get_data(as_text=True))
+
+    def test_finished_streams_end_once_all_events_were_sent(self):
+        self.use_logs(FakeLogsClient(total=2500))
+        messages = self.stream()
+        assert messages[0] == ("meta", None, {"aws_region": "us-east-1", "log_group": "g", "log_stream": "s"})
+        batches = [x for x in messages if x[0] == "events"]
+        # each batch's id is the forward token to resume from
+        assert [x[1] for x in batches] == ["1000", "2000", "2500"]
+        assert [e for x in batches for e in x[2]["events"]] == log_events(0, 2500)
+        assert messages[-2:] == [(None, None, "idle"), ("end", None, {})]
+
+    def test_resumes_from_the_last_event_id(self):
+        self.use_logs(FakeLogsClient(total=2500))
+        messages = self.stream(headers={"Last-Event-ID": "2000"})
+        assert [e for x in messages if x[0] == "events" for e in x[2]["events"]] == log_events(2000, 2500)
+        # an explicit token wins over the header
+        messages = self.stream(headers={"Last-Event-ID": "2000"}, next_token="2400")
+        assert [e for x in messages if x[0] == "events" for e in x[2]["events"]] == log_events(2400, 2500)
+
+    def test_errors_end_the_stream(self):
+        logs = self.use_logs(mock.Mock())
+        logs.get_log_events.side_effect = RuntimeError("throttled")
+        messages = self.stream()
+        assert messages[-1] == ("end", None, {"error": "throttled"})
+        assert logs.get_log_events.call_count == 1
+
+    def test_unknown_streams(self):
+        self.use_logs(FakeLogsClient(total=0))
+        response = self.client.get("/logs/stream", query_string={"dag_id": "dag/x", "stream_name": "stderr"})
+        assert response.status_code == 404
+        assert response.get_json()["available_streams"] == ["stdout"]
+
+
+class GrowingLogsClient(FakeLogsClient):
+    """A stream that gets `grow` more events on the third call."""
+
+    def __init__(self, total, grow):
+        super().__init__(total)
+        self.grow = grow
+
+    def get_log_events(self, *args, **kwargs):
+        if self.calls == 2:
+            self.total += self.grow
+        return super().get_log_events(*args, **kwargs)
+
+
+class TestStreamRunningLogs(LogsApiTestCase):
+    finished = False
+
+    def test_running_streams_are_closed_at_the_timeout(self):
+        self.use_logs(GrowingLogsClient(total=10, grow=5))
+        patchers = [
+            mock.patch.object(impl, "LOG_TAIL_MIN_INTERVAL", 0),
+            mock.patch.object(impl, "LOG_TAIL_MAX_INTERVAL", 0),
+            mock.patch.object(impl, "LOG_TAIL_TIMEOUT", 0.3),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        start = time.monotonic()
+        response = self.client.get("/logs/stream", query_string={"dag_id": "dag/x", "stream_name": "stdout"})
+        messages = parse_sse(response.get_data(as_text=True))
+        assert time.monotonic() - start < 5
+        batches = [x for x in messages if x[0] == "events"]
+        # events that arrive while tailing are pushed too
+        assert [x[1] for x in batches] == ["10", "15"]
+        assert [e for x in batches for e in x[2]["events"]] == log_events(0, 15)
+        # a running DAG's stream is just closed, and the browser reconnects
+        assert "end" not in [x[0] for x in messages]
+        assert messages[-1] == (None, None, "idle")
+
+
+class TestSearchDagLogs(LogsApiTestCase):
+    def setUp(self):
+        super().setUp()
+        LOG_SEARCH_CACHE.clear()
+        self.addCleanup(LOG_SEARCH_CACHE.clear)
+        streams = {x: {"log_group": "g", "log_stream": x} for x in ["stdout", "stderr"]}
+        dag_info = {"dag_data": {"result": "node/x"}, "log_streams": streams}
+        cloudwatch = FakeCloudWatch({"stdout": [1, 4, 5, 8, 9], "stderr": [2, 3, 6, 7, 10]}, page_size=2)
+        for patcher in [
+            mock.patch.object(impl, "get_dag_info", return_value=dag_info),
+            mock.patch("dml_ui.cloudwatch.CloudWatchLogs", return_value=cloudwatch),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def search(self, **params):
+        params = {"dag_id": "dag/x", **params}
+        return self.client.get("/logs/search", query_string=params)
+
+    def test_pages_follow_the_cursor(self):
+        pages, cursor = [], None
+        while True:
+            response = self.search(limit=2, **({"cursor": cursor} if cursor else {}))
+            assert response.status_code == 200
+            body = response.get_json()
+            assert body["errors"] == {}
+            pages.append(body["events"])
+            cursor = body["cursor"]
+            if cursor is None:
+                break
+            # the cursor is opaque to clients, but stays URL-safe
+            json.loads(base64.urlsafe_b64decode(cursor))
+            assert len(pages) < 20
+        times = [x["timestamp"] for page in pages for x in page]
+        assert times == list(range(1, 11))
+        assert all(x["stream"] == x["message"].split("-")[0] for page in pages for x in page)
+
+    def test_selected_streams(self):
+        body = self.search(streams="stderr", limit=10).get_json()
+        assert [x["timestamp"] for x in body["events"]] == [2, 3]
+        # the cursor only tracks the selected streams
+        assert list(json.loads(base64.urlsafe_b64decode(body["cursor"]))) == ["stderr"]
+        body = self.search(streams="stderr", limit=10, cursor=body["cursor"]).get_json()
+        assert [x["timestamp"] for x in body["events"]] == [6, 7]
+        response = self.search(streams="stdout,other")
+        assert response.status_code == 404
+        assert response.get_json()["available_streams"] == ["stdout", "stderr"]
+
+    def test_invalid_cursors(self):
+        def encode(x):
+            return base64.urlsafe_b64encode(json.dumps(x).encode()).decode()
+
+        for cursor in ["not base64!", encode([1]), encode({"stdout": ["t", -1]}), encode({"stdout": [1, 0]})]:
+            assert self.search(cursor=cursor).status_code == 400, cursor
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dml_ui.cache import CACHES
+from dml_ui.cloudwatch import CloudWatchLogs
+from dml_ui.logstore import LOCK_STRIPES, LogSegmentStore
+from tests.helpers import FakeLogsClient, log_events
+
+
+class TestLogSegmentStore(unittest.TestCase):
+    def setUp(self):
+        tmpd = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpd.cleanup)
+        self.addCleanup(CACHES.pop, "test_log_segments", None)
+        self.now = 0.0
+
+        def tick():
+            self.now += 1
+            return self.now
+
+        patcher = mock.patch("dml_ui.logstore.time.time", tick)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = LogSegmentStore(os.path.join(tmpd.name, "logs.db"), name="test_log_segments")
+
+    def test_frontier_moves_with_appends(self):
+        assert self.store.frontier("g", "s") == (0, None, False)
+        self.store.append("g", "s", 0, log_events(0, 3), "t3", False)
+        assert self.store.frontier("g", "s") == (3, "t3", False)
+        self.store.append("g", "s", 3, [], "t3", True)
+        assert self.store.frontier("g", "s") == (3, "t3", True)
+
+    def test_appends_from_a_stale_frontier_are_ignored(self):
+        self.store.append("g", "s", 0, log_events(0, 3), "t3", False)
+        # another worker already stored these
+        self.store.append("g", "s", 0, log_events(0, 2), "t2", False)
+        assert self.store.frontier("g", "s") == (3, "t3", False)
+        assert self.store.read("g", "s", 0, 10) == log_events(0, 3)
+
+    def test_reads_ranges_across_segments(self):
+        self.store.append("g", "s", 0, log_events(0, 3), "t3", False)
+        self.store.append("g", "s", 3, log_events(3, 7), "t7", False)
+        assert self.store.read("g", "s", 2, 3) == log_events(2, 5)
+        assert self.store.read("g", "s", 5, 10) == log_events(5, 7)
+        assert self.store.read("g", "s", 7, 10) == []
+        assert (self.store.hits, self.store.misses) == (2, 1)
+
+    def test_evicts_least_recently_read_streams(self):
+        for name in "abc":
+            self.store.append("g", name, 0, log_events(0, 50), "t", True)
+        size = self.store.stats()["bytes"] // 3
+        self.store.max_bytes = 3 * size
+        self.store.read("g", "a", 0, 1)
+        self.store.append("g", "d", 0, log_events(0, 50), "t", True)
+        # evicted streams start over from an empty frontier
+        assert self.store.frontier("g", "b") == (0, None, False)
+        assert self.store.read("g", "b", 0, 10) == []
+        assert all(self.store.frontier("g", x)[2] for x in "acd")
+        assert self.store.stats()["evictions"] == 1
+
+    def test_locks_are_striped(self):
+        locks = {id(self.store.lock("g", f"s{i}")) for i in range(10 * LOCK_STRIPES)}
+        assert len(locks) <= LOCK_STRIPES
+        assert self.store.lock("g", "s") is self.store.lock("g", "s")
+
+    def test_read_stored_events_fetches_each_event_once(self):
+        client = FakeLogsClient(total=25)
+        cloudwatch = CloudWatchLogs(client)
+        out = cloudwatch.read_stored_events("g", "s", self.store, start=0, limit=10, page_size=4)
+        assert out["events"] == log_events(0, 10)
+        assert not out["complete"]
+        assert client.calls == 3
+        out = cloudwatch.read_stored_events("g", "s", self.store, start=5, limit=100, page_size=4)
+        assert out["events"] == log_events(5, 25)
+        assert (out["complete"], out["total"]) == (True, 25)
+        calls = client.calls
+        out = cloudwatch.read_stored_events("g", "s", self.store, start=20, limit=100, page_size=4)
+        assert out["events"] == log_events(20, 25)
+        assert client.calls == calls
@@ -0,0 +1,37 @@
+from dml_ui.impl import app
+from tests.helpers import DmlTestCase
+
+
+class TestApiNodes(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        dag_id = cls.make_dag()
+        dag_data = cls.dml("dag", "describe", dag_id)
+        cls.ids = {n["name"]: n["id"] for n in dag_data["nodes"] if n["name"]}
+        cls.client = app.test_client()
+
+    def post(self, body, **params):
+        params = {"repo": self.repo, "branch": self.branch, **params}
+        return self.client.post("/api/nodes", query_string=params, json=body)
+
+    def test_describes_each_distinct_node(self):
+        ids = [self.ids["a"], self.ids["c"], self.ids["a"]]
+        response = self.post({"ids": ids}, preview_items=1)
+        assert response.status_code == 200
+        nodes = response.get_json()["nodes"]
+        assert set(nodes) == {self.ids["a"], self.ids["c"]}
+        assert nodes[self.ids["a"]]["preview"]["text"] == "1"
+        assert nodes[self.ids["c"]]["preview"]["truncated"]
+
+    def test_missing_nodes_get_an_error_entry(self):
+        nodes = self.post({"ids": [self.ids["a"], "node/missing"]}).get_json()["nodes"]
+        assert "error" in nodes["node/missing"]
+        assert "description" in nodes[self.ids["a"]]
+
+    def test_rejects_ids_that_are_not_node_id_strings(self):
+        for body in [{"ids": [{}]}, {"ids": [["node/x"]]}, {"ids": [1]}, {"ids": ["dag/x"]}, {"ids": "node/x"}, ["node/x"]]:
+            response = self.post(body)
+            assert response.status_code == 400, body
+            assert "error" in response.get_json()
+        assert self.client.get("/api/nodes", query_string={"ids": ""}).status_code == 400
@@ -0,0 +1,117 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from dml_ui.cache import CACHES
+from dml_ui.impl import app
+from dml_ui.plugins import PLUGINS, DagDashboardPlugin, PluginRegistry, plugin_cache_key
+
+
+class Cached(DagDashboardPlugin):
+    CACHEABLE = True
+    VERSION = "1"
+
+
+class NotCached(DagDashboardPlugin):
+    pass
+
+
+class TestPluginCacheKey(unittest.TestCase):
+    def setUp(self):
+        self.kw = {"repo": "r", "branch": "main", "dag_id": "dag/abc"}
+
+    def test_only_cacheable_plugins_on_dag_ids(self):
+        assert plugin_cache_key(Cached, self.kw) is not None
+        assert plugin_cache_key(NotCached, self.kw) is None
+        assert plugin_cache_key(Cached, {**self.kw, "dag_id": "my-dag"}) is None
+
+    def test_keys_depend_on_every_argument(self):
+        key = plugin_cache_key(Cached, self.kw)
+        assert plugin_cache_key(Cached, dict(reversed(list(self.kw.items())))) == key
+        others = [
+            plugin_cache_key(Cached, {**self.kw, "branch": "other"}),
+            plugin_cache_key(Cached, {**self.kw, "repo": "other"}),
+            plugin_cache_key(Cached, {**self.kw, "dag_id": "dag/def"}),
+            plugin_cache_key(Cached, {**self.kw, "node_id": "node/x"}),
+            plugin_cache_key(Cached, {**self.kw, "theme": "dark"}),
+            plugin_cache_key(Cached, self.kw, method="data"),
+            plugin_cache_key(Cached, self.kw, method="data", args=["1"]),
+        ]
+        assert len({key, *others}) == len(others) + 1
+
+    def test_keys_change_with_the_plugin_version(self):
+        class Newer(Cached):
+            VERSION = "2"
+
+        assert plugin_cache_key(Newer, self.kw)[1:] != plugin_cache_key(Cached, self.kw)[1:]
+
+
+class TestPluginRegistry(unittest.TestCase):
+    def test_only_known_groups_are_loaded(self):
+        registry = PluginRegistry(name="test_plugins", check_interval=0)
+        self.addCleanup(CACHES.pop, "test_plugins", None)
+        assert isinstance(registry.get("dag"), dict)
+        with self.assertRaises(KeyError):
+            registry.get("other")
+        assert set(registry.plugins) == {"dag"}
+
+    def test_unknown_kinds_are_not_found(self):
+        client = app.test_client()
+        assert client.get("/api/dag/plugins").status_code == 200
+        assert client.get("/api/other/plugins").status_code == 404
+        assert client.get("/api/other/plugins/some:Plugin").status_code == 404
+        assert client.post("/api/plugins/reload", query_string={"kind": "other"}).status_code == 404
+
+
+def entry_point(name, obj):
+    def load():
+        if isinstance(obj, Exception):
+            raise obj
+        return obj
+
+    return SimpleNamespace(name=name, load=load)
+
+
+class TestPluginReload(unittest.TestCase):
+    def setUp(self):
+        self.entry_points = {"dml_ui.dashboard.dag": [entry_point("cached", Cached)]}
+        # restore the installed plugins once the fake entry points are gone
+        self.addCleanup(PLUGINS.reload)
+        patcher = mock.patch(
+            "dml_ui.plugins.importlib.metadata.entry_points",
+            lambda group: self.entry_points.get(group, []),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reload_picks_up_new_entry_points(self):
+        registry = PluginRegistry(name="test_plugins", check_interval=0)
+        self.addCleanup(CACHES.pop, "test_plugins", None)
+        assert set(registry.get("dag").values()) == {Cached}
+        self.entry_points["dml_ui.dashboard.dag"].append(entry_point("not_cached", NotCached))
+        # the scan is kept until a reload
+        assert set(registry.get("dag").values()) == {Cached}
+        registry.reload("dag")
+        assert set(registry.get("dag").values()) == {Cached, NotCached}
+        assert registry.stats()["reloads"] == 1
+
+    def test_load_failures_are_reported(self):
+        registry = PluginRegistry(name="test_plugins", check_interval=0)
+        self.addCleanup(CACHES.pop, "test_plugins", None)
+        self.entry_points["dml_ui.dashboard.dag"].append(entry_point("broken", ImportError("no module named x")))
+        assert set(registry.get("dag").values()) == {Cached}
+        assert registry.stats()["failures"] == {"dag": {"broken": "ImportError: no module named x"}}
+        self.entry_points["dml_ui.dashboard.dag"].pop()
+        registry.reload()
+        assert registry.stats()["failures"] == {"dag": {}}
+
+    def test_reload_endpoint_returns_failures(self):
+        self.entry_points["dml_ui.dashboard.dag"].append(entry_point("broken", ValueError("bad")))
+        client = app.test_client()
+        response = client.post("/api/plugins/reload", query_string={"kind": "dag"})
+        assert response.status_code == 200
+        stats = response.get_json()
+        assert stats["groups"]["dag"] == [Cached._id()]
+        assert stats["failures"]["dag"] == {"broken": "ValueError: bad"}
+        plugins = client.get("/api/dag/plugins").get_json()
+        assert [x["id"] for x in plugins] == [Cached._id()]
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from daggerml import Dml, Error
+
+from dml_ui import pool
+from dml_ui.fanout import gather
+from dml_ui.pool import NODE_VALUE_CACHE, CachingDml, DmlPool
+from tests.helpers import DmlTestCase
+
+
+class TestCachingDml(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dag_id = cls.make_dag()
+        dag_data = cls.dml("dag", "describe", cls.dag_id)
+        cls.ids = {n["name"]: n["id"] for n in dag_data["nodes"] if n["name"]}
+
+    def setUp(self):
+        NODE_VALUE_CACHE.clear()
+        self.handle = CachingDml(**self.dml.kwargs)
+        self.calls = []
+        call = CachingDml.__call__
+
+        def spy(dml, *args, **kwargs):
+            self.calls.append(args)
+            return call(dml, *args, **kwargs)
+
+        patcher = mock.patch.object(CachingDml, "__call__", spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def with_timeout(self, fn):
+        """Run `fn` inside `gather`, where `CachingDml` uses its own subprocess call."""
+        return gather({"x": fn}, timeout=60)["x"]
+
+    def test_timed_calls_match_dml(self):
+        # `CachingDml.__call__` copies `Dml.__call__` to add the timeout, so
+        # both must agree on parsed output, text output and errors
+        upstream = Dml(**self.dml.kwargs)
+        for args, kwargs in [(("dag", "list"), {}), (("dag", "describe", self.dag_id), {}), (("status",), {"as_text": True})]:
+            timed = self.with_timeout(lambda args=args, kwargs=kwargs: self.handle(*args, **kwargs))
+            assert timed == upstream(*args, **kwargs), args
+        with self.assertRaises(Error) as expected:
+            upstream("dag", "describe", "dag/missing")
+        with self.assertRaises(Error) as timed:
+            self.with_timeout(lambda: self.handle("dag", "describe", "dag/missing"))
+        assert (timed.exception.origin, timed.exception.type) == (expected.exception.origin, expected.exception.type)
+        assert timed.exception.message == expected.exception.message
+
+    def test_timed_calls_are_killed(self):
+        with mock.patch.object(pool, "remaining_time", return_value=0.001), self.assertRaises(TimeoutError):
+            self.handle("dag", "list")
+
+    def test_node_values_are_cached(self):
+        node = self.handle.load(self.dag_id)[self.ids["c"]]
+        assert node.value() == [1, 2]
+        calls = len(self.calls)
+        # another handle (and the ref of a loaded node) reads the same entry
+        assert CachingDml(**self.dml.kwargs).get_node_value(node.ref) == [1, 2]
+        assert node.value() == [1, 2]
+        assert len(self.calls) == calls
+        assert NODE_VALUE_CACHE.stats()["hits"] == 2
+        self.handle.get_node_value(node.ref, cache=False)
+        assert len(self.calls) == calls + 1
+
+    def test_large_values_are_not_cached(self):
+        ref = self.handle.load(self.dag_id)[self.ids["d"]].ref
+        with mock.patch.object(pool, "NODE_VALUE_MAX_BYTES", 4):
+            assert self.handle.get_node_value(ref) == {"x": [1, 2]}
+            calls = len(self.calls)
+            assert self.handle.get_node_value(ref) == {"x": [1, 2]}
+        assert len(self.calls) == calls + 1
+        assert NODE_VALUE_CACHE.stats()["items"] == 0
+
+
+class TestDmlPool(DmlTestCase):
+    def test_handles_are_shared_until_they_expire(self):
+        handles = DmlPool(name="test_dml_pool", max_items=2)
+        self.addCleanup(pool.CACHES.pop, "test_dml_pool", None)
+        first = handles.get(self.repo, self.branch)
+        assert isinstance(first, CachingDml)
+        assert handles.get(self.repo, self.branch) is first
+        handles.get(self.repo, "a")
+        handles.get(self.repo, "b")
+        assert handles.get(self.repo, self.branch) is not first
+        handles.max_age = -1
+        assert handles.get(self.repo, "b") is not handles.get(self.repo, "b")
+        stats = handles.stats()
+        assert (stats["hits"], stats["items"]) == (1, 2)
@@ -0,0 +1,96 @@
+import unittest
+
+from daggerml import Dml
+
+from dml_ui.util import get_dag_info, prune_dag_data
+
+
+def node(id, prunable=None):
+    out = {"id": id, "name": id, "node_type": "literal"}
+    if prunable is not None:
+        out["prunable"] = prunable
+    return out
+
+
+def edge(source, target, prunable=None, prune_source=None):
+    out = {"source": source, "target": target, "type": "node"}
+    if prunable is not None:
+        out["prunable"] = prunable
+    if prune_source is not None:
+        out["prune_source"] = prune_source
+    return out
+
+
+class TestPruneDagData(unittest.TestCase):
+    """The cases handled by the `applyCustomPruning` JavaScript this replaced."""
+
+    def test_drops_prunable_nodes_and_their_edges(self):
+        data = {
+            "id": "dag/x",
+            "nodes": [node("a"), node("b", prunable=True), node("c", prunable=False)],
+            "edges": [edge("a", "b"), edge("b", "c"), edge("a", "c")],
+        }
+        out = prune_dag_data(data)
+        assert [x["id"] for x in out["nodes"]] == ["a", "c"]
+        assert out["edges"] == [edge("a", "c")]
+        assert out["id"] == "dag/x"
+
+    def test_redirects_prunable_edges_to_their_prune_source(self):
+        data = {
+            "nodes": [node("a"), node("b"), node("c")],
+            "edges": [edge("b", "c", prunable=True, prune_source="a")],
+        }
+        out = prune_dag_data(data)
+        assert out["edges"] == [{**edge("b", "c", prune_source="a"), "source": "a", "prunable": False}]
+
+    def test_drops_prunable_edges_without_prune_source(self):
+        data = {
+            "nodes": [node("a"), node("b")],
+            "edges": [edge("a", "b", prunable=True), edge("a", "b", prunable=True, prune_source="")],
+        }
+        assert prune_dag_data(data)["edges"] == []
+
+    def test_only_true_marks_prunable(self):
+        data = {"nodes": [node("a", prunable="yes")], "edges": [edge("a", "a", prunable=1)]}
+        out = prune_dag_data(data)
+        assert out["nodes"] == data["nodes"]
+        assert out["edges"] == data["edges"]
+
+    def test_edges_into_pruned_nodes_are_dropped_before_redirecting(self):
+        data = {
+            "nodes": [node("a"), node("b", prunable=True)],
+            "edges": [edge("a", "b", prunable=True, prune_source="a")],
+        }
+        assert prune_dag_data(data)["edges"] == []
+
+    def test_does_not_modify_its_input(self):
+        data = {
+            "nodes": [node("a"), node("b", prunable=True)],
+            "edges": [edge("a", "b"), edge("b", "a", prunable=True, prune_source="a")],
+        }
+        before = {"nodes": [dict(x) for x in data["nodes"]], "edges": [dict(x) for x in data["edges"]]}
+        prune_dag_data(data)
+        assert data == before
+
+    def test_returns_invalid_data_as_is(self):
+        assert prune_dag_data(None) is None
+        data = {"nodes": [node("a")]}
+        assert prune_dag_data(data) is data
+
+    def test_empty_dag(self):
+        assert prune_dag_data({"nodes": [], "edges": []}) == {"nodes": [], "edges": []}
+
+
+class TestGetDagInfoPrune(unittest.TestCase):
+    def test_pruned_and_full_entries_are_separate(self):
+        with Dml.temporary() as dml:
+            dag = dml.new("d", "m")
+            dag.a = 1
+            dag.b = [1, 2, 3]
+            dag.commit(dag.b)
+            (dag_id,) = [x["id"] for x in dml("dag", "list")]
+            full = get_dag_info(dml, dag_id)
+            pruned = get_dag_info(dml, dag_id, prune=True)
+            assert not any(x.get("prunable") is True for x in pruned["dag_data"]["nodes"])
+            assert pruned["dag_data"] == prune_dag_data(full["dag_data"])
+            assert get_dag_info(dml, dag_id, prune=True) is pruned
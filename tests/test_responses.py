@@ -0,0 +1,103 @@
+import gzip
+import unittest
+from unittest import mock
+
+from flask import Flask, jsonify
+
+from dml_ui import responses
+from dml_ui.impl import app
+from dml_ui.responses import (
+    compress_response,
+    is_not_modified,
+    make_etag,
+    mark_immutable,
+    not_modified,
+)
+from tests.helpers import DmlTestCase
+
+
+def make_app():
+    test_app = Flask(__name__)
+
+    @test_app.route("/thing")
+    def thing():
+        etag = make_etag("thing", 1)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        return mark_immutable(jsonify({"data": "x" * 4096}), etag)
+
+    test_app.after_request(compress_response)
+    return test_app
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_matching_etag_is_not_modified(self):
+        first = self.client.get("/thing")
+        etag = first.get_etag()[0]
+        assert first.status_code == 200
+        assert etag == make_etag("thing", 1)
+        second = self.client.get("/thing", headers={"If-None-Match": f'"{etag}"'})
+        assert second.status_code == 304
+        assert second.get_data() == b""
+        assert second.get_etag()[0] == etag
+
+    def test_other_etags_are_modified(self):
+        response = self.client.get("/thing", headers={"If-None-Match": '"other", "other-gzip"'})
+        assert response.status_code == 200
+
+    def test_compressed_etags_get_a_suffix_and_still_match(self):
+        response = self.client.get("/thing", headers={"Accept-Encoding": "gzip"})
+        etag = response.get_etag()[0]
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert etag == make_etag("thing", 1) + "-gzip"
+        assert b"x" * 4096 in gzip.decompress(response.get_data())
+        assert "Accept-Encoding" in response.headers["Vary"]
+        again = self.client.get("/thing", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"{etag}"'})
+        assert again.status_code == 304
+        assert not again.get_data()
+
+    def test_small_responses_are_not_compressed(self):
+        test_app = Flask(__name__)
+        test_app.route("/small")(lambda: jsonify({"a": 1}))
+        test_app.after_request(compress_response)
+        response = test_app.test_client().get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+    def test_etags_depend_on_the_version(self):
+        etag = make_etag("thing", 1)
+        with mock.patch.object(responses, "ETAG_VERSION", "other"):
+            assert make_etag("thing", 1) != etag
+
+    def test_unknown_versions_are_not_immutable(self):
+        with mock.patch.object(responses, "CACHE_CONTROL", responses.REVALIDATE_CACHE_CONTROL):
+            response = self.client.get("/thing")
+        assert "immutable" not in response.headers["Cache-Control"]
+        with mock.patch.object(responses, "CACHE_CONTROL", responses.IMMUTABLE_CACHE_CONTROL):
+            response = self.client.get("/thing")
+        assert "immutable" in response.headers["Cache-Control"]
+
+
+class TestApiNodesEtag(DmlTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.make_dag()
+        dag_data = cls.dml("dag", "describe", cls.dml("dag", "list")[0]["id"])
+        cls.node_ids = [n["id"] for n in dag_data["nodes"]][:3]
+        cls.client = app.test_client()
+
+    def get(self, node_ids, **headers):
+        params = {"ids": ",".join(node_ids), "repo": self.repo, "branch": self.branch}
+        return self.client.get("/api/nodes", query_string=params, headers=headers)
+
+    def test_revalidation(self):
+        response = self.get(self.node_ids)
+        assert response.status_code == 200
+        assert list(response.get_json()["nodes"]) == sorted(self.node_ids)
+        etag = response.get_etag()[0]
+        assert self.get(self.node_ids, **{"If-None-Match": f'"{etag}"'}).status_code == 304
+        reordered = list(reversed(self.node_ids))
+        assert self.get(reordered).get_etag()[0] != etag
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dml_ui.branches import BranchIndex
+from dml_ui.cache import CACHES
+from dml_ui.store import SnapshotStore, set_snapshot_store, warm
+from dml_ui.util import DAG_INFO_CACHE, get_dag_info
+from tests.helpers import DmlTestCase
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        tmpd = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpd.cleanup)
+        self.path = os.path.join(tmpd.name, "sub", "snapshots.db")
+        # eviction is by access time, so give every access its own timestamp
+        self.now = 0.0
+
+        def tick():
+            self.now += 1
+            return self.now
+
+        patcher = mock.patch("dml_ui.store.time.time", tick)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def store(self, max_bytes=1 << 20):
+        self.addCleanup(CACHES.pop, "test_snapshots", None)
+        return SnapshotStore(self.path, max_bytes=max_bytes, name="test_snapshots")
+
+    def test_round_trip_and_persistence(self):
+        store = self.store()
+        assert store.get("a") is None
+        assert store.set("a", {"x": [1, 2, 3]})
+        assert store.get("a") == {"x": [1, 2, 3]}
+        # a new store (another worker) on the same file sees the snapshot
+        assert self.store().get("a") == {"x": [1, 2, 3]}
+        stats = store.stats()
+        assert (stats["items"], stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1, 1)
+
+    def test_evicts_least_recently_read(self):
+        store = self.store()
+        for key in "abc":
+            store.set(key, key * 1000)
+        size = store.stats()["bytes"] // 3
+        store.max_bytes = 3 * size
+        store.get("a")
+        store.set("d", "d" * 1000)
+        assert store.get("b") is None
+        assert [store.get(x) is not None for x in "acd"] == [True, True, True]
+        assert store.stats()["evictions"] == 1
+
+    def test_does_not_store_values_over_the_limit(self):
+        store = self.store(max_bytes=16)
+        assert not store.set("a", list(range(1000)))
+        assert store.get("a") is None
+
+    def test_clear(self):
+        store = self.store()
+        store.set("a", 1)
+        store.clear()
+        assert store.get("a") is None
+        assert store.stats()["items"] == 0
+
+
+class TestDagInfoSnapshots(DmlTestCase):
+    def setUp(self):
+        tmpd = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpd.cleanup)
+        self.store = SnapshotStore(os.path.join(tmpd.name, "snapshots.db"), name="test_dag_snapshots")
+        set_snapshot_store(self.store)
+        self.addCleanup(CACHES.pop, "test_dag_snapshots", None)
+        self.addCleanup(set_snapshot_store, None)
+
+    def test_finished_dags_are_served_from_the_store(self):
+        dag_id = self.make_dag()
+        out = get_dag_info(self.dml, dag_id)
+        assert self.store.get(dag_id)["dag_data"]["id"] == out["dag_data"]["id"]
+        DAG_INFO_CACHE.clear()
+        with mock.patch("dml_ui.util.describe_dag") as describe:
+            assert get_dag_info(self.dml, dag_id)["dag_data"]["id"] == out["dag_data"]["id"]
+        describe.assert_not_called()
+
+
+class TestWarm(DmlTestCase):
+    def test_describes_only_the_warmed_commits(self):
+        self.make_dag("first")
+        dag_id = self.make_dag("second")
+        tmpd = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpd.cleanup)
+        self.addCleanup(set_snapshot_store, None)
+        self.addCleanup(CACHES.pop, "snapshots", None)
+        self.addCleanup(CACHES.pop, "test_warmed", None)
+        path = os.path.join(tmpd.name, "snapshots.db")
+        argv = ["dml-ui-warm", "--repo", self.repo, "-n", "1", "--db", path]
+        for patcher in [mock.patch("sys.argv", argv), mock.patch("builtins.print")]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with mock.patch.object(BranchIndex, "_describe_commit") as describe:
+            warm()
+        describe.assert_not_called()
+        # a new store (another worker) on the same file sees the warmed DAG
+        assert SnapshotStore(path, name="test_warmed").get(dag_id)["dag_data"]["id"] == dag_id
@@ -0,0 +1,110 @@
+import unittest
+
+from dml_ui.util import PREVIEW_STRING, _truncate, page_value, preview_value
+
+
+def truncate(val, items=10, depth=3):
+    state = {"items": items, "truncated": False}
+    return _truncate(val, state, depth), state
+
+
+class TestTruncate(unittest.TestCase):
+    def test_small_values_are_unchanged(self):
+        for val in [1, None, "abc", [1, 2], (1, 2), {"a": [1, {"b": 2}]}]:
+            out, state = truncate(val)
+            assert out == val
+            assert not state["truncated"]
+
+    def test_item_budget_is_shared_across_levels(self):
+        # the first list and its three elements use up the budget
+        out, state = truncate([[1, 2, 3], [4, 5, 6]], items=4)
+        assert state == {"items": 0, "truncated": True}
+        assert out[0] == [1, 2, 3]
+        assert len(out) == 2
+        assert repr(out[1]) == "<1 more items>"
+        out, _ = truncate([[1, 2, 3], [4, 5, 6]], items=3)
+        assert out[0][:2] == [1, 2]
+        assert repr(out[0][2]) == "<1 more items>"
+
+    def test_dicts_keep_their_keys(self):
+        out, state = truncate({"a": 1, "b": 2, "c": 3}, items=2)
+        assert list(out) == ["a", "b", "..."]
+        assert repr(out["..."]) == "<1 more items>"
+        assert state["truncated"]
+
+    def test_long_strings_and_deep_values(self):
+        out, state = truncate("x" * (PREVIEW_STRING + 5))
+        assert repr(out).endswith("... <5 more characters>")
+        assert state["truncated"]
+        out, state = truncate([[[1]]], depth=2)
+        assert repr(out) == "[[[...]]]"
+        assert state["truncated"]
+        # empty collections past the depth don't hide anything
+        assert not truncate([[[]]], depth=2)[1]["truncated"]
+
+    def test_sets_become_lists(self):
+        out, _ = truncate({3}, items=5)
+        assert out == [3]
+        out, _ = truncate(frozenset([1, 2]), items=5)
+        assert sorted(out) == [1, 2]
+
+
+class TestPreviewValue(unittest.TestCase):
+    def test_lengths_and_truncation(self):
+        assert preview_value(5) == {"text": "5", "truncated": False}
+        assert preview_value([1, 2, 3]) == {"text": "[1, 2, 3]", "truncated": False, "length": 3}
+        out = preview_value(list(range(1000)), max_items=3)
+        assert out == {"text": "[0, 1, 2, <997 more items>]", "truncated": True, "length": 1000}
+
+    def test_max_bytes_bounds_the_text(self):
+        out = preview_value({str(i): "y" * 50 for i in range(100)}, max_items=100, max_bytes=256)
+        assert out["truncated"]
+        text, suffix = out["text"].rsplit("\n", 1)
+        assert suffix == "... <truncated>"
+        assert len(text.encode()) <= 256
+        # multi-byte characters aren't split
+        out = preview_value("é" * 300, max_bytes=101)
+        assert out["text"].endswith("... <truncated>")
+
+    def test_sets_are_previewed_as_lists(self):
+        out = preview_value({"b"})
+        assert out == {"text": "['b']", "truncated": False, "length": 1}
+
+
+class TestPageValue(unittest.TestCase):
+    def test_pages_lists(self):
+        page = page_value(list(range(10)), offset=4, limit=3)
+        assert page == {
+            "offset": 4,
+            "limit": 3,
+            "total": 10,
+            "items": [{"key": i, "text": str(i)} for i in [4, 5, 6]],
+            "next_offset": 7,
+        }
+        assert page_value(list(range(10)), offset=8, limit=3)["next_offset"] is None
+
+    def test_pages_dicts_by_key(self):
+        page = page_value({"a": [1], "b": "x", "c": None}, offset=1, limit=1)
+        assert page["items"] == [{"key": "b", "text": "'x'"}]
+        assert page["next_offset"] == 2
+
+    def test_sets_are_paged_in_a_stable_order(self):
+        keys = [page_value({"c", "a", "b"}, offset=i, limit=1)["items"][0]["text"] for i in range(3)]
+        assert keys == ["'a'", "'b'", "'c'"]
+
+    def test_strings_are_paged_by_characters(self):
+        page = page_value("abcdef", offset=2, limit=1)
+        assert page["items"] == [{"key": 2, "text": "cdef"}]
+        assert page["total"] == 6
+        assert page["next_offset"] is None
+
+    def test_offsets_past_the_end(self):
+        for val in [[1, 2], {"a": 1}, {1}, "ab"]:
+            page = page_value(val, offset=5, limit=10)
+            assert page["items"] == []
+            assert page["next_offset"] is None
+            assert page["total"] == len(val)
+
+    def test_scalars_can_not_be_paged(self):
+        with self.assertRaises(TypeError):
+            page_value(5)
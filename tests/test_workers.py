@@ -0,0 +1,171 @@
+import threading
+import time
+import unittest
+
+from dml_ui.cache import CACHES
+from dml_ui.workers import (
+    PluginCall,
+    PluginCancelled,
+    PluginError,
+    PluginMemoryError,
+    PluginTimeout,
+    PluginWorkerPool,
+)
+from tests.plugin_fixtures import Chunks, Crash, Echo, Failing, Hog, Sleepy
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    def make_pool(self, **kwargs):
+        pool = PluginWorkerPool(**{"name": "test_plugin_workers", "workers": 1, "timeout": 30, **kwargs})
+        self.addCleanup(CACHES.pop, "test_plugin_workers", None)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def run_in_thread(self, pool, *args, **kwargs):
+        """Start `pool.run(*args, **kwargs)` in a thread; returns ``(thread, outcome)``."""
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = pool.run(*args, **kwargs)
+            except PluginError as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread, outcome
+
+    def wait_for(self, condition, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condition not met in time"
+            time.sleep(0.02)
+
+
+class TestInline(WorkerPoolTestCase):
+    def test_runs_inline_by_default(self):
+        pool = self.make_pool(workers=0)
+        call = PluginCall(Echo._id(), {})
+        assert pool.run(Echo, {"text": "hi"}, call=call) == "<p>hi</p>"
+        assert call.progress == 0.5
+        assert pool.stats()["spawned"] == 0
+
+    def test_warns_that_limits_are_disabled(self):
+        with self.assertLogs("dml_ui.workers", "WARNING") as logs:
+            pool = self.make_pool(workers=0)
+        assert "DML_UI_PLUGIN_WORKERS" in logs.output[0]
+        call = PluginCall(Echo._id(), {})
+        pool.run(Echo, {}, call=call)
+        # nothing to kill, so the call can't be cancelled
+        assert not pool.cancel(call.id)
+
+
+class TestWorkerPool(WorkerPoolTestCase):
+    def test_runs_calls_in_a_worker(self):
+        pool = self.make_pool()
+        call = PluginCall(Echo._id(), {})
+        assert pool.run(Echo, {"text": "hi"}, call=call) == "<p>hi</p>"
+        assert (call.progress, call.message) == (0.5, "halfway")
+        pid = pool.run(Echo, {}, method="pid")
+        assert pool.run(Echo, {}, method="pid") == pid
+        stats = pool.stats()
+        assert (stats["completed"], stats["spawned"], stats["idle"]) == (3, 1, 1)
+
+    def test_plugin_errors(self):
+        pool = self.make_pool()
+        with self.assertRaisesRegex(PluginError, "ValueError: bad plugin"):
+            pool.run(Failing, {})
+        # the worker survives a plugin exception
+        assert pool.run(Echo, {"text": "ok"}) == "<p>ok</p>"
+        assert (pool.stats()["errors"], pool.stats()["spawned"]) == (1, 1)
+
+    def test_timeout_kills_the_worker(self):
+        pool = self.make_pool(timeout=1)
+        start = time.monotonic()
+        with self.assertRaises(PluginTimeout):
+            pool.run(Sleepy, {"seconds": 30})
+        assert time.monotonic() - start < 15
+        assert pool.run(Echo, {"text": "next"}, timeout=30) == "<p>next</p>"
+        stats = pool.stats()
+        assert (stats["timeouts"], stats["spawned"]) == (1, 2)
+
+    def test_rss_limit_kills_the_worker(self):
+        pool = self.make_pool(max_rss=400 << 20)
+        with self.assertRaises(PluginMemoryError):
+            pool.run(Hog, {"nbytes": 600 << 20})
+        assert pool.run(Echo, {"text": "next"}) == "<p>next</p>"
+        stats = pool.stats()
+        assert (stats["memory_kills"], stats["spawned"]) == (1, 2)
+
+    def test_cancel_a_running_call(self):
+        pool = self.make_pool()
+        call = PluginCall(Sleepy._id(), {})
+        thread, outcome = self.run_in_thread(pool, Sleepy, {"seconds": 30}, call=call)
+        self.wait_for(lambda: call.state == "running")
+        assert pool.cancel(call.id)
+        thread.join(15)
+        assert isinstance(outcome.get("error"), PluginCancelled)
+        assert call.state == "killed"
+        assert not pool.cancel(call.id)
+        assert pool.stats()["cancellations"] == 1
+
+    def test_cancel_a_queued_call(self):
+        pool = self.make_pool()
+        busy = PluginCall(Sleepy._id(), {})
+        first, _ = self.run_in_thread(pool, Sleepy, {"seconds": 30}, call=busy)
+        self.wait_for(lambda: busy.state == "running")
+        queued = PluginCall(Echo._id(), {})
+        second, outcome = self.run_in_thread(pool, Echo, {}, call=queued)
+        self.wait_for(lambda: pool.stats()["queued"] == 1)
+        pool.cancel(queued.id)
+        second.join(15)
+        assert isinstance(outcome.get("error"), PluginCancelled)
+        assert queued.started is None
+        pool.cancel(busy.id)
+        first.join(15)
+
+    def test_crashed_workers_are_replaced(self):
+        pool = self.make_pool()
+        with self.assertRaisesRegex(PluginError, "exited"):
+            pool.run(Crash, {})
+        assert pool.run(Echo, {"text": "again"}) == "<p>again</p>"
+        stats = pool.stats()
+        assert (stats["crashes"], stats["spawned"], stats["live"]) == (1, 2, 1)
+
+    def test_queued_calls_run_in_fifo_order(self):
+        pool = self.make_pool()
+        pool.start()
+        busy = PluginCall(Sleepy._id(), {})
+        first, _ = self.run_in_thread(pool, Sleepy, {"seconds": 1}, call=busy)
+        self.wait_for(lambda: busy.state == "running")
+        calls, threads = [], []
+        for i in range(4):
+            calls.append(PluginCall(Echo._id(), {}))
+            threads.append(self.run_in_thread(pool, Echo, {"text": i}, call=calls[-1])[0])
+            self.wait_for(lambda n=i + 1: pool.stats()["queued"] == n)
+        for thread in [first, *threads]:
+            thread.join(30)
+        started = [x.started for x in calls]
+        assert started == sorted(started)
+        assert pool.stats()["max_queued"] == 4
+
+    def test_streamed_renders(self):
+        pool = self.make_pool()
+        assert list(pool.run(Chunks, {"count": 3})) == ["<p>0</p>", "<p>1</p>", "<p>2</p>"]
+        assert list(pool.run(Chunks, {"count": 0})) == []
+        stats = pool.stats()
+        # each call completes once, including one that ends before its first chunk
+        assert (stats["completed"], stats["idle"]) == (2, 1)
+
+    def test_streams_have_an_idle_timeout_between_chunks(self):
+        pool = self.make_pool(timeout=2, stream_timeout=3)
+        # spawn the worker first, so its start-up doesn't count against `timeout`
+        pool.run(Echo, {})
+        # slower than `timeout` in total, but never idle for long
+        assert len(list(pool.run(Chunks, {"count": 4, "delay": 0.75}))) == 4
+        pool.stream_timeout = 0.5
+        chunks = pool.run(Chunks, {"count": 3, "stall": 5})
+        assert next(chunks) == "<p>0</p>"
+        with self.assertRaises(PluginTimeout):
+            list(chunks)
+        assert pool.stats()["timeouts"] == 1